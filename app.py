@@ -1,262 +1,133 @@
-from flask import Flask, render_template, request, flash, redirect, url_for
-from flask_mail import Mail, Message
+"""Application Flask du site Fusikab DJ.
+
+`create_app(config)` construit une application complète (extensions,
+catalogue des partenaires, blueprints de `views/`) ; `app` est l'instance
+par défaut, configurée depuis l'environnement (`gunicorn wsgi:app`,
+`python3 run.py`). La pile mail n'est chargée qu'au premier envoi
+(`mailer.py`) : `python3 benchmarks/bench_import_time.py` mesure le coût
+d'import au démarrage.
+"""
+from flask import Flask
 from dotenv import load_dotenv
-from datetime import datetime
 import os
 
-# Charger les variables d'environnement
-load_dotenv()
-
-app = Flask(__name__)
-app.secret_key = os.urandom(24)
-
-# Configuration Flask-Mail
-app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-app.config['MAIL_PORT'] = 587
-app.config['MAIL_USE_TLS'] = True
-app.config['MAIL_USE_SSL'] = False
-app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
-app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER')
-
-mail = Mail(app)
-
-# =======================
-# PAGES LÉGALES
-# =======================
-@app.route('/cgv')
-def cgv():
-    return render_template('cgv.html')
-
-@app.route('/cgu')
-def cgu():
-    return render_template('cgu.html')
-
-@app.route('/politique_cookies')
-def politique_cookies():
-    return render_template('politique_cookies.html')
-
-@app.route('/politique_confidentialite')
-def politique_confidentialite():
-    return render_template('politique_confidentialite.html')
-
-@app.route('/mentions')
-def mentions():
-    return render_template('mentions.html')
-
-# =======================
-# PAGES PRINCIPALES
-# =======================
-@app.route('/')
-def index():
-    gallery_path = os.path.join(app.static_folder, 'gallery_confiance')
-    images = [f for f in os.listdir(gallery_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('index.html', images=images)
-
-@app.route('/about')
-def about():
-    return render_template('about.html')
-
-@app.route('/services')
-def services():
-    return render_template('services.html')
-
-@app.route('/gallery')
-def gallery():
-    gallery_path = os.path.join(app.static_folder, 'gallery')
-    images = [f for f in os.listdir(gallery_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('gallery.html', images=images)
-
-# =======================
-# CONTACT AVEC ENVOI MAIL
-# =======================
-@app.route('/contact', methods=['GET', 'POST'])
-def contact():
-    if request.method == 'POST':
-        nom = request.form.get('nom')
-        prenom = request.form.get('prenom')
-        email = request.form.get('email')
-        telephone = request.form.get('telephone')
-        code_postal = request.form.get('code_postal')
-        event_date_raw = request.form.get('event_date')
-        location = request.form.get('location')
-        contact_method = request.form.get('contact_method')
-        demande = request.form.get('demande')
-        besoins = request.form.getlist('besoin[]')
-
-        # Conversion date en français
-        if event_date_raw:
-            try:
-                event_date = datetime.strptime(event_date_raw, "%Y-%m-%d").strftime("%d/%m/%Y")
-            except ValueError:
-                event_date = event_date_raw
-        else:
-            event_date = "Non précisée"
-
-        # Besoins avec emojis
-        besoins_emojis = {
-            "pack_regie": "🎛️ Pack régie (sono + lumière)",
-            "sonorisation": "🔊 Sonorisation",
-            "barre_lumiere": "💡 Barre de lumière",
-            "lyres": "🎇 Lyres",
-            "video_projecteur": "📽️ Vidéo projecteur",
-            "laser": "🔫 Laser",
-            "machine_fumee": "💨 Machine à fumée",
-            "machine_etincelle": "✨ Machine à étincelle",
-            "machine_brouillard": "🌫️ Machine à brouillard"
-        }
-
-        besoins_formatted = "<br>".join([besoins_emojis.get(b, b) for b in besoins]) if besoins else "Aucun"
-        demande_formatted = demande.replace('\n','<br>') if demande else "Aucun"
-
-        logo_url = "https://lh3.googleusercontent.com/a-/ALV-UjWkHe66n_J1o9_PquFKOGeetukIAKfZxez9KCpF_SZaqmbE5BM=w72-h72-p-rp-mo-br100"
-
-        # Contenu HTML mail pour admin
-        html_admin = f"""
-<html>
-<body style="font-family: Arial, sans-serif; background-color: #f4f4f4; padding: 20px;">
-    <div style="max-width: 650px; margin: auto; background-color: #fff; padding: 25px; border-radius: 10px; box-shadow: 0 5px 15px rgba(0,0,0,0.1);">
-        <div style="text-align:center;">
-            <img src="{logo_url}" alt="Fusikab DJ" style="max-width:200px; margin-bottom:20px;">
-        </div>
-        <h2 style="color: #ffcc00; text-align: center;">📩 Nouvelle demande de contact - {prenom} {nom}</h2>
-        <hr style="border:1px solid #ddd;">
-        <p><strong>👤 Nom :</strong> {prenom} {nom}</p>
-        <p><strong>✉️ Email :</strong> {email}</p>
-        <p><strong>📞 Téléphone :</strong> {telephone}</p>
-        <p><strong>📍 Code Postal :</strong> {code_postal}</p>
-        <p><strong>📅 Date de l'évènement :</strong> {event_date}</p>
-        <p><strong>📌 Lieu :</strong> {location}</p>
-        <p><strong>☎️ Préférence contact :</strong> {'💌 Mail' if contact_method=='email' else '📞 Téléphone'}</p>
-        <p><strong>🛠️ Besoins :</strong><br>{besoins_formatted}</p>
-        <p><strong>💬 Message :</strong><br>{demande_formatted}</p>
-        <hr style="border:1px solid #ddd;">
-        <p style="text-align:center; color:#888;">Fusikab DJ - Formulaire de contact web</p>
-    </div>
-</body>
-</html>
-        """
-
-        # Contenu HTML mail pour l'utilisateur
-        html_user = f"""
-<html>
-<body style="font-family: Arial, sans-serif; background-color: #f4f4f4; padding: 20px;">
-    <div style="max-width: 650px; margin: auto; background-color: #fff; padding: 25px; border-radius: 10px; box-shadow: 0 5px 15px rgba(0,0,0,0.1);">
-        <div style="text-align:center;">
-            <img src="{logo_url}" alt="Fusikab DJ" style="max-width:200px; margin-bottom:20px;">
-        </div>
-        <h2 style="color: #28a745; text-align: center;">✅ Votre demande a été reçue !</h2>
-        <p>Bonjour {prenom},</p>
-        <p>Nous avons bien reçu votre demande de contact et reviendrons vers vous rapidement.</p>
-        <p>Voici un récapitulatif de votre demande :</p>
-        <p><strong>📅 Date de l'évènement :</strong> {event_date}</p>
-        <p><strong>📌 Lieu :</strong> {location}</p>
-        <p><strong>🛠️ Besoins :</strong><br>{besoins_formatted}</p>
-        <p><strong>💬 Message :</strong><br>{demande_formatted}</p>
-        <hr style="border:1px solid #ddd;">
-        <p style="text-align:center; color:#888;">Fusikab DJ - Merci pour votre confiance !</p>
-    </div>
-</body>
-</html>
-        """
-
-        try:
-            # Envoi des mails
-            mail.send(Message(subject=f"Demande de contact - {prenom} {nom}", recipients=[os.getenv('MAIL_USERNAME')], html=html_admin))
-            mail.send(Message(subject="📬 Votre demande a bien été reçue - Fusikab DJ", recipients=[email], html=html_user))
-            flash("✅ Votre message a été envoyé avec succès !", "success")
-        except Exception as e:
-            print(e)
-            flash("❌ Une erreur est survenue lors de l'envoi. Merci de réessayer.", "danger")
-
-        return redirect(url_for('contact'))
-
-    return render_template('contact.html')
-
-# =======================
-# AUTRES PAGES
-# =======================
-@app.route('/disponibilites')
-def disponibilites():
-    return render_template('disponibilites.html')
-
-@app.route('/sonorisation')
-def sonorisation():
-    return render_template('sonorisation.html')
-
-@app.route('/lumieres')
-def lumieres():
-    return render_template('lumieres.html')
-
-@app.route('/animation_musicale')
-def animation_musicale():
-    return render_template('animation_musicale.html')
-
-@app.route('/engagement_ecoresponsable')
-def engagement_ecoresponsable():
-    return render_template('engagement_ecoresponsable.html')
-
-@app.route('/prestations_sur_mesure')
-def prestations_sur_mesure():
-    return render_template('prestations_sur_mesure.html')
-
-@app.route('/conseil_coaching')
-def conseil_coaching():
-    return render_template('conseil_coaching.html')
-
-@app.route('/video_projection')
-def video_projection():
-    return render_template('video_projection.html')
-
-@app.route('/animation_interactive')
-def animation_interactive():
-    return render_template('animation_interactive.html')
-
-# =======================
-# PARTENAIRES
-# =======================
-@app.route('/partenaire1_sallele5B')
-def partenaire1_sallele5B():
-    images_path = os.path.join(app.static_folder, 'images/partenaire1_sallele5B')
-    images = [f for f in os.listdir(images_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('partenaire/partenaire1_sallele5B.html', images=images)
-
-@app.route('/partenaires')
-def partenaires():
-    return render_template('partenaire/index_partenaires.html')
-
-@app.route('/partenaire2_nozchantepie')
-def partenaire2_nozchantepie():
-    images_path = os.path.join(app.static_folder, 'images/partenaire2_nozchantepie')
-    images = [f for f in os.listdir(images_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('partenaire/partenaire2_nozchantepie.html', images=images)
-
-@app.route('/partenaire2_chateau')
-def partenaire2_chateau():
-    images_path = os.path.join(app.static_folder, 'images/partenaire2_chateau')
-    images = [f for f in os.listdir(images_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('partenaire/partenaire2_chateau.html', images=images)
-
-@app.route('/partenaire3_photographe')
-def partenaire3_photographe():
-    images_path = os.path.join(app.static_folder, 'images/partenaire3_photographe')
-    images = [f for f in os.listdir(images_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('partenaire/partenaire3_photographe.html', images=images)
-
-@app.route('/partenaire4_traiteur')
-def partenaire4_traiteur():
-    images_path = os.path.join(app.static_folder, 'images/partenaire4_traiteur')
-    images = [f for f in os.listdir(images_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('partenaire/partenaire4_traiteur.html', images=images)
-
-@app.route('/partenaire5_deco')
-def partenaire5_deco():
-    images_path = os.path.join(app.static_folder, 'images/partenaire5_deco')
-    images = [f for f in os.listdir(images_path) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif'))]
-    return render_template('partenaire/partenaire5_deco.html', images=images)
+from compression import Compression
+from css_bundles import CSSBundles
+from image_dedup import DuplicateIndex
+from image_index import ImageIndex
+from image_metadata import ImageMetadata
+from mailer import Mailer
+from metrics import DIR_SCAN, Metrics
+from page_cache import PageCache
+from partners import PartnerCatalog
+from preload import Preload
+from rate_limit import RateLimiter
+from responsive_images import ResponsiveImages
+from service_worker import ServiceWorker
+from static_assets import StaticAssets
+from views import contact, galleries, legal, main, partenaires, services
+
+BLUEPRINTS = (legal.bp, main.bp, services.bp, galleries.bp, contact.bp, partenaires.bp)
+
+
+def config_from_env():
+    """Configuration lue dans l'environnement (et le `.env`)."""
+    config = {
+        # Clé de session commune à tous les workers (sinon un `flash` est perdu quand la
+        # redirection arrive sur un autre process). Clé aléatoire seulement en développement.
+        'SECRET_KEY': os.getenv('SECRET_KEY') or os.urandom(24),
+        # Flask-Mail (serveur surchargeable : SMTP local pour les tests de charge)
+        'MAIL_SERVER': os.getenv('MAIL_SERVER', 'smtp.gmail.com'),
+        'MAIL_PORT': int(os.getenv('MAIL_PORT', 587)),
+        'MAIL_USE_TLS': os.getenv('MAIL_USE_TLS', '1') == '1',
+        'MAIL_USE_SSL': False,
+        'MAIL_USERNAME': os.getenv('MAIL_USERNAME'),
+        'MAIL_PASSWORD': os.getenv('MAIL_PASSWORD'),
+        'MAIL_DEFAULT_SENDER': os.getenv('MAIL_DEFAULT_SENDER'),
+        # Connexions SMTP authentifiées gardées ouvertes entre les envois
+        'MAIL_POOL_SIZE': int(os.getenv('MAIL_POOL_SIZE', 2)),
+        'MAIL_POOL_IDLE_TIMEOUT': float(os.getenv('MAIL_POOL_IDLE_TIMEOUT', 60)),
+        'MAIL_POOL_MAX_MESSAGES': int(os.getenv('MAIL_POOL_MAX_MESSAGES', 50)),
+        # File d'attente des mails du formulaire de contact (envoyés en tâche de fond)
+        'OUTBOX_MAX_ATTEMPTS': int(os.getenv('OUTBOX_MAX_ATTEMPTS', 6)),
+        'OUTBOX_BACKOFF': float(os.getenv('OUTBOX_BACKOFF', 30)),
+        # Worker d'envoi lancé au chargement ; gunicorn.conf.py le lance plutôt après le fork
+        'OUTBOX_AUTOSTART': os.getenv('OUTBOX_AUTOSTART', '1') == '1',
+        # Limitation du formulaire de contact ; SQLite à définir avec plusieurs workers
+        'RATE_LIMIT_STORAGE': os.getenv('RATE_LIMIT_STORAGE'),
+        # Compression gzip/brotli du HTML (les statiques sont pré-compressés)
+        'COMPRESS_MIN_SIZE': int(os.getenv('COMPRESS_MIN_SIZE', 1024)),
+        # Métriques Prometheus (latence par route, rendu Jinja, SMTP, scans) sur /metrics
+        'METRICS_ENABLED': os.getenv('METRICS_ENABLED') == '1',
+        # Cache des pages rendues (ETag, Last-Modified, 304)
+        'PAGE_CACHE_CONTROL': os.getenv('PAGE_CACHE_CONTROL', 'public, max-age=300'),
+        # Galerie servie par pages (première page dans le HTML, la suite via /api/gallery)
+        'GALLERY_PAGE_SIZE': int(os.getenv('GALLERY_PAGE_SIZE', 12)),
+        'GALLERY_MAX_PAGE_SIZE': 48,
+    }
+    if os.getenv('OUTBOX_PATH'):
+        config['OUTBOX_PATH'] = os.getenv('OUTBOX_PATH')
+    return config
+
+
+def create_app(config=None):
+    """Construit l'application ; `config` (dict) complète ou remplace celle de l'environnement."""
+    # Charger les variables d'environnement
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config.update(config_from_env())
+    app.config.update(config or {})
+
+    # Outbox + worker d'envoi ; Flask-Mail et le pool SMTP au premier envoi
+    Mailer(app)
+    RateLimiter(app)
+
+    # URLs statiques empreintées (cache long immutable)
+    StaticAssets(app)
+    Compression(app)
+    Metrics(app)
+
+    # Métadonnées d'images (dimensions, LQIP, date) : python image_metadata.py
+    image_metadata = app.extensions['image_metadata'] = ImageMetadata(app.static_folder)
+    # Helper Jinja picture() : srcset/sizes depuis static/derivatives/
+    responsive_images = ResponsiveImages(app, metadata=image_metadata)
+    # Bundles CSS par route + CSS critique en ligne (python css_bundles.py)
+    css_bundles = CSSBundles(app)
+
+    # Quasi-doublons masqués des galeries : python image_dedup.py
+    duplicates = app.extensions['duplicates'] = DuplicateIndex(app.static_folder)
+
+    page_cache = PageCache(app)
+    page_cache.watch(responsive_images.manifest_path)
+    page_cache.watch(css_bundles.manifest_path)
+    page_cache.watch(image_metadata.path)
+    page_cache.watch(duplicates.path)
+
+    # Service worker généré (/service-worker.js), versionné par hash des fichiers précachés
+    ServiceWorker(app)
+
+    # Index des images de static/ (rescanné seulement si un dossier change)
+    app.extensions['image_index'] = ImageIndex(
+        app.static_folder, on_scan=lambda subdir, seconds: DIR_SCAN.observe(seconds, subdir))
+
+    # Catalogue validé au démarrage : une entrée invalide empêche le lancement
+    app.extensions['partner_catalog'] = PartnerCatalog.load(
+        os.path.join(app.root_path, 'partenaires.json'), app.static_folder)
+
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
+
+    # En-têtes Link / 103 Early Hints : graphe des templates, une fois les routes connues
+    Preload(app)
+    return app
+
+
+app = create_app()
 
 # =======================
 # LANCEMENT APP
 # =======================
+# Serveur de développement ; en production : gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,54 @@
+"""Octets économisés par la compression, route par route.
+
+    python benchmarks/bench_compression.py
+
+Chaque route GET sans paramètre est demandée sans compression, en gzip
+puis en brotli via le client de test ; les fichiers de static/ sont
+mesurés via leurs variantes pré-compressées (`python compression.py`).
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import app  # noqa: E402
+from compression import _encodings, precompress  # noqa: E402
+
+
+def route_sizes(client):
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if 'GET' not in rule.methods or rule.arguments or rule.endpoint == 'static':
+            continue
+        sizes = {}
+        for encoding in ('identity',) + _encodings():
+            resp = client.get(rule.rule, headers={'Accept-Encoding': encoding})
+            if resp.status_code != 200:
+                break
+            sizes[encoding] = len(resp.get_data())
+        else:
+            yield rule.rule, sizes
+
+
+def print_row(name, sizes):
+    raw = sizes['identity']
+    cells = ''.join(f"{sizes.get(enc, raw):>9} ({100 - sizes.get(enc, raw) * 100 // raw:>2} %)"
+                    for enc in _encodings())
+    print(f"{name:<52}{raw:>9}{cells}")
+
+
+if __name__ == '__main__':
+    header = ''.join(f"{enc:>15}" for enc in _encodings())
+    print(f"{'route':<52}{'brut':>9}{header}")
+    total = {}
+    with app.test_client() as client:
+        for rule, sizes in route_sizes(client):
+            print_row(rule, sizes)
+            for enc, size in sizes.items():
+                total[enc] = total.get(enc, 0) + size
+
+    for rel, (raw, sizes) in sorted(precompress(app.static_folder).items()):
+        sizes = dict(sizes, identity=raw)
+        print_row('/static/' + rel.replace(os.sep, '/'), sizes)
+        for enc in ('identity',) + _encodings():
+            total[enc] = total.get(enc, 0) + sizes.get(enc, raw)
+    print_row('TOTAL', total)
@@ -0,0 +1,161 @@
+"""Micro-benchmark : construction des mails de contact, avant/après templates Jinja.
+
+    python benchmarks/bench_email_build.py [-n 2000]
+
+Chaque ligne construit les deux mails d'une demande (admin et accusé de
+réception). « avant » reproduit l'ancienne construction (f-strings, HTML
+seul, logo distant) ; « après » rend les templates `emails/` (HTML + texte)
+et joint le logo encodé au démarrage. On mesure le rendu seul puis les
+messages complets sérialisés (`as_bytes()`), dominés par le module `email`
+de Python. La dernière ligne chronomètre l'encodage du logo, évité à chaque
+message.
+
+« après » n'est pas plus rapide qu'« avant » : l'échappement HTML, la partie
+texte et le logo joint (au lieu d'une URL distante) ont un coût. Le seul gain
+est celui du logo encodé une fois pour toutes.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask_mail import Message  # noqa: E402
+
+from app import app  # noqa: E402
+from emails import render_email  # noqa: E402
+from mailer import LOGO_CID, LOGO_PATH, inline_image  # noqa: E402
+from views.contact import BESOINS_LABELS  # noqa: E402
+
+SENDER = 'site@example.com'
+FORM = dict(nom='Dupont', prenom='Alice', email='alice@example.com', telephone='0600000000',
+            code_postal='35000', event_date='14/02/2026', location='Rennes',
+            contact_method='email', demande='Bonjour,\nMariage de 120 personnes.',
+            besoins=['pack_regie', 'lyres', 'machine_fumee'])
+
+
+def legacy_render(nom, prenom, email, telephone, code_postal, event_date, location,
+                  contact_method, demande, besoins):
+    # Besoins avec emojis
+    besoins_emojis = {
+        "pack_regie": "🎛️ Pack régie (sono + lumière)",
+        "sonorisation": "🔊 Sonorisation",
+        "barre_lumiere": "💡 Barre de lumière",
+        "lyres": "🎇 Lyres",
+        "video_projecteur": "📽️ Vidéo projecteur",
+        "laser": "🔫 Laser",
+        "machine_fumee": "💨 Machine à fumée",
+        "machine_etincelle": "✨ Machine à étincelle",
+        "machine_brouillard": "🌫️ Machine à brouillard"
+    }
+
+    besoins_formatted = "<br>".join([besoins_emojis.get(b, b) for b in besoins]) if besoins else "Aucun"
+    demande_formatted = demande.replace('\n','<br>') if demande else "Aucun"
+
+    logo_url = "https://lh3.googleusercontent.com/a-/ALV-UjWkHe66n_J1o9_PquFKOGeetukIAKfZxez9KCpF_SZaqmbE5BM=w72-h72-p-rp-mo-br100"
+
+    # Contenu HTML mail pour admin
+    html_admin = f"""
+<html>
+<body style="font-family: Arial, sans-serif; background-color: #f4f4f4; padding: 20px;">
+    <div style="max-width: 650px; margin: auto; background-color: #fff; padding: 25px; border-radius: 10px; box-shadow: 0 5px 15px rgba(0,0,0,0.1);">
+        <div style="text-align:center;">
+            <img src="{logo_url}" alt="Fusikab DJ" style="max-width:200px; margin-bottom:20px;">
+        </div>
+        <h2 style="color: #ffcc00; text-align: center;">📩 Nouvelle demande de contact - {prenom} {nom}</h2>
+        <hr style="border:1px solid #ddd;">
+        <p><strong>👤 Nom :</strong> {prenom} {nom}</p>
+        <p><strong>✉️ Email :</strong> {email}</p>
+        <p><strong>📞 Téléphone :</strong> {telephone}</p>
+        <p><strong>📍 Code Postal :</strong> {code_postal}</p>
+        <p><strong>📅 Date de l'évènement :</strong> {event_date}</p>
+        <p><strong>📌 Lieu :</strong> {location}</p>
+        <p><strong>☎️ Préférence contact :</strong> {'💌 Mail' if contact_method=='email' else '📞 Téléphone'}</p>
+        <p><strong>🛠️ Besoins :</strong><br>{besoins_formatted}</p>
+        <p><strong>💬 Message :</strong><br>{demande_formatted}</p>
+        <hr style="border:1px solid #ddd;">
+        <p style="text-align:center; color:#888;">Fusikab DJ - Formulaire de contact web</p>
+    </div>
+</body>
+</html>
+    """
+
+    # Contenu HTML mail pour l'utilisateur
+    html_user = f"""
+<html>
+<body style="font-family: Arial, sans-serif; background-color: #f4f4f4; padding: 20px;">
+    <div style="max-width: 650px; margin: auto; background-color: #fff; padding: 25px; border-radius: 10px; box-shadow: 0 5px 15px rgba(0,0,0,0.1);">
+        <div style="text-align:center;">
+            <img src="{logo_url}" alt="Fusikab DJ" style="max-width:200px; margin-bottom:20px;">
+        </div>
+        <h2 style="color: #28a745; text-align: center;">✅ Votre demande a été reçue !</h2>
+        <p>Bonjour {prenom},</p>
+        <p>Nous avons bien reçu votre demande de contact et reviendrons vers vous rapidement.</p>
+        <p>Voici un récapitulatif de votre demande :</p>
+        <p><strong>📅 Date de l'évènement :</strong> {event_date}</p>
+        <p><strong>📌 Lieu :</strong> {location}</p>
+        <p><strong>🛠️ Besoins :</strong><br>{besoins_formatted}</p>
+        <p><strong>💬 Message :</strong><br>{demande_formatted}</p>
+        <hr style="border:1px solid #ddd;">
+        <p style="text-align:center; color:#888;">Fusikab DJ - Merci pour votre confiance !</p>
+    </div>
+</body>
+</html>
+    """
+
+    return html_admin, html_user
+
+
+def legacy_build(**form):
+    html_admin, html_user = legacy_render(**form)
+    messages = (
+        Message(subject=f"Demande de contact - {form['prenom']} {form['nom']}",
+                recipients=['admin@example.com'], sender=SENDER, html=html_admin),
+        Message(subject="📬 Votre demande a bien été reçue - Fusikab DJ",
+                recipients=[form['email']], sender=SENDER, html=html_user),
+    )
+    return [msg.as_bytes() for msg in messages]
+
+
+def templated_render(besoins, **form):
+    context = dict(form, besoins=[BESOINS_LABELS.get(b, b) for b in besoins])
+    return render_email('contact_admin', **context), render_email('contact_user', **context)
+
+
+def templated_build(**form):
+    (html_admin, text_admin), (html_user, text_user) = templated_render(**form)
+    mailer = app.extensions['mailer']
+    messages = (
+        mailer.message(subject=f"Demande de contact - {form['prenom']} {form['nom']}",
+                       recipients=['admin@example.com'], sender=SENDER, html=html_admin,
+                       body=text_admin, inline=['logo']),
+        mailer.message(subject="📬 Votre demande a bien été reçue - Fusikab DJ",
+                       recipients=[form['email']], sender=SENDER, html=html_user,
+                       body=text_user, inline=['logo']),
+    )
+    return [msg.as_bytes() for msg in messages]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    # Flask-Mail n'est chargé par l'application qu'au premier envoi
+    app.extensions['mailer'].load()
+    with app.test_request_context():
+        for label, render, build in (('avant', legacy_render, legacy_build),
+                                     ('après', templated_render, templated_build)):
+            size = sum(map(len, build(**FORM)))  # préchauffe (compilation des templates)
+            timings = [
+                min(timeit.repeat(lambda: fn(**FORM), number=args.number, repeat=3)) / args.number
+                for fn in (render, build)
+            ]
+            print(f"{label:>6} : rendu {timings[0] * 1e6:7.1f} µs, "
+                  f"message complet {timings[1] * 1e6:7.1f} µs ({size} octets)")
+
+    logo = os.path.join(app.static_folder, LOGO_PATH)
+    encode = min(timeit.repeat(lambda: inline_image(logo, LOGO_CID), number=args.number, repeat=3)) / args.number
+    print(f"  logo : encodage MIME {encode * 1e6:.1f} µs, fait au démarrage au lieu de "
+          f"{encode * 2e6:.1f} µs par demande (2 mails)")
@@ -0,0 +1,76 @@
+"""Benchmark : coût d'import de l'application au démarrage (`python -X importtime`).
+
+    python benchmarks/bench_import_time.py [-n 5] [--top 15] [--budget-ms 400]
+
+Importe `app` dans `n` process neufs (comme un worker gunicorn recyclé ou
+une instance serverless à froid) et affiche la médiane du temps d'import
+total, puis les modules les plus coûteux (temps cumulé, imports directs de
+`app`). Échoue si la pile mail est chargée dès l'import, ou si `--budget-ms`
+est dépassé.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Chargés au premier envoi / par les commandes de génération seulement
+LAZY_MODULES = ('flask_mail', 'smtp_pool', 'emails', 'smtplib', 'concurrent.futures.process')
+
+PROBE = "import sys, app; print(','.join(m for m in {!r} if m in sys.modules))".format(LAZY_MODULES)
+
+
+def import_times():
+    """Un import à froid ; retourne `{module: (self µs, cumulé µs)}` des imports directs
+    de `app` (plus `app` lui-même) et les modules paresseux chargés quand même."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    # Les enfants sont listés avant leur parent, un niveau d'indentation plus loin
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative), (len(name) - len(name.lstrip())) // 2))
+    times = {}
+    for name, self_us, cumulative, depth in reversed(rows):
+        if times and depth == 0:
+            break
+        if (name == 'app' and depth == 0) or (times and depth == 1):
+            times[name] = (self_us, cumulative)
+    loaded = [m for m in result.stdout.strip().split(',') if m]
+    return times, loaded
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, help="échec si la médiane dépasse ce temps")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    totals = [times['app'][1] / 1000 for times, _ in runs]
+    total = statistics.median(totals)
+    print(f"import app : médiane {total:.1f} ms (min {min(totals):.1f}, max {max(totals):.1f}, {args.runs} runs)")
+
+    direct = {}
+    for times, _ in runs:
+        for name, (_, cumulative) in times.items():
+            if name != 'app':
+                direct.setdefault(name, []).append(cumulative)
+    print("\nImports directs les plus coûteux :")
+    for name, values in sorted(direct.items(), key=lambda item: -statistics.median(item[1]))[:args.top]:
+        print(f"  {statistics.median(values) / 1000:7.1f} ms  {name}")
+
+    loaded = sorted({m for _, modules in runs for m in modules})
+    failed = False
+    if loaded:
+        print(f"\nChargés dès l'import (devraient l'être au premier usage) : {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"\nBudget dépassé : {total:.1f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,330 @@
+"""Test de charge : débit et latences (p50/p95/p99) par route, comparés à une référence.
+
+    python benchmarks/load_test.py [--requests 3000] [--concurrency 16] [--workers 2]
+    python benchmarks/load_test.py --update-baseline
+
+L'application tourne sous gunicorn (`wsgi:app`) sur un port local, avec
+`MAIL_SERVER` pointant vers un serveur SMTP aiosmtpd lancé dans ce process :
+il compte les mails reçus, rien ne sort. Chaque POST de contact simule un
+client différent (`X-Forwarded-For` avec `PROXY_COUNT=1`), comme en
+production, au lieu d'épuiser la limite d'une seule IP.
+
+La référence `load_baseline.json` dépend de la machine : la régénérer sur la
+machine qui exécute la comparaison. Le script sort en erreur si une route
+renvoie des 5xx, si son p95 dépasse la référence de plus de `--tolerance`
+ou si son débit baisse d'autant.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import uuid
+from collections import defaultdict
+
+from aiosmtpd.controller import Controller
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+BASELINE = os.path.join(ROOT, 'benchmarks', 'load_baseline.json')
+
+
+def partner_paths():
+    with open(os.path.join(ROOT, 'partenaires.json'), encoding='utf-8') as f:
+        return tuple('/' + p['slug'] for p in json.load(f)['partners'])
+
+
+# (route, poids, méthode, chemins) : mélange proche du trafic du site
+WORKLOAD = (
+    ('index', 30, 'GET', ('/',)),
+    ('gallery', 20, 'GET', ('/gallery',)),
+    ('api_gallery', 10, 'GET', ('/api/gallery',)),
+    ('partenaires', 8, 'GET', ('/partenaires',)),
+    ('partenaire', 20, 'GET', partner_paths()),
+    ('contact', 6, 'GET', ('/contact',)),
+    ('contact_post', 6, 'POST', ('/contact',)),
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, q):
+    """Percentile au rang le plus proche ; `values` trié."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+# =======================
+# SMTP LOCAL
+# =======================
+class SMTPSink:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 OK'
+
+
+# =======================
+# CLIENT HTTP (keep-alive, un par utilisateur virtuel)
+# =======================
+class Connection:
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=b'', headers=()):
+        for attempt in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+            head = f'{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+            head += ''.join(f'{name}: {value}\r\n' for name, value in headers)
+            head += f'Content-Length: {len(body)}\r\n\r\n'
+            self.writer.write(head.encode('latin-1') + body)
+            try:
+                await self.writer.drain()
+                status_line = await self.reader.readline()
+            except ConnectionError:
+                status_line = b''
+            if status_line:
+                break
+            # Connexion keep-alive fermée par le serveur entre deux requêtes : on rouvre
+            self.close()
+        else:
+            raise ConnectionError(f'{method} {path} : connexion fermée')
+
+        status, length, keep = int(status_line.split()[1]), 0, True
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection':
+                keep = value.strip().lower() != 'close'
+        await self.reader.readexactly(length)
+        if not keep:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def contact_form(n):
+    return urllib.parse.urlencode({
+        'nom': 'Charge', 'prenom': f'Client {n}', 'email': f'client{n}@example.com',
+        'telephone': '0600000000', 'code_postal': '35000', 'event_date': '2026-06-13',
+        'location': 'Rennes', 'contact_method': 'email', 'demande': f'Demande de test n°{n}',
+        'besoin[]': 'sonorisation', 'idempotency_key': uuid.uuid4().hex,
+    }).encode('ascii')
+
+
+def plan(total, seed):
+    rng = random.Random(seed)
+    weights = [weight for _, weight, _, _ in WORKLOAD]
+    for n, (name, _, method, paths) in enumerate(rng.choices(WORKLOAD, weights, k=total)):
+        yield n, name, method, rng.choice(paths)
+
+
+async def run_load(port, total, concurrency, seed):
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    requests = plan(total, seed)
+
+    async def user():
+        connection = Connection(port)
+        for n, name, method, path in requests:
+            body, headers = b'', ()
+            if method == 'POST':
+                body = contact_form(n)
+                headers = (('Content-Type', 'application/x-www-form-urlencoded'),
+                           ('X-Forwarded-For', f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}'))
+            start = time.perf_counter()
+            try:
+                status = await connection.request(method, path, body, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                status = 'erreur'
+            samples[name].append(time.perf_counter() - start)
+            statuses[name][status] += 1
+        connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return time.perf_counter() - start, samples, statuses
+
+
+# =======================
+# SERVEUR
+# =======================
+def start_server(port, smtp_port, workers, tmp):
+    env = dict(os.environ,
+               SECRET_KEY='load-test', PROXY_COUNT='1',
+               MAIL_SERVER='127.0.0.1', MAIL_PORT=str(smtp_port), MAIL_USE_TLS='0',
+               MAIL_USERNAME='admin@example.com', MAIL_DEFAULT_SENDER='site@example.com',
+               OUTBOX_PATH=os.path.join(tmp, 'outbox.sqlite3'), OUTBOX_BACKOFF='1',
+               RATE_LIMIT_STORAGE=os.path.join(tmp, 'rate_limit.sqlite3'),
+               WEB_CONCURRENCY=str(workers), GUNICORN_BIND=f'127.0.0.1:{port}')
+    # Sans mot de passe, Flask-Mail n'essaie pas de s'authentifier auprès du SMTP local
+    env.pop('MAIL_PASSWORD', None)
+    log = open(os.path.join(tmp, 'gunicorn.log'), 'wb')
+    # Pas de recyclage des workers pendant la mesure (un mail en cours resterait bloqué jusqu'à son bail)
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--max-requests', '0',
+                             'wsgi:app'],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            break
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    with open(log.name, encoding='utf-8', errors='replace') as f:
+        raise RuntimeError("gunicorn n'a pas démarré :\n" + f.read()[-2000:])
+
+
+def outbox_retries(path):
+    with sqlite3.connect(path) as db:
+        return db.execute('SELECT COALESCE(SUM(attempts), 0) FROM outbox').fetchone()[0]
+
+
+async def warm_up(port):
+    """Une requête par page : les caches (pages, index d'images) sont chauds avant la mesure."""
+    connection = Connection(port)
+    for _, _, method, paths in WORKLOAD:
+        if method == 'GET':
+            for path in paths:
+                await connection.request('GET', path)
+    connection.close()
+
+
+# =======================
+# RAPPORT
+# =======================
+def summarize(elapsed, samples, statuses):
+    report = {}
+    for name, _, _, _ in WORKLOAD:
+        values = sorted(samples.get(name, ()))
+        if not values:
+            continue
+        report[name] = {
+            'requests': len(values),
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'statuses': {str(k): v for k, v in sorted(statuses[name].items(), key=str)},
+        }
+    return report
+
+
+def print_report(report, elapsed):
+    total = sum(r['requests'] for r in report.values())
+    print(f"{total} requêtes en {elapsed:.1f} s ({total / elapsed:.0f} req/s)\n")
+    print(f"{'route':<14}{'req':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuts")
+    for name, r in report.items():
+        codes = ' '.join(f'{k}×{v}' for k, v in r['statuses'].items())
+        print(f"{name:<14}{r['requests']:>6}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}  {codes}")
+
+
+def regressions(report, baseline, tolerance):
+    problems = []
+    for name, r in report.items():
+        server_errors = sum(v for k, v in r['statuses'].items() if k == 'erreur' or k.startswith('5'))
+        if server_errors:
+            problems.append(f"{name} : {server_errors} erreur(s) serveur")
+        ref = baseline.get('routes', {}).get(name)
+        if ref is None:
+            continue
+        if r['p95_ms'] > ref['p95_ms'] * (1 + tolerance):
+            problems.append(f"{name} : p95 {r['p95_ms']} ms > référence {ref['p95_ms']} ms")
+        if r['rps'] < ref['rps'] * (1 - tolerance):
+            problems.append(f"{name} : {r['rps']} req/s < référence {ref['rps']} req/s")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=2, help="workers gunicorn")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="écart relatif admis avec la référence (défaut : 0.5)")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help="enregistre ce run comme référence")
+    args = parser.parse_args()
+    config = {'requests': args.requests, 'concurrency': args.concurrency, 'workers': args.workers}
+
+    sink = SMTPSink()
+    smtp = Controller(sink, hostname='127.0.0.1', port=free_port())
+    smtp.start()
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(port, smtp.port, args.workers, tmp)
+        try:
+            asyncio.run(warm_up(port))
+            elapsed, samples, statuses = asyncio.run(run_load(port, args.requests, args.concurrency, args.seed))
+            # 2 mails (admin + accusé de réception) par demande acceptée, envoyés en tâche de fond
+            expected = 2 * statuses['contact_post'].get(302, 0)
+            deadline = time.monotonic() + 30
+            while sink.received < expected and time.monotonic() < deadline:
+                time.sleep(0.2)
+            retried = outbox_retries(os.path.join(tmp, 'outbox.sqlite3'))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+            smtp.stop()
+
+    report = summarize(elapsed, samples, statuses)
+    print_report(report, elapsed)
+    print(f"\nMails reçus par le SMTP local : {sink.received}/{expected} ({retried} envoi(s) retenté(s))")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'config': config, 'routes': {name: {k: r[k] for k in ('rps', 'p50_ms', 'p95_ms', 'p99_ms')}
+                                                       for name, r in report.items()}},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Référence enregistrée dans {os.path.relpath(args.baseline, ROOT)}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+        print("Pas de référence : lancer avec --update-baseline pour en créer une")
+    if baseline.get('config', config) != config:
+        print(f"Attention : référence mesurée avec {baseline['config']}")
+    problems = regressions(report, baseline, args.tolerance)
+    if sink.received < expected:
+        problems.append(f"{expected - sink.received} mail(s) non reçu(s)")
+    for problem in problems:
+        print("RÉGRESSION :", problem)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,25 +14,49 @@ markers =
 ''',
 
     # ----------------------- tests/conftest.py -----------------------
-    "tests/conftest.py": r'''import os
+    "tests/conftest.py": r'''import http.client
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
 import sys
+import tempfile
 import time
-import subprocess
-import signal
-import contextlib
 from pathlib import Path
 
 import pytest
 
 APP_IMPORTS = ("app:app", "run:app")
 
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Outbox des tests dans un dossier temporaire, jamais `instance/outbox.sqlite3`.
+
+    Appelé avant la collecte : l'application créée à l'import de `app.py`
+    (y compris par un module de test) lit déjà ce chemin.
+    """
+    config._outbox_dir = tempfile.mkdtemp(prefix="fusikab-tests-")
+    os.environ["OUTBOX_PATH"] = os.path.join(config._outbox_dir, "outbox.sqlite3")
+    # pytest-benchmark est optionnel : pas d'option dans pytest.ini, qui casserait pytest sans lui.
+    # S'il est installé, mesures désactivées (un appel par route) sauf --benchmark-enable.
+    if config.pluginmanager.hasplugin("benchmark"):
+        config.option.benchmark_disable = True
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(getattr(config, "_outbox_dir", ""), ignore_errors=True)
+
+
 def _resolve_app():
     for dotted in APP_IMPORTS:
         module_name, attr = dotted.split(":")
         try:
             mod = __import__(module_name, fromlist=[attr])
             app = getattr(mod, attr)
-            app.config.update(TESTING=True)
+            # Aucun envoi SMTP réel depuis les tests (Flask-Mail est chargé au premier envoi)
+            app.config.update(TESTING=True, MAIL_SUPPRESS_SEND=True)
             return app
         except Exception:
             continue
@@ -46,46 +70,92 @@ def app():
 def client(app):
     return app.test_client()
 
+@pytest.fixture
+def make_static(tmp_path):
+    """Dossier static temporaire : `make_static({"gallery/a.jpg": image})`, ou `(image, options de save)`."""
+    def make(images):
+        for rel_path, image in images.items():
+            image, options = image if isinstance(image, tuple) else (image, {})
+            path = tmp_path / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            image.save(path, **options)
+        return tmp_path
+    return make
+
+def _server_command(fd):
+    """Serveur de production sur la socket `fd` : gunicorn (wsgi.py), sinon Werkzeug sans reloader."""
+    if Path("wsgi.py").exists() and importlib.util.find_spec("gunicorn"):
+        # Les options en ligne de commande priment sur gunicorn.conf.py (workers = cœurs)
+        return [sys.executable, "-m", "gunicorn", "--bind", f"fd://{fd}", "--workers", "1",
+                "--threads", "4", "--max-requests", "0", "wsgi:app"]
+    module_name, attr = next(d.split(":") for d in APP_IMPORTS if Path(d.split(":")[0] + ".py").exists())
+    code = ("import sys; from werkzeug.serving import make_server; "
+            f"from {module_name} import {attr} as app; "
+            "make_server('127.0.0.1', 0, app, threaded=True, fd=int(sys.argv[1])).serve_forever()")
+    return [sys.executable, "-c", code, str(fd)]
+
+
+def _wait_until_ready(port, proc, timeout=30.0):
+    """Sonde HTTP toutes les 20 ms : prêt dès que l'application répond."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            return False
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        try:
+            conn.request("HEAD", "/")
+            if conn.getresponse().status < 500:
+                return True
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.02)
+    return False
+
+
 @pytest.fixture(scope="session")
-def live_server():
+def live_server(tmp_path_factory):
     """
-    Launch real Flask server on 127.0.0.1:5000 for E2E/a11y.
-    Detects run.py (preferred) or app.py.
+    Serveur réel sur un port attribué par l'OS, pour les tests E2E/a11y/liens.
+    Session par worker pytest-xdist : un serveur par worker, lancés en parallèle (`-n auto`).
     """
-    import requests
-
+    # La socket est ouverte ici puis transmise au serveur : pas de port fixe, pas de course
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(128)
+    sock.set_inheritable(True)
+    port = sock.getsockname()[1]
+
+    tmp = tmp_path_factory.mktemp("live_server")
     env = os.environ.copy()
-    env["FLASK_ENV"] = env.get("FLASK_ENV", "production")
-    entry = "run.py" if Path("run.py").exists() else "app.py"
-    proc = subprocess.Popen(
-        [sys.executable, entry],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        env=env,
+    env.update(
+        FLASK_ENV="production",
+        SECRET_KEY=env.get("SECRET_KEY", "live-server-tests"),
+        OUTBOX_PATH=str(tmp / "outbox.sqlite3"),
+        # Aucun mail réel pendant les tests : SMTP local inexistant, les envois restent en file
+        MAIL_SERVER="127.0.0.1", MAIL_PORT="9", MAIL_USE_TLS="0",
     )
+    env.pop("RATE_LIMIT_STORAGE", None)
+    log = open(tmp / "server.log", "wb")
+    proc = subprocess.Popen(_server_command(sock.fileno()), stdout=log, stderr=subprocess.STDOUT,
+                            env=env, pass_fds=(sock.fileno(),))
+    sock.close()
 
-    base = "http://127.0.0.1:5000"
-    for _ in range(60):
-        try:
-            r = requests.get(base, timeout=1.5)
-            if r.status_code < 500:
-                break
-        except Exception:
-            pass
-        time.sleep(1)
-    else:
-        with contextlib.suppress(Exception):
-            out = proc.stdout.read().decode("utf-8", errors="ignore")
-            print("Server boot log:\n", out)
+    if not _wait_until_ready(port, proc):
         proc.kill()
-        raise RuntimeError("Le serveur Flask n'a pas démarré sur :5000")
+        log.close()
+        print("Server boot log:\n", (tmp / "server.log").read_text(errors="ignore"))
+        raise RuntimeError(f"Le serveur n'a pas démarré sur :{port}")
 
-    yield {"base_url": base, "proc": proc}
+    yield {"base_url": f"http://127.0.0.1:{port}", "proc": proc}
 
-    with contextlib.suppress(Exception):
-        proc.send_signal(signal.SIGINT)
-        proc.terminate()
-        proc.wait(timeout=5)
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+    log.close()
 ''',
 
     # ----------------------- tests/test_routes.py -----------------------
@@ -135,6 +205,8 @@ def test_headings_hierarchy(client):
     "tests/test_static_assets.py": r'''from bs4 import BeautifulSoup
 from pathlib import Path
 
+from static_assets import FINGERPRINT_RE
+
 def test_static_links_exist_on_disk(client):
     html = client.get("/").get_data(as_text=True)
     soup = BeautifulSoup(html, "html.parser")
@@ -149,6 +221,10 @@ def test_static_links_exist_on_disk(client):
         if href.startswith(("http://","https://","//")):
             continue
         p = href[1:] if href.startswith("/") else href
+        # URL empreintée (static/css/base.<hash>.css) -> fichier d'origine
+        m = FINGERPRINT_RE.match(p)
+        if m and not Path(p).exists():
+            p = m.group("stem") + m.group("ext")
         if not Path(p).exists():
             missing.append(href)
 
@@ -265,7 +341,7 @@ def test_user_main_flow(live_server, page: Page):
         link = page.locator(selector)
         if link.count():
             link.first.click()
-            expect(page).to_have_url(re.compile(r"127\.0\.0\.1:5000"))
+            expect(page).to_have_url(re.compile(re.escape(base)))
             page.go_back()
 
     nav = page.locator("nav")
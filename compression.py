@@ -0,0 +1,220 @@
+"""Compression gzip/brotli : variantes pré-compressées de static/ et HTML dynamique.
+
+Pré-compression (écrit `fichier.br` / `fichier.gz` à côté des originaux) :
+
+    python compression.py [--static static]
+
+À l'exécution, `send_static_file()` choisit la meilleure variante selon
+`Accept-Encoding` ; les réponses HTML au-delà de `COMPRESS_MIN_SIZE`
+octets sont compressées à la volée (en flux pour les réponses streamées).
+Les octets économisés sont comptés par endpoint dans `stats`.
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request, send_file
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : on se contente de gzip
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.svg', '.ico', '.txt', '.xml', '.html')
+COMPRESSIBLE_MIMETYPES = ('text/html', 'text/css', 'text/plain', 'application/javascript',
+                          'application/json', 'image/svg+xml')
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def _encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encodings):
+    """Meilleur encodage accepté par le client parmi ceux disponibles, ou None."""
+    for encoding in _encodings():
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+
+
+# =======================
+# PRÉ-COMPRESSION
+# =======================
+def precompress(static_folder):
+    """Écrit les variantes .br/.gz manquantes ou périmées.
+
+    Retourne `{fichier: (taille brute, {encodage: taille compressée})}`.
+    """
+    report = {}
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            mtime = os.stat(path).st_mtime_ns
+            with open(path, 'rb') as f:
+                data = f.read()
+            sizes = {}
+            for encoding in _encodings():
+                target = path + SUFFIXES[encoding]
+                try:
+                    fresh = os.stat(target).st_mtime_ns >= mtime
+                except FileNotFoundError:
+                    fresh = False
+                if not fresh:
+                    compressed = compress(data, encoding)
+                    if len(compressed) >= len(data):
+                        continue
+                    with open(target, 'wb') as f:
+                        f.write(compressed)
+                sizes[encoding] = os.path.getsize(target)
+            report[os.path.relpath(path, static_folder)] = (len(data), sizes)
+    return report
+
+
+# =======================
+# SERVICE
+# =======================
+def send_static_file(filename):
+    """`app.send_static_file` qui sert une variante .br/.gz quand le client l'accepte."""
+    app = current_app._get_current_object()
+    path = os.path.join(app.static_folder, filename)
+    if filename.lower().endswith(COMPRESSIBLE_EXTENSIONS) and os.path.isfile(path):
+        mtime = os.stat(path).st_mtime_ns
+        encoding, variants = None, False
+        for candidate in _encodings():
+            try:
+                fresh = os.stat(path + SUFFIXES[candidate]).st_mtime_ns >= mtime
+            except FileNotFoundError:
+                continue
+            variants = variants or fresh
+            if fresh and encoding is None and request.accept_encodings[candidate]:
+                encoding = candidate
+        if encoding is not None:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_file(path + SUFFIXES[encoding], mimetype=mimetype,
+                                 max_age=app.get_send_file_max_age(filename))
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            extension = app.extensions.get('compression')
+            if extension is not None:
+                extension.record(request.endpoint, os.path.getsize(path), response.content_length)
+            return response
+        if variants:
+            response = app.send_static_file(filename)
+            response.vary.add('Accept-Encoding')
+            return response
+    return app.send_static_file(filename)
+
+
+class Compression:
+    """Compression à la volée des réponses HTML dynamiques."""
+
+    def __init__(self, app=None, cache_size=64):
+        self.stats = {}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_BR_LEVEL', 5)
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+        app.after_request(self.after_request)
+        app.extensions['compression'] = self
+
+    def record(self, endpoint, raw, sent):
+        with self._lock:
+            stat = self.stats.setdefault(endpoint, [0, 0])
+            stat[0] += raw
+            stat[1] += sent
+
+    def after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        if not response.is_streamed and response.content_length is not None \
+                and response.content_length < current_app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        config = current_app.config
+        level = config['COMPRESS_BR_LEVEL'] if encoding == 'br' else config['COMPRESS_GZIP_LEVEL']
+        etag, _ = response.get_etag()
+        if response.is_streamed:
+            response.response = _stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            body = self._compress_cached(etag, data, encoding, level)
+            response.set_data(body)
+            self.record(request.endpoint, len(data), len(body))
+        response.headers['Content-Encoding'] = encoding
+        if etag is not None:
+            # Même représentation, autre codage : validateur faible (comme nginx)
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _compress_cached(self, etag, data, encoding, level):
+        # Les pages de PageCache ont un ETag fort : on ne les compresse qu'une fois
+        if etag is None:
+            return compress(data, encoding, level)
+        key = (etag, encoding)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                return body
+        body = compress(data, encoding, level)
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return body
+
+
+def _stream(chunks, encoding, level):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        finish = compressor.finish
+        process = compressor.process
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        finish = compressor.flush
+        process = compressor.compress
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        out = process(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--static', default=os.path.join(os.path.dirname(__file__) or '.', 'static'))
+    args = parser.parse_args()
+    report = precompress(os.path.abspath(args.static))
+    raw = sum(size for size, _ in report.values())
+    for encoding in _encodings():
+        packed = sum(sizes.get(encoding, size) for size, sizes in report.values())
+        print(f"{encoding:>5} : {raw} -> {packed} octets ({100 - packed * 100 // max(raw, 1)} % économisés)")
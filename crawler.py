@@ -0,0 +1,143 @@
+"""Crawler asynchrone : vérifie tous les liens et ressources d'un site en marche.
+
+    python crawler.py [http://127.0.0.1:8000] [--concurrency 8] [--top 10]
+
+Part des pages GET de la table des routes Flask, puis suit chaque `href`,
+`src`, `srcset` et `url()` CSS (feuilles externes, `<style>` et attributs
+`style`) ainsi que les URLs `/static/` citées dans les scripts (précache du
+service worker). Chaque ressource interne est téléchargée une seule fois,
+avec un pool de connexions keep-alive et une concurrence bornée.
+
+Le rapport donne, par ressource, statut, latence et poids : liens cassés et
+fichiers trop lourds ressortent du même passage. Code de sortie 1 si une
+ressource est en erreur.
+"""
+import argparse
+import asyncio
+import re
+import sys
+import time
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import httpx
+
+from freeze import CSS_URL_RE, extract_links, is_internal
+
+# Fichiers seulement : les préfixes de dossier (`'/static/gallery/'`) sont des règles de cache
+SCRIPT_STATIC_RE = re.compile(r'["\'](/static/[^"\'\s]*[^"\'\s/])["\']')
+TEXT_TYPES = ('text/', 'application/javascript')
+
+
+class Resource:
+    """Une URL interne : statut (code HTTP ou nom d'exception), latence, poids, pages qui la citent."""
+
+    def __init__(self, url):
+        self.url = url
+        self.status = None
+        self.elapsed = 0.0
+        self.size = 0
+        self.content_type = ''
+        self.referrers = set()
+
+    @property
+    def broken(self):
+        return not isinstance(self.status, int) or self.status >= 400
+
+
+def references(resource, body):
+    """URLs citées par une ressource, selon son type."""
+    if resource.content_type == 'text/html':
+        return extract_links(body) + CSS_URL_RE.findall(body)
+    if resource.content_type == 'text/css':
+        return CSS_URL_RE.findall(body)
+    if resource.content_type in ('application/javascript', 'text/javascript'):
+        return SCRIPT_STATIC_RE.findall(body)
+    return []
+
+
+async def crawl(base_url, seeds, concurrency=8, timeout=10.0, transport=None):
+    """Parcourt le site depuis `seeds` (chemins) ; retourne `{url: Resource}`."""
+    base_url = base_url.rstrip('/')
+    origin = urlsplit(base_url)
+    resources = {}
+    queue = asyncio.Queue()
+
+    def enqueue(url, referrer=None):
+        url = urldefrag(url)[0]
+        parts = urlsplit(url)
+        if (parts.scheme, parts.netloc) != (origin.scheme, origin.netloc):
+            return
+        resource = resources.get(url)
+        if resource is None:
+            resource = resources[url] = Resource(url)
+            queue.put_nowait(resource)
+        if referrer is not None:
+            resource.referrers.add(referrer)
+
+    async def worker(client):
+        while True:
+            resource = await queue.get()
+            try:
+                start = time.perf_counter()
+                response = await client.get(resource.url)
+                resource.elapsed = time.perf_counter() - start
+                resource.status = response.status_code
+                resource.size = len(response.content)
+                resource.content_type = response.headers.get('content-type', '').split(';')[0].strip()
+                if response.status_code < 400 and resource.content_type.startswith(TEXT_TYPES):
+                    for ref in references(resource, response.text):
+                        ref = ref.strip()
+                        if ref and is_internal(ref):
+                            enqueue(urljoin(str(response.url), ref), resource.url)
+            except Exception as e:
+                # Toute erreur est notée sur la ressource : un worker qui meurt
+                # laisserait sa part de la file sans preneur et bloquerait join()
+                resource.status = type(e).__name__
+            finally:
+                queue.task_done()
+
+    for path in seeds:
+        enqueue(base_url + path)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True,
+                                 transport=transport) as client:
+        workers = [asyncio.create_task(worker(client)) for _ in range(concurrency)]
+        await queue.join()
+        for task in workers:
+            task.cancel()
+    return resources
+
+
+def report(resources, top=10, out=sys.stdout):
+    broken = sorted((r for r in resources.values() if r.broken), key=lambda r: r.url)
+    total_size = sum(r.size for r in resources.values())
+    print(f"{len(resources)} ressource(s), {total_size / 1024:.0f} Kio, {len(broken)} en erreur", file=out)
+
+    def table(title, rows, value):
+        print(f"\n{title}", file=out)
+        for r in rows:
+            print(f"  {value(r):>10}  {r.status!s:>4}  {r.url}", file=out)
+
+    ok = [r for r in resources.values() if not r.broken]
+    table("Plus lourdes :", sorted(ok, key=lambda r: -r.size)[:top], lambda r: f"{r.size / 1024:.1f} Kio")
+    table("Plus lentes :", sorted(ok, key=lambda r: -r.elapsed)[:top], lambda r: f"{r.elapsed * 1000:.1f} ms")
+    if broken:
+        print("\nEn erreur :", file=out)
+        for r in broken:
+            print(f"  {r.status}  {r.url}  (depuis {', '.join(sorted(r.referrers)) or 'la table des routes'})",
+                  file=out)
+    return broken
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base_url', nargs='?', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--top', type=int, default=10, help="lignes des classements poids/latence")
+    args = parser.parse_args()
+
+    from app import app
+    from freeze import page_urls
+
+    resources = asyncio.run(crawl(args.base_url, list(page_urls(app)), concurrency=args.concurrency))
+    sys.exit(1 if report(resources, top=args.top) else 0)
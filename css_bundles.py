@@ -0,0 +1,336 @@
+"""Feuilles de style minifiées et regroupées par route, CSS critique en ligne.
+
+    python css_bundles.py
+
+Chaque route GET est rendue une fois sans regroupement : ses feuilles
+locales (`base.css` + CSS de la page, dans l'ordre du document) sont
+minifiées et concaténées dans `static/css/bundles/<endpoint>.css`. Les
+règles dont les sélecteurs ne visent que des éléments du haut de page
+(les `CSS_CRITICAL_ELEMENTS` premiers éléments de `<body>`) forment le CSS
+critique, injecté dans `<head>` ; le bundle complet est chargé en asynchrone.
+
+Sans manifest (build non lancé), `base.html` garde les `<link>` d'origine.
+"""
+import argparse
+import json
+import os
+import posixpath
+import re
+import threading
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from flask import request
+from markupsafe import Markup
+
+from freeze import CSS_URL_RE, page_urls
+from static_assets import FINGERPRINT_RE
+
+OUTPUT_DIR = 'css/bundles'
+MANIFEST_NAME = 'manifest.json'
+
+_TOKEN_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.S)
+_PSEUDO_RE = re.compile(r'::?[\w-]+(?:\([^)]*\))?|\[[^\]]*\]')
+_SIMPLE_RE = re.compile(r'([.#]?)(-?[_a-zA-Z][\w-]*)')
+_ALWAYS = {'html', 'body'}
+_DECLARATION_AT_RULES = {'@font-face', '@page', '@property', '@counter-style', '@viewport'}
+
+
+# =======================
+# MINIFICATION
+# =======================
+def minify(css):
+    """Supprime commentaires et blancs superflus, sans toucher aux chaînes."""
+    # 1er passage : retrait des commentaires ; 2e : blancs hors chaînes
+    css = ''.join(p for i, p in enumerate(_TOKEN_RE.split(css)) if not (i % 2 and p.startswith('/*')))
+    # « : » n'est resserré que dans les déclarations et préambules @ :
+    # dans un sélecteur (`a :hover`), le blanc avant/après a un sens.
+    out, blocks, prelude = [], [], ''
+    for i, part in enumerate(_TOKEN_RE.split(css)):
+        if i % 2:
+            out.append(part)
+            prelude += part
+            continue
+        part = re.sub(r'\s+', ' ', part)
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        pieces = []
+        for piece in re.split(r'([{};])', part):
+            if piece == '{':
+                blocks.append(_is_declaration_block(prelude))
+                prelude = ''
+            elif piece in ('}', ';'):
+                if piece == '}' and blocks:
+                    blocks.pop()
+                prelude = ''
+            else:
+                if (blocks and blocks[-1]) or (prelude + piece).lstrip().startswith('@'):
+                    piece = re.sub(r':\s+', ':', piece)
+                prelude += piece
+            pieces.append(piece)
+        out.append(''.join(pieces))
+    return ''.join(out).replace(';}', '}').strip()
+
+
+def _is_declaration_block(prelude):
+    """Vrai si le bloc ouvert après `prelude` contient des déclarations."""
+    prelude = prelude.strip().lower()
+    if not prelude.startswith('@'):
+        return True
+    return re.match(r'@[\w-]+', prelude).group() in _DECLARATION_AT_RULES
+
+
+def split_rules(css):
+    """Découpe du CSS minifié en [(prélude, corps)] de premier niveau.
+
+    Le corps vaut None pour les instructions sans bloc (`@import ...;`).
+    """
+    rules, depth, quote, start, opened = [], 0, None, 0, 0
+    for i, ch in enumerate(css):
+        if quote:
+            if ch == quote and css[i - 1] != '\\':
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '{':
+            if depth == 0:
+                opened = i
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((css[start:opened].strip(), css[opened + 1:i]))
+                start = i + 1
+        elif ch == ';' and depth == 0:
+            rules.append((css[start:i].strip(), None))
+            start = i + 1
+    return rules
+
+
+# =======================
+# CSS CRITIQUE
+# =======================
+def selector_matches(selector, tags, classes, ids):
+    """Vrai si chaque type/classe/id du sélecteur est présent en haut de page."""
+    selector = _PSEUDO_RE.sub('', selector)
+    for prefix, name in _SIMPLE_RE.findall(selector):
+        if prefix == '.' and name not in classes:
+            return False
+        if prefix == '#' and name not in ids:
+            return False
+        if not prefix and name.lower() not in tags:
+            return False
+    return True
+
+
+def critical_css(css, tags, classes, ids):
+    """Sous-ensemble de `css` (minifié) utile au premier affichage."""
+    tags = tags | _ALWAYS
+    out = []
+    for prelude, body in split_rules(css):
+        if body is None:
+            out.append(prelude + ';')
+        elif prelude.startswith(('@font-face', '@keyframes', '@-webkit-keyframes')):
+            out.append(f'{prelude}{{{body}}}')
+        elif prelude.startswith(('@media', '@supports')):
+            inner = critical_css(body, tags, classes, ids)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif any(selector_matches(s, tags, classes, ids) for s in prelude.split(',')):
+            out.append(f'{prelude}{{{body}}}')
+    return ''.join(out)
+
+
+class _PageParser(HTMLParser):
+    """Relève les feuilles de style de la page et les éléments du haut de page."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.stylesheets = []
+        self.tags, self.classes, self.ids = set(), set(), set()
+        self._limit = limit
+        self._in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and 'stylesheet' in (attrs.get('rel') or '').split():
+            self.stylesheets.append(attrs.get('href'))
+        if tag == 'body':
+            self._in_body = True
+            return
+        if not self._in_body or self._limit <= 0:
+            return
+        self._limit -= 1
+        self.tags.add(tag)
+        self.classes.update((attrs.get('class') or '').split())
+        if attrs.get('id'):
+            self.ids.add(attrs['id'])
+
+
+def analyse(html, limit):
+    parser = _PageParser(limit)
+    parser.feed(html)
+    return parser
+
+
+# =======================
+# BUILD
+# =======================
+def local_stylesheet(app, href):
+    """Chemin disque d'une feuille locale référencée par `href`, sinon None."""
+    parts = urlsplit(href or '')
+    if parts.scheme or parts.netloc:
+        return None
+    path = unquote(parts.path)
+    prefix = app.static_url_path.rstrip('/') + '/'
+    if not path.startswith(prefix):
+        # Lien relatif hérité (`static/css/x.css`)
+        path = '/' + path.lstrip('/')
+        if not path.startswith(prefix):
+            return None
+    filename = path[len(prefix):]
+    match = FINGERPRINT_RE.match(filename)
+    candidates = [filename] + ([match.group('stem') + match.group('ext')] if match else [])
+    for candidate in candidates:
+        full = os.path.join(app.static_folder, candidate)
+        if os.path.isfile(full):
+            return full
+    return None
+
+
+def rebase_urls(css, source, static_url_path):
+    """Rend absolus les `url()` relatifs de `source` (relatif à static/).
+
+    Le bundle vit dans un autre dossier et le CSS critique dans la page.
+    """
+    base = posixpath.dirname(source)
+
+    def absolute(match):
+        url = match.group(1)
+        if url.startswith(('data:', '/', '#')) or urlsplit(url).scheme:
+            return match.group(0)
+        path = posixpath.normpath(posixpath.join(base, url))
+        return f"url('{static_url_path.rstrip('/')}/{path}')"
+
+    return CSS_URL_RE.sub(absolute, css)
+
+
+def build(app):
+    """Écrit un bundle par route GET et le manifest ; retourne ce dernier."""
+    output = os.path.join(app.static_folder, OUTPUT_DIR)
+    limit = app.config.get('CSS_CRITICAL_ELEMENTS', 80)
+    exclude = tuple(app.config.get('CSS_BUNDLE_EXCLUDE', ()))
+    adapter = app.url_map.bind('localhost')
+    manifest = {}
+
+    saved = {k: app.config.get(k) for k in ('CSS_BUNDLES', 'PAGE_CACHE_ENABLED')}
+    app.config.update(CSS_BUNDLES=False, PAGE_CACHE_ENABLED=False)
+    try:
+        with app.test_client() as client:
+            for url in page_urls(app):
+                resp = client.get(url)
+                if resp.status_code != 200 or resp.mimetype != 'text/html':
+                    continue
+                page = analyse(resp.get_data(as_text=True), limit)
+                sources = [p for p in (local_stylesheet(app, h) for h in page.stylesheets)
+                           if p and not _relative(app, p).startswith(exclude)]
+                if not sources:
+                    continue
+                sources = list(dict.fromkeys(sources))
+                css = ''
+                for path in sources:
+                    with open(path, encoding='utf-8') as f:
+                        css += minify(rebase_urls(f.read(), _relative(app, path),
+                                                  app.static_url_path))
+                endpoint = adapter.match(url)[0]
+                href = f'{OUTPUT_DIR}/{endpoint}.css'
+                os.makedirs(output, exist_ok=True)
+                _write_if_changed(os.path.join(app.static_folder, href), css)
+                manifest[endpoint] = {
+                    'href': href,
+                    'critical': critical_css(css, page.tags, page.classes, page.ids),
+                    'sources': [_relative(app, p) for p in sources],
+                }
+    finally:
+        app.config.update(saved)
+
+    os.makedirs(output, exist_ok=True)
+    _write_if_changed(os.path.join(output, MANIFEST_NAME),
+                      json.dumps(manifest, indent=1, sort_keys=True, ensure_ascii=False))
+    return manifest
+
+
+def _relative(app, path):
+    return os.path.relpath(path, app.static_folder).replace(os.sep, '/')
+
+
+def _write_if_changed(path, text):
+    # Un mtime inchangé garde les empreintes et le cache des pages valides
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == text:
+                return
+    except FileNotFoundError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+# =======================
+# EXTENSION
+# =======================
+class CSSBundles:
+    """Expose `page_styles()` aux templates : bundle + CSS critique de la route."""
+
+    def __init__(self, app=None):
+        self._manifest = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CSS_BUNDLES', True)
+        app.config.setdefault('CSS_CRITICAL_ELEMENTS', 80)
+        # Feuilles communes à tout le site, gardées hors des bundles par page
+        app.config.setdefault('CSS_BUNDLE_EXCLUDE', ('vendor/',))
+        self.manifest_path = os.path.join(app.static_folder, OUTPUT_DIR, MANIFEST_NAME)
+        self._config = app.config
+        app.jinja_env.globals['page_styles'] = self.page_styles
+        app.extensions['css_bundles'] = self
+
+    def entry(self, endpoint):
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    with open(self.manifest_path, encoding='utf-8') as f:
+                        self._manifest = json.load(f)
+                    self._mtime = mtime
+        return self._manifest.get(endpoint)
+
+    def page_styles(self):
+        """`{'href', 'critical'}` pour la route courante, ou None (liens classiques)."""
+        if not self._config['CSS_BUNDLES']:
+            return None
+        entry = self.entry(request.endpoint)
+        if entry is None:
+            return None
+        # `</style` dans une chaîne CSS fermerait la balise prématurément
+        critical = entry['critical'].replace('</', '<\\/')
+        return {'href': entry['href'], 'critical': Markup(critical)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    from app import app
+
+    manifest = build(app)
+    for endpoint, entry in sorted(manifest.items()):
+        size = os.path.getsize(os.path.join(app.static_folder, entry['href']))
+        print(f"{endpoint:>28} : {len(entry['sources'])} feuille(s), {size} octets, "
+              f"critique {len(entry['critical'])} octets")
@@ -0,0 +1,37 @@
+"""Construction des mails du formulaire de contact.
+
+Le HTML et sa version texte sont rendus depuis `templates/emails/`
+(compilés une fois par Jinja, HTML auto-échappé). Les images en ligne
+(logo) sont encodées une seule fois, au démarrage (`mailer.py`), puis
+attachées telles quelles à chaque message via `cid:`.
+"""
+from flask import current_app
+from flask_mail import Message
+
+from mailer import LOGO_CID
+
+
+def render_email(name, **context):
+    """Retourne le couple (html, texte) du mail `templates/emails/<name>`."""
+    context.setdefault('logo_cid', LOGO_CID)
+    # Environnement Jinja direct : les mails n'utilisent que leur contexte, sans les
+    # context processors ni les signaux de rendu de Flask (un tiers du temps de rendu)
+    env = current_app.jinja_env
+    return (env.get_template(f'emails/{name}.html').render(context),
+            env.get_template(f'emails/{name}.txt').render(context))
+
+
+class InlineMessage(Message):
+    """Message Flask-Mail dont les images `inline` sont jointes en multipart/related."""
+
+    def __init__(self, *args, inline=(), **kwargs):
+        self.inline = list(inline)
+        super().__init__(*args, **kwargs)
+
+    def _message(self):
+        msg = super()._message()
+        if self.inline and msg.is_multipart():
+            msg.set_type('multipart/related')
+            for part in self.inline:
+                msg.attach(part)
+        return msg
@@ -0,0 +1,220 @@
+"""Export statique du site : chaque route GET est rendue dans `dist/`.
+
+    python freeze.py [--output dist]
+
+Les pages sont écrites en URLs « propres » (`/about` -> `dist/about/index.html`)
+et seuls les fichiers statiques référencés (href, src, srcset, url() CSS,
+icônes du manifest) sont copiés, sous leur nom empreinté. Tout lien interne
+qui ne mène ni à une page ni à un fichier existant fait échouer l'export.
+
+Les routes d'API (`/api/`) ne sont exportées qu'aux URLs que le site appelle
+réellement : `data-next` d'une page, puis `next_url` de chaque réponse JSON
+(curseur dans le chemin). Les fichiers qu'elles référencent (images des pages
+suivantes de la galerie) sont copiés comme les autres.
+
+Seul le POST de `/contact` reste dynamique : nginx ou le CDN sert `dist/`
+(`try_files $uri $uri/index.html`) et transmet ce POST à l'application.
+"""
+import argparse
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+from html.parser import HTMLParser
+from urllib.parse import unquote, urljoin, urlsplit
+
+from static_assets import FINGERPRINT_RE
+
+# data-next : page suivante d'une liste paginée (galerie)
+URL_ATTRIBUTES = ('href', 'src', 'data-full', 'data-next')
+CSS_URL_RE = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+PRECOMPRESSED_SUFFIXES = ('.br', '.gz')
+
+
+class FreezeError(Exception):
+    def __init__(self, broken):
+        self.broken = broken
+        lines = '\n'.join(f'  {page} -> {url}' for page, url in broken)
+        super().__init__(f'{len(broken)} lien(s) cassé(s) :\n{lines}')
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in URL_ATTRIBUTES:
+                self.urls.append(value)
+            elif name == 'srcset':
+                self.urls += [c.split()[0] for c in value.split(',') if c.strip()]
+
+
+def extract_links(html):
+    parser = _LinkParser()
+    parser.feed(html)
+    return parser.urls
+
+
+def is_internal(url):
+    parts = urlsplit(url)
+    return not parts.scheme and not parts.netloc and not url.startswith('#')
+
+
+def page_path(url):
+    """`/` -> `index.html`, `/about` -> `about/index.html`."""
+    path = url.strip('/')
+    return posixpath.join(path, 'index.html') if path else 'index.html'
+
+
+def page_urls(app):
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        # Les arguments fixés par `defaults` (ex. slug d'un partenaire) ne sont pas à deviner
+        fixed = set(rule.defaults or ())
+        if 'GET' in rule.methods and not rule.arguments - fixed and rule.endpoint != 'static':
+            yield rule.rule
+
+
+def freeze(app, output='dist', api_prefixes=('/api/',)):
+    """Rend le site dans `output` ; retourne {'pages': [...], 'assets': [...], 'skipped': [...]}.
+
+    Les routes sous `api_prefixes` ne sont rendues que si une page y renvoie.
+    Lève FreezeError si un lien interne est cassé.
+    """
+    static_prefix = app.static_url_path.rstrip('/') + '/'
+    if os.path.isdir(output) and os.listdir(output):
+        # On ne vide que ce qui ressemble à un export précédent
+        if not os.path.isfile(os.path.join(output, 'index.html')):
+            raise RuntimeError(f"{output} n'est pas un export précédent, abandon")
+        shutil.rmtree(output)
+
+    pages, skipped, references = [], [], []
+    with app.test_client() as client:
+        for url in page_urls(app):
+            if url.startswith(api_prefixes):
+                continue
+            resp = client.get(url)
+            if resp.status_code == 404:
+                skipped.append(url)
+                continue
+            if resp.status_code != 200:
+                raise RuntimeError(f'{url} : HTTP {resp.status_code}')
+            references += _write_response(output, url, resp)
+            pages.append(url)
+
+        # Les fichiers statiques peuvent eux-mêmes en référencer d'autres (CSS, manifest),
+        # et chaque page d'API la suivante
+        assets, broken, seen = [], [], set()
+        while references:
+            source, url = references.pop()
+            path = unquote(urlsplit(url).path)
+            if path in seen or path.rstrip('/') in pages or path in pages:
+                continue
+            seen.add(path)
+            if path.startswith(api_prefixes):
+                # Sans query string : un hébergement statique l'ignorerait
+                resp = client.get(path)
+                if resp.status_code != 200:
+                    broken.append((source, url))
+                    continue
+                references += _write_response(output, path, resp)
+                pages.append(path)
+                continue
+            if not path.startswith(static_prefix):
+                broken.append((source, url))
+                continue
+            filename = path[len(static_prefix):]
+            original = _resolve_static(app.static_folder, filename)
+            if original is None:
+                broken.append((source, url))
+                continue
+            for suffix in ('',) + PRECOMPRESSED_SUFFIXES:
+                if os.path.isfile(original + suffix):
+                    _copy(original + suffix, os.path.join(output, path.lstrip('/') + suffix))
+            assets.append(path)
+            references += [(path, urljoin(path, ref)) for ref in _asset_links(original)
+                           if is_internal(ref)]
+
+    if broken:
+        raise FreezeError(sorted(broken))
+    return {'pages': pages, 'assets': sorted(assets), 'skipped': skipped}
+
+
+def _write_response(output, url, resp):
+    """Écrit la réponse de `url` dans `output` ; retourne ses liens internes `[(url, lien)]`."""
+    if resp.mimetype == 'text/html':
+        _write(output, page_path(url), resp.get_data())
+        links = extract_links(resp.get_data(as_text=True))
+    else:
+        # Route non HTML (service worker, JSON) : écrite telle quelle
+        _write(output, url.lstrip('/'), resp.get_data())
+        links = list(_json_links(resp.get_json())) if resp.is_json else []
+    return [(url, urljoin(url, link)) for link in links if is_internal(link)]
+
+
+def _json_links(value):
+    """URLs (chemins absolus, candidats de srcset compris) des chaînes d'un document JSON."""
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        for item in value:
+            yield from _json_links(item)
+    elif isinstance(value, str) and value.startswith('/'):
+        yield from (c.split()[0] for c in value.split(',') if c.strip())
+
+
+def _resolve_static(static_folder, filename):
+    path = os.path.join(static_folder, filename)
+    if os.path.isfile(path):
+        return path
+    match = FINGERPRINT_RE.match(filename)
+    if match is not None:
+        path = os.path.join(static_folder, match.group('stem') + match.group('ext'))
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _asset_links(path):
+    if path.endswith('.css'):
+        with open(path, encoding='utf-8') as f:
+            return [u for u in CSS_URL_RE.findall(f.read()) if not u.startswith('data:')]
+    if path.endswith('manifest.json'):
+        with open(path, encoding='utf-8') as f:
+            return [icon['src'] for icon in json.load(f).get('icons', [])]
+    return []
+
+
+def _write(output, rel_path, data):
+    target = os.path.join(output, rel_path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+
+
+def _copy(source, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copy2(source, target)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='dist')
+    args = parser.parse_args()
+
+    from app import app
+
+    try:
+        result = freeze(app, args.output)
+    except FreezeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"{len(result['pages'])} page(s), {len(result['assets'])} fichier(s) statique(s) "
+          f"-> {args.output}/")
+    for url in result['skipped']:
+        print(f'  ignorée (404) : {url}')
@@ -0,0 +1,51 @@
+"""Configuration gunicorn : `gunicorn -c gunicorn.conf.py wsgi:app`.
+
+Réglages surchargeables par l'environnement (`WEB_CONCURRENCY`,
+`GUNICORN_THREADS`, `GUNICORN_BIND`, `GUNICORN_TIMEOUT`).
+
+Rechargement sans coupure :
+
+- `kill -HUP <master>` relit cette configuration et remplace les workers
+  un par un ; avec `preload_app`, le code de l'application n'est PAS relu.
+- Pour déployer un nouveau code : `kill -USR2 <master>` (nouveau master,
+  qui recharge l'application), puis `kill -WINCH <ancien master>` et
+  `kill -QUIT <ancien master>` une fois le nouveau prêt.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:' + os.getenv('PORT', '8000'))
+
+# Pages servies depuis le cache mémoire, mails envoyés en tâche de fond :
+# les requêtes sont courtes, 2 workers par cœur (+1) suffisent. Les threads
+# couvrent les attentes réseau (clients lents, écriture de l'outbox).
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Application importée une fois par le master puis partagée (copy-on-write) :
+# démarrage plus rapide, index d'images/catalogue/manifests chargés une seule
+# fois, et une erreur au chargement (catalogue invalide, SECRET_KEY absent)
+# empêche le lancement au lieu de faire boucler les workers.
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recyclage périodique des workers, décalé pour ne pas tous les relancer ensemble
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
+
+# Pas de thread d'envoi dans le master (preload_app) : il ne survivrait pas au fork
+# et pourrait y laisser un verrou. Chaque worker lance le sien dans post_fork.
+os.environ['OUTBOX_AUTOSTART'] = '0'
+
+
+def post_fork(server, worker):
+    # Messages restés en file (redémarrage, recyclage max_requests) repris sans attendre un envoi
+    from app import app
+    app.extensions['mailer'].worker.ensure_started()
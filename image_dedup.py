@@ -0,0 +1,281 @@
+"""Quasi-doublons et recompression des originaux d'images.
+
+    python image_dedup.py [--dry-run] [--threshold 20] [--min-psnr 40] [--max-size 2560] [--workers N]
+
+Parcourt les mêmes dossiers que `responsive_images.py` (galeries, dossiers
+des partenaires) :
+
+1. Doublons : les hashes perceptuels de `metadata.json` (pHash + dHash,
+   mis à jour au besoin) sont rangés dans un arbre BK, qui ne compare que les
+   paires possibles au lieu de toutes. Une image à moins de `--threshold` bits
+   d'une autre (sur 128) est un quasi-doublon. Par groupe, la plus grande
+   (pixels, puis octets) est gardée ; les autres copies du même dossier sont
+   listées dans `static/derivatives/duplicates.json` et ne sont plus servies
+   par les galeries.
+2. Recompression : chaque JPEG est réencodé (progressif, tables optimisées)
+   à la plus basse qualité dont le PSNR de luminance reste au-dessus de
+   `--min-psnr` dB, réduit au besoin à `--max-size` px, et n'est remplacé que
+   s'il gagne au moins 5 %. Les PNG sont seulement réoptimisés sans perte.
+
+`--dry-run` affiche le rapport (groupes, octets économisés) sans rien
+écrire. Après une recompression, relancer `responsive_images.py` et
+`image_metadata.py`.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import threading
+
+from image_metadata import METADATA_NAME, build as build_metadata, collect as collect_metadata, read_metadata
+from responsive_images import OUTPUT_DIR, find_sources
+
+DUPLICATES_NAME = 'duplicates.json'
+# Qualité JPEG minimale, quel que soit le PSNR : en dessous, blocs visibles
+MIN_QUALITY = 60
+MAX_QUALITY = 92
+# Gain minimal pour remplacer un original
+MIN_SAVING = 0.05
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Arbre BK sur la distance de Hamming.
+
+    Chaque enfant est rangé sous sa distance au nœud parent ; l'inégalité
+    triangulaire limite la recherche aux branches à `d ± radius` du nœud.
+    """
+
+    def __init__(self):
+        self._root = None
+
+    def add(self, key, value):
+        node = (key, value, {})
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            distance = hamming(key, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, key, radius):
+        """Valeurs à distance <= `radius` de `key`, sous forme de (distance, valeur)."""
+        found, stack = [], [self._root] if self._root is not None else []
+        while stack:
+            node_key, value, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= radius:
+                found.append((distance, value))
+            stack.extend(child for d, child in children.items() if distance - radius <= d <= distance + radius)
+        return found
+
+
+def image_hash(entry):
+    """pHash et dHash concaténés (128 bits) : la distance de Hamming est leur somme."""
+    return int(entry['phash'] + entry['dhash'], 16)
+
+
+def find_duplicates(manifest, threshold):
+    """Groupes de quasi-doublons : listes de chemins, la meilleure image en tête."""
+    tree = BKTree()
+    for path, entry in manifest.items():
+        tree.add(image_hash(entry), path)
+
+    # Union-find : A proche de B et B proche de C -> même groupe
+    parent = {path: path for path in manifest}
+
+    def root(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for path, entry in manifest.items():
+        for _, other in tree.search(image_hash(entry), threshold):
+            parent[root(other)] = root(path)
+
+    groups = {}
+    for path in manifest:
+        groups.setdefault(root(path), []).append(path)
+
+    def quality(path):
+        entry = manifest[path]
+        return (entry['width'] * entry['height'], entry['bytes'], path)
+
+    return sorted(sorted(group, key=quality, reverse=True) for group in groups.values() if len(group) > 1)
+
+
+def hidden_copies(groups):
+    """`{copie: image gardée}` : seules les copies du dossier de l'image gardée sont masquées."""
+    hidden = {}
+    for kept, *copies in groups:
+        for path in copies:
+            if os.path.dirname(path) == os.path.dirname(kept):
+                hidden[path] = kept
+    return hidden
+
+
+# =======================
+# RECOMPRESSION
+# =======================
+def psnr(a, b):
+    from PIL import ImageChops, ImageStat
+
+    rms = ImageStat.Stat(ImageChops.difference(a.convert('L'), b.convert('L'))).rms[0]
+    return math.inf if rms == 0 else 20 * math.log10(255 / rms)
+
+
+def recompress(path, min_psnr=40.0, max_size=None):
+    """Nouveaux octets de l'image et qualité JPEG utilisée, ou (None, None) si rien n'y gagne."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.load()
+    size = os.path.getsize(path)
+    options = {key: img.info[key] for key in ('exif', 'icc_profile') if img.info.get(key)}
+
+    if path.lower().endswith('.png'):
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG', optimize=True, **options)
+        data = buffer.getvalue()
+        return (data, None) if len(data) <= size * (1 - MIN_SAVING) else (None, None)
+
+    alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+    if alpha:
+        # Un .jpg transparent (PNG renommé) perdrait sa transparence
+        return None, None
+    source = img.convert('RGB')
+    if max_size and max(source.size) > max_size:
+        source.thumbnail((max_size, max_size), Image.LANCZOS)
+
+    # Recherche dichotomique de la plus basse qualité qui respecte le PSNR visé
+    best, low, high = (None, None), MIN_QUALITY, MAX_QUALITY
+    while low <= high:
+        quality = (low + high) // 2
+        buffer = io.BytesIO()
+        source.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True, **options)
+        with Image.open(buffer) as encoded:
+            score = psnr(source, encoded)
+        if score >= min_psnr:
+            best, high = (buffer.getvalue(), quality), quality - 1
+        else:
+            low = quality + 1
+    data, quality = best
+    if data is None or len(data) > size * (1 - MIN_SAVING):
+        return None, None
+    return data, quality
+
+
+def _recompress_job(job):
+    static_folder, rel_path, min_psnr, max_size = job
+    return rel_path, recompress(os.path.join(static_folder, rel_path), min_psnr, max_size)
+
+
+def run(static_folder, threshold=20, min_psnr=40.0, max_size=None, workers=None, dry_run=False, out=print):
+    """Rapport doublons + recompression ; écrit `metadata.json`, `duplicates.json` et les originaux sauf en dry-run."""
+    if dry_run:
+        # Hashes calculés en mémoire : metadata.json (et le cache des pages) reste intact
+        manifest = collect_metadata(static_folder, workers=workers)[0]
+    else:
+        build_metadata(static_folder, workers=workers)
+        manifest = read_metadata(os.path.join(static_folder, OUTPUT_DIR, METADATA_NAME))
+    sources = set(find_sources(static_folder))
+    manifest = {path: entry for path, entry in manifest.items() if path in sources}
+
+    groups = find_duplicates(manifest, threshold)
+    hidden = hidden_copies(groups)
+    out(f"{len(groups)} groupe(s) de quasi-doublons (seuil {threshold} bits)")
+    for kept, *copies in groups:
+        out(f"  garde {kept}")
+        for path in copies:
+            distance = hamming(image_hash(manifest[kept]), image_hash(manifest[path]))
+            action = 'masquée' if path in hidden else 'autre dossier, conservée'
+            out(f"    {distance:>3} bits  {path} ({manifest[path]['bytes'] / 1024:.0f} Kio, {action})")
+    hidden_bytes = sum(manifest[path]['bytes'] for path in hidden)
+    out(f"{len(hidden)} copie(s) masquée(s) des galeries, {hidden_bytes / 1024:.0f} Kio non servis\n")
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = [(static_folder, path, min_psnr, max_size) for path in sorted(manifest) if path not in hidden]
+    before = after = 0
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_path, (data, quality) in pool.map(_recompress_job, jobs):
+            size = manifest[rel_path]['bytes']
+            before += size
+            after += size if data is None else len(data)
+            if data is not None:
+                results.append((rel_path, data))
+                label = 'PNG sans perte' if quality is None else f'qualité {quality}'
+                out(f"  {size / 1024:7.0f} -> {len(data) / 1024:7.0f} Kio  {rel_path} ({label})")
+    saved = before - after
+    out(f"{len(results)} image(s) recompressée(s) : {before / 1024:.0f} -> {after / 1024:.0f} Kio "
+        f"({saved / 1024:.0f} Kio économisés, {saved / max(before, 1):.0%})")
+
+    if dry_run:
+        out("\nDry-run : aucun fichier modifié.")
+        return {'groups': groups, 'hidden': hidden, 'saved': saved, 'written': 0}
+
+    path = os.path.join(static_folder, OUTPUT_DIR, DUPLICATES_NAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, json.dumps(hidden, indent=1, sort_keys=True).encode('utf-8'))
+    for rel_path, data in results:
+        _write_atomic(os.path.join(static_folder, rel_path), data)
+    if results:
+        out("\nOriginaux modifiés : relancez responsive_images.py puis image_metadata.py.")
+    return {'groups': groups, 'hidden': hidden, 'saved': saved, 'written': len(results)}
+
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# =======================
+# LECTURE
+# =======================
+class DuplicateIndex:
+    """Copies masquées des galeries (`duplicates.json`), relu quand le fichier change."""
+
+    def __init__(self, static_folder):
+        self.path = os.path.join(static_folder, OUTPUT_DIR, DUPLICATES_NAME)
+        self._hidden = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def hidden(self, path):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    with open(self.path) as f:
+                        self._hidden = json.load(f)
+                    self._mtime = mtime
+        return path in self._hidden
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--static', default=os.path.join(os.path.dirname(__file__) or '.', 'static'))
+    parser.add_argument('--threshold', type=int, default=20, help="distance max. en bits sur 128 (défaut : 20)")
+    parser.add_argument('--min-psnr', type=float, default=40.0, help="PSNR de luminance visé en dB (défaut : 40)")
+    parser.add_argument('--max-size', type=int, default=2560, help="plus grand côté en px (0 : pas de limite)")
+    parser.add_argument('--workers', type=int, default=None, help="défaut : nombre de cœurs")
+    parser.add_argument('--dry-run', action='store_true', help="rapport seul, aucun fichier écrit")
+    args = parser.parse_args()
+    run(os.path.abspath(args.static), threshold=args.threshold, min_psnr=args.min_psnr,
+        max_size=args.max_size or None, workers=args.workers, dry_run=args.dry_run)
@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+
+class ImageIndex:
+    """Index en mémoire des images de chaque sous-dossier de `static/`.
+
+    Chaque dossier n'est scanné qu'une fois ; la liste triée est ensuite
+    servie depuis le cache tant que le mtime du dossier ne change pas.
+    """
+
+    def __init__(self, root, extensions=IMAGE_EXTENSIONS, on_scan=None):
+        self.root = root
+        self.extensions = extensions
+        # Appelé avec (subdir, secondes) après chaque scan réel du dossier
+        self.on_scan = on_scan
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def images(self, subdir):
+        """Retourne la liste triée des images de `subdir`.
+
+        Lève FileNotFoundError si le dossier n'existe pas.
+        """
+        path = os.path.join(self.root, subdir)
+        mtime = os.stat(path).st_mtime_ns
+        entry = self._entries.get(subdir)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(subdir)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+            start = time.perf_counter()
+            images = tuple(sorted(
+                f for f in os.listdir(path) if f.lower().endswith(self.extensions)
+            ))
+            if self.on_scan is not None:
+                self.on_scan(subdir, time.perf_counter() - start)
+            self._entries[subdir] = (mtime, images)
+            return images
+
+    def reload(self, subdir=None):
+        """Vide le cache d'un dossier, ou de tous si `subdir` est None."""
+        with self._lock:
+            if subdir is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(subdir, None)
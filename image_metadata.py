@@ -0,0 +1,241 @@
+"""Manifest des métadonnées d'images : dimensions, poids, couleur dominante, LQIP, date, hashes perceptuels.
+
+    python image_metadata.py [--force] [--workers N]
+
+Parcourt les mêmes dossiers que `responsive_images.py` et écrit
+`static/derivatives/metadata.json`. Une image n'est réanalysée que si son
+hash de contenu change (mtime/taille servent de pré-contrôle rapide).
+
+La date de prise de vue vient de l'EXIF, à défaut d'une date dans le nom
+du fichier (`PHOTO-2025-09-13-00-28-18.jpg`) ; elle fixe l'ordre des galeries.
+Les hashes perceptuels (dHash, pHash) servent à `image_dedup.py`.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from responsive_images import OUTPUT_DIR, find_sources
+
+METADATA_NAME = 'metadata.json'
+LQIP_SIZE = 16
+# Côté de l'image réduite pour le pHash (DCT), et des basses fréquences conservées
+PHASH_SIZE = 32
+PHASH_LOW = 8
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 36867
+EXIF_DATETIME = 306
+_FILENAME_DATE_RE = re.compile(r'(20\d{2})-(\d{2})-(\d{2})(?:[-_ T](\d{2})[-_:](\d{2})[-_:](\d{2}))?')
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def capture_date(exif, filename):
+    """Date ISO de prise de vue (EXIF, sinon nom de fichier), ou None."""
+    raw = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+    if raw:
+        try:
+            return datetime.strptime(str(raw).strip('\x00 '), '%Y:%m:%d %H:%M:%S').isoformat()
+        except ValueError:
+            pass
+    match = _FILENAME_DATE_RE.search(filename)
+    if match is None:
+        return None
+    parts = [int(p) for p in match.groups() if p is not None]
+    try:
+        return datetime(*parts).isoformat()
+    except ValueError:
+        return None
+
+
+# =======================
+# ANALYSE
+# =======================
+def _bits(flags):
+    """Liste de booléens -> hash hexadécimal (64 bits -> 16 caractères)."""
+    value = 0
+    for flag in flags:
+        value = (value << 1) | bool(flag)
+    return '%0*x' % ((len(flags) + 3) // 4, value)
+
+
+def dhash(img):
+    """Hash de différence : chaque pixel comparé à son voisin de droite (8x8 bits)."""
+    from PIL import Image
+
+    small = img.convert('L').resize((9, 8), Image.LANCZOS)
+    pixels = small.tobytes()
+    return _bits([pixels[row * 9 + col] > pixels[row * 9 + col + 1] for row in range(8) for col in range(8)])
+
+
+def phash(img):
+    """Hash perceptuel : basses fréquences de la DCT 32x32 comparées à leur médiane."""
+    import math
+    from PIL import Image
+
+    n, low = PHASH_SIZE, PHASH_LOW
+    small = img.convert('L').resize((n, n), Image.LANCZOS)
+    pixels = small.tobytes()
+    cosines = [[math.cos(math.pi * (2 * x + 1) * u / (2 * n)) for x in range(n)] for u in range(low)]
+    # DCT séparable, limitée aux `low` premières fréquences : lignes puis colonnes
+    rows = [[sum(c * p for c, p in zip(cosines[u], pixels[y * n:(y + 1) * n])) for u in range(low)]
+            for y in range(n)]
+    coefficients = [sum(cosines[v][y] * rows[y][u] for y in range(n)) for v in range(low) for u in range(low)]
+    # La composante continue (luminosité moyenne) ne compte pas dans la médiane
+    median = sorted(coefficients[1:])[len(coefficients[1:]) // 2]
+    return _bits([c > median for c in coefficients])
+
+
+def analyse(path):
+    from PIL import Image, ImageOps, features
+
+    with Image.open(path) as img:
+        taken = capture_date(img.getexif(), os.path.basename(path))
+        alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = ImageOps.exif_transpose(img)
+        width, height = img.size
+        rgb = img.convert('RGB')
+
+    sample = rgb.copy()
+    sample.thumbnail((64, 64))
+    _, color = max(sample.quantize(colors=5).convert('RGB').getcolors(64 * 64))
+
+    lqip = None
+    if not alpha:
+        # Aperçu flou : une image transparente laisserait voir le fond une fois chargée
+        # WebP : ~120 octets contre ~650 en JPEG (en-têtes) pour 16 px
+        fmt = 'WEBP' if features.check('webp') else 'PNG'
+        tiny = rgb.copy()
+        tiny.thumbnail((LQIP_SIZE, LQIP_SIZE))
+        buffer = io.BytesIO()
+        tiny.save(buffer, fmt, quality=50)
+        lqip = f'data:image/{fmt.lower()};base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    return {
+        'width': width,
+        'height': height,
+        'color': '#%02x%02x%02x' % color,
+        'lqip': lqip,
+        'taken': taken,
+        'dhash': dhash(rgb),
+        'phash': phash(rgb),
+    }
+
+
+def _analyse_job(job):
+    static_folder, rel_path = job
+    return rel_path, analyse(os.path.join(static_folder, rel_path))
+
+
+def collect(static_folder, workers=None, force=False):
+    """Manifest à jour calculé en mémoire ; retourne `(manifest, stats)` sans rien écrire."""
+    path = os.path.join(static_folder, OUTPUT_DIR, METADATA_NAME)
+    manifest = read_metadata(path)
+
+    current, jobs, skipped = {}, [], 0
+    for rel_path in find_sources(static_folder):
+        full = os.path.join(static_folder, rel_path)
+        stat = os.stat(full)
+        entry = manifest.get(rel_path)
+        if entry is not None and 'phash' not in entry:
+            # Entrée d'avant les hashes perceptuels : réanalysée
+            entry = None
+        if not force and entry is not None \
+                and (entry['mtime'], entry['bytes']) == (stat.st_mtime_ns, stat.st_size):
+            current[rel_path] = entry
+            skipped += 1
+            continue
+        digest = file_hash(full)
+        if not force and entry is not None and entry['hash'] == digest:
+            # Fichier touché (copie, checkout) mais contenu identique
+            current[rel_path] = dict(entry, mtime=stat.st_mtime_ns)
+            skipped += 1
+            continue
+        current[rel_path] = {'hash': digest, 'mtime': stat.st_mtime_ns, 'bytes': stat.st_size}
+        jobs.append((static_folder, rel_path))
+
+    # Import différé : inutile (et coûteux) au démarrage de l'application
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_path, info in pool.map(_analyse_job, jobs):
+            current[rel_path].update(info)
+
+    removed = len(set(manifest) - set(current))
+    return current, {'analysed': len(jobs), 'skipped': skipped, 'removed': removed}
+
+
+def build(static_folder, workers=None, force=False):
+    """Met à jour le manifest ; retourne `{'analysed': n, 'skipped': n, 'removed': n}`."""
+    path = os.path.join(static_folder, OUTPUT_DIR, METADATA_NAME)
+    current, stats = collect(static_folder, workers=workers, force=force)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(current, f, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+    return stats
+
+
+def read_metadata(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+# =======================
+# LECTURE
+# =======================
+class ImageMetadata:
+    """Accès aux métadonnées et ordre chronologique des dossiers d'images."""
+
+    def __init__(self, static_folder):
+        self.path = os.path.join(static_folder, OUTPUT_DIR, METADATA_NAME)
+        self._manifest = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def entry(self, path):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._manifest = read_metadata(self.path)
+                    self._mtime = mtime
+        return self._manifest.get(path)
+
+    def sort_key(self, path):
+        """Images datées d'abord (plus anciennes en tête), puis les autres par nom."""
+        entry = self.entry(path) or {}
+        name = path.rsplit('/', 1)[-1]
+        return (0, entry['taken'], name) if entry.get('taken') else (1, '', name)
+
+    def order(self, subdir, names):
+        return tuple(sorted(names, key=lambda name: self.sort_key(f'{subdir}/{name}')))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--static', default=os.path.join(os.path.dirname(__file__) or '.', 'static'))
+    parser.add_argument('--workers', type=int, default=None, help="défaut : nombre de cœurs")
+    parser.add_argument('--force', action='store_true', help="réanalyse tout")
+    args = parser.parse_args()
+    stats = build(os.path.abspath(args.static), workers=args.workers, force=args.force)
+    print(f"{stats['analysed']} image(s) analysée(s), {stats['skipped']} à jour, "
+          f"{stats['removed']} supprimée(s)")
@@ -0,0 +1,108 @@
+"""Envoi des mails du formulaire de contact, en tâche de fond.
+
+Les mails sont mis en file dans l'outbox (SQLite) pendant la requête, puis
+envoyés par le worker d'outbox via le pool SMTP. Le logo en ligne est encodé
+en MIME une seule fois, au démarrage ; Flask-Mail et le pool de connexions ne
+sont importés et construits qu'au premier envoi : un worker, un test ou une
+commande qui n'envoie rien ne les charge jamais.
+"""
+import os
+import threading
+import time
+from email.mime.image import MIMEImage
+
+from metrics import SMTP_SEND
+from outbox import Outbox, OutboxWorker
+
+LOGO_CID = 'logo-fusikab'
+LOGO_PATH = 'images/logo_fusikabdj_noir.jpg'
+
+
+def inline_image(path, cid):
+    """Prépare une partie MIME image réutilisable, référencée par `cid:<cid>`."""
+    # MIMEImage encode en base64 dès la construction : fait une fois pour toutes
+    with open(path, 'rb') as f:
+        part = MIMEImage(f.read())
+    part.add_header('Content-ID', f'<{cid}>')
+    part.add_header('Content-Disposition', 'inline', filename=f'{cid}.{part.get_content_subtype()}')
+    return part
+
+
+class Mailer:
+    def __init__(self, app=None):
+        self.app = None
+        self.outbox = None
+        self.worker = None
+        self._pool = None
+        self.inline_parts = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MAIL_SERVER', 'smtp.gmail.com')
+        app.config.setdefault('MAIL_PORT', 587)
+        app.config.setdefault('MAIL_USE_TLS', True)
+        app.config.setdefault('MAIL_USE_SSL', False)
+        # Connexions SMTP authentifiées gardées ouvertes entre les envois
+        app.config.setdefault('MAIL_POOL_SIZE', 2)
+        app.config.setdefault('MAIL_POOL_IDLE_TIMEOUT', 60.0)
+        app.config.setdefault('MAIL_POOL_MAX_MESSAGES', 50)
+        app.config.setdefault('OUTBOX_PATH', os.path.join(app.instance_path, 'outbox.sqlite3'))
+        app.config.setdefault('OUTBOX_MAX_ATTEMPTS', 6)
+        app.config.setdefault('OUTBOX_BACKOFF', 30.0)
+        app.config.setdefault('OUTBOX_AUTOSTART', True)
+        self.app = app
+        self.outbox = Outbox(app.config['OUTBOX_PATH'],
+                             max_attempts=app.config['OUTBOX_MAX_ATTEMPTS'],
+                             backoff=app.config['OUTBOX_BACKOFF'])
+        self.worker = OutboxWorker(self.outbox, self.send, on_idle=self.prune)
+        # Parties MIME en ligne par nom, encodées une fois pour tous les messages
+        self.inline_parts = {'logo': inline_image(os.path.join(app.static_folder, LOGO_PATH), LOGO_CID)}
+        app.extensions['mailer'] = self
+        # Messages restés en file (redémarrage, déploiement, recyclage d'un worker) repris dès le
+        # démarrage. Sous gunicorn (preload_app), c'est post_fork qui le lance dans chaque worker.
+        if app.config['OUTBOX_AUTOSTART']:
+            self.worker.ensure_started()
+
+    def load(self):
+        """Charge la pile mail : Flask-Mail enregistré sur l'application, pool SMTP créé."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    from flask_mail import Mail
+                    from smtp_pool import SMTPPool
+                    config = self.app.config
+                    self._pool = SMTPPool(Mail(self.app),
+                                          size=config['MAIL_POOL_SIZE'],
+                                          idle_timeout=config['MAIL_POOL_IDLE_TIMEOUT'],
+                                          max_messages=config['MAIL_POOL_MAX_MESSAGES'])
+        return self._pool
+
+    def message(self, inline=(), **kwargs):
+        """Message Flask-Mail ; `inline` : noms des parties en ligne (`'logo'`)."""
+        from emails import InlineMessage
+
+        # Message.as_bytes() lit la configuration de Flask-Mail sur l'application
+        self.load()
+        return InlineMessage(inline=[self.inline_parts[name] for name in inline], **kwargs)
+
+    def enqueue(self, *messages):
+        """Met les messages en file et réveille le worker d'outbox."""
+        self.outbox.enqueue(*messages)
+        self.worker.notify()
+
+    def send(self, payload):
+        """Envoie un message de l'outbox (appelé par le worker)."""
+        with self.app.app_context():
+            start, outcome = time.perf_counter(), 'error'
+            try:
+                self.load().send(self.message(**payload))
+                outcome = 'ok'
+            finally:
+                SMTP_SEND.observe(time.perf_counter() - start, outcome)
+
+    def prune(self):
+        # Rien à fermer tant qu'aucun mail n'est parti
+        if self._pool is not None:
+            self._pool.prune()
@@ -0,0 +1,221 @@
+"""Métriques au format texte Prometheus, exposées sur `/metrics` (opt-in).
+
+- `http_request_duration_seconds` / `http_requests_total` : latence et codes
+  de statut par endpoint (jamais par URL brute : cardinalité bornée) ;
+- `template_render_seconds` : rendu Jinja par template (page ou mail) ;
+- `smtp_send_seconds`, `image_dir_scan_seconds` : alimentés par l'application.
+
+Chaque thread écrit dans ses propres compteurs, sans verrou ; seule la
+lecture (`/metrics`) additionne les compteurs de tous les threads. Sous
+gunicorn, chaque worker expose ses propres valeurs (label `pid`).
+
+Activation : `METRICS_ENABLED=1`.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+from jinja2 import Template
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Compteurs répartis par thread ; additionnés à la lecture."""
+
+    def __init__(self):
+        self._metrics = []
+        self._local = threading.local()
+        self._shards = []
+        # Valeurs des threads terminés, repliées à la lecture
+        self._retired = {}
+        # Ne protège que la liste des shards (création d'un thread, lecture)
+        self._lock = threading.Lock()
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collect(self):
+        """Retourne `{(métrique, labels): valeur}` additionné sur tous les threads."""
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    _merge(self._retired, shard.copy())
+            self._shards = alive
+            totals = {}
+            _merge(totals, self._retired)
+            for _, shard in alive:
+                # dict.copy() est atomique sous le GIL : pas de verrou côté écriture
+                _merge(totals, shard.copy())
+        return totals
+
+    def render(self, extra_labels=()):
+        totals = self.collect()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            series = sorted((labels, value) for (m, labels), value in totals.items() if m is metric)
+            for labels, value in series:
+                lines.extend(metric.samples(labels, value, extra_labels))
+        return '\n'.join(lines) + '\n'
+
+
+def _merge(into, shard):
+    for key, value in shard.items():
+        if isinstance(value, list):
+            current = into.get(key)
+            into[key] = value[:] if current is None else [a + b for a, b in zip(current, value)]
+        else:
+            into[key] = into.get(key, 0) + value
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, *labels, amount=1):
+        shard = self.registry.shard()
+        key = (self, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def samples(self, labels, value, extra):
+        yield f'{self.name}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}'
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        shard = self.registry.shard()
+        key = (self, labels)
+        # [compte par seuil..., +Inf, somme] (non cumulatif ; cumulé à l'export)
+        counts = shard.get(key)
+        if counts is None:
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-2] += 1
+        counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self, labels, counts, extra):
+        cumulative = 0
+        bounds = [repr(b) for b in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, counts[:-1]):
+            cumulative += count
+            label_str = _format_labels(self.labelnames + ('le',), labels + (bound,), extra)
+            yield f'{self.name}_bucket{label_str} {cumulative}'
+        label_str = _format_labels(self.labelnames, labels, extra)
+        yield f'{self.name}_sum{label_str} {_format_value(float(counts[-1]))}'
+        yield f'{self.name}_count{label_str} {cumulative}'
+
+
+# Registre du process, partagé par les modules instrumentés
+registry = Registry()
+REQUEST_DURATION = registry.histogram('http_request_duration_seconds',
+                                      "Durée de traitement des requêtes", ('endpoint', 'method'))
+REQUESTS = registry.counter('http_requests_total', "Requêtes traitées", ('endpoint', 'method', 'status'))
+TEMPLATE_RENDER = registry.histogram('template_render_seconds', "Durée de rendu Jinja", ('template',))
+SMTP_SEND = registry.histogram('smtp_send_seconds', "Durée d'envoi d'un mail", ('outcome',))
+DIR_SCAN = registry.histogram('image_dir_scan_seconds', "Durée de scan d'un dossier d'images", ('subdir',))
+
+
+class TimedTemplate(Template):
+    """Template Jinja dont chaque rendu est chronométré (extends/include compris)."""
+
+    def render(self, *args, **kwargs):
+        with TEMPLATE_RENDER.time(self.name or '<string>'):
+            return super().render(*args, **kwargs)
+
+
+class Metrics:
+    def __init__(self, app=None):
+        self.registry = registry
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', False)
+        app.extensions['metrics'] = self
+        if not app.config['METRICS_ENABLED']:
+            return
+        app.jinja_env.template_class = TimedTemplate
+        if app.jinja_env.cache is not None:
+            app.jinja_env.cache.clear()
+        app.before_request(self._start_timer)
+        app.after_request(self._record)
+        app.add_url_rule('/metrics', 'metrics', self.serve)
+
+    def _start_timer(self):
+        g._metrics_start = time.perf_counter()
+
+    def _record(self, response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            endpoint = request.endpoint or 'none'
+            REQUEST_DURATION.observe(time.perf_counter() - start, endpoint, request.method)
+            REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        return response
+
+    def serve(self):
+        body = self.registry.render(extra_labels=(('pid', os.getpid()),))
+        response = Response(body, mimetype='text/plain')
+        response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
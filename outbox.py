@@ -0,0 +1,189 @@
+"""File d'attente durable (SQLite, mode WAL) pour les mails du formulaire de contact.
+
+La requête se contente d'enregistrer les messages ; un thread de fond les
+envoie ensuite avec relances et backoff exponentiel. Après
+`max_attempts` échecs, un message passe à l'état `dead` et n'est plus
+retenté (il reste consultable dans la base).
+"""
+import contextlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PENDING, SENDING, SENT, DEAD = 'pending', 'sending', 'sent', 'dead'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+"""
+
+
+class Outbox:
+    def __init__(self, path, max_attempts=6, backoff=30.0, max_backoff=3600.0, lease=300.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Un message 'sending' dont le bail a expiré (worker mort) est repris
+        self.lease = lease
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute('PRAGMA synchronous=NORMAL')
+            yield db
+        finally:
+            db.close()
+
+    def enqueue(self, *payloads):
+        """Enregistre un ou plusieurs messages (dicts JSON) dans une même transaction."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            ids = [
+                db.execute(
+                    'INSERT INTO outbox (payload, next_attempt, created_at) VALUES (?, ?, ?)',
+                    (json.dumps(p), now, now),
+                ).lastrowid
+                for p in payloads
+            ]
+            db.execute('COMMIT')
+        return ids
+
+    def claim(self):
+        """Réserve le prochain message dû ; retourne (id, payload) ou None."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute(
+                'SELECT id, payload FROM outbox WHERE status IN (?, ?) AND next_attempt <= ? '
+                'ORDER BY next_attempt LIMIT 1',
+                (PENDING, SENDING, now),
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    'UPDATE outbox SET status = ?, next_attempt = ? WHERE id = ?',
+                    (SENDING, now + self.lease, row['id']),
+                )
+            db.execute('COMMIT')
+        return (row['id'], json.loads(row['payload'])) if row else None
+
+    def mark_sent(self, message_id):
+        with self._connect() as db:
+            db.execute('UPDATE outbox SET status = ?, last_error = NULL WHERE id = ?',
+                       (SENT, message_id))
+
+    def mark_failed(self, message_id, error):
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            attempts = db.execute('SELECT attempts FROM outbox WHERE id = ?',
+                                  (message_id,)).fetchone()['attempts'] + 1
+            if attempts >= self.max_attempts:
+                status, next_attempt = DEAD, time.time()
+            else:
+                delay = min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+                status, next_attempt = PENDING, time.time() + delay * random.uniform(0.8, 1.2)
+            db.execute(
+                'UPDATE outbox SET status = ?, attempts = ?, next_attempt = ?, last_error = ? '
+                'WHERE id = ?',
+                (status, attempts, next_attempt, str(error)[:1000], message_id),
+            )
+            db.execute('COMMIT')
+        return status
+
+    def counts(self):
+        with self._connect() as db:
+            rows = db.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall()
+        return {status: n for status, n in rows}
+
+    def next_due(self):
+        with self._connect() as db:
+            row = db.execute('SELECT MIN(next_attempt) FROM outbox WHERE status IN (?, ?)',
+                             (PENDING, SENDING)).fetchone()
+        return row[0]
+
+
+class OutboxWorker:
+    """Thread de fond qui vide l'outbox avec `send(payload)`.
+
+    Démarré par `ensure_started()` au lancement du process (messages restés
+    en file repris sans attendre un nouvel envoi), et relancé par `notify()`
+    si le process a forké depuis : chaque worker gunicorn a le sien.
+    """
+
+    def __init__(self, outbox, send, poll_interval=30.0, on_idle=None):
+        self.outbox = outbox
+        self.send = send
+        # Appelé quand la file est vide (ex. fermeture des connexions SMTP inactives)
+        self.on_idle = on_idle
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def notify(self):
+        self.ensure_started()
+        self._wakeup.set()
+
+    def ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='outbox-worker',
+                                                daemon=True)
+                self._thread.start()
+
+    def drain(self):
+        """Envoie tous les messages dus ; retourne le nombre de messages traités."""
+        processed = 0
+        while True:
+            job = self.outbox.claim()
+            if job is None:
+                return processed
+            message_id, payload = job
+            processed += 1
+            try:
+                self.send(payload)
+            except Exception as e:
+                status = self.outbox.mark_failed(message_id, e)
+                logger.warning('Envoi du mail %s échoué (%s) : %s', message_id, status, e)
+            else:
+                self.outbox.mark_sent(message_id)
+
+    def _run(self):
+        while True:
+            try:
+                self.drain()
+                if self.on_idle is not None:
+                    self.on_idle()
+                due = self.outbox.next_due()
+            except Exception:
+                logger.exception("Erreur du worker d'outbox")
+                due = None
+            timeout = self.poll_interval if due is None else max(0.0, min(
+                due - time.time(), self.poll_interval))
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
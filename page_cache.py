@@ -0,0 +1,92 @@
+"""Cache des pages rendues, avec ETag / Last-Modified et réponses 304.
+
+Pour les routes dont le rendu ne dépend que du template (et d'un contexte
+hashable, ex. une liste d'images), le HTML est rendu une fois puis servi
+depuis la mémoire. L'entrée est invalidée dès que le mtime du template,
+d'un template parent/inclus, ou d'un fichier surveillé (`watch()`) change.
+"""
+import hashlib
+import os
+import threading
+from email.utils import formatdate
+
+from flask import Response, current_app, render_template, request
+from jinja2 import meta
+
+
+class PageCache:
+    def __init__(self, app=None):
+        self._entries = {}
+        self._deps = {}
+        self._watched = []
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PAGE_CACHE_ENABLED', True)
+        app.config.setdefault('PAGE_CACHE_CONTROL', 'public, max-age=300')
+        app.extensions['page_cache'] = self
+
+    def watch(self, path):
+        """Ajoute un fichier dont le mtime invalide toutes les pages en cache."""
+        self._watched.append(path)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._deps.clear()
+
+    def render(self, template, **context):
+        """Équivalent de `render_template` servant des octets en cache + validateurs."""
+        app = current_app._get_current_object()
+        if not app.config['PAGE_CACHE_ENABLED']:
+            return render_template(template, **context)
+
+        # Par chemin : une même vue sert plusieurs pages (ex. partenaires)
+        key = (request.path, template)
+        version = (self._mtimes(app, template), tuple(sorted(context.items())))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] != version:
+            # Un template a changé : ses extends/include ont pu changer aussi
+            with self._lock:
+                self._deps.pop(template, None)
+            version = (self._mtimes(app, template), version[1])
+        if entry is None or entry[0] != version:
+            body = render_template(template, **context).encode('utf-8')
+            etag = hashlib.sha1(body).hexdigest()
+            last_modified = formatdate(max(version[0]) / 1e9, usegmt=True)
+            entry = (version, body, etag, last_modified)
+            with self._lock:
+                self._entries[key] = entry
+
+        _, body, etag, last_modified = entry
+        response = Response(body, mimetype='text/html')
+        response.set_etag(etag)
+        response.headers['Last-Modified'] = last_modified
+        response.headers['Cache-Control'] = app.config['PAGE_CACHE_CONTROL']
+        return response.make_conditional(request)
+
+    def _mtimes(self, app, template):
+        files = self._deps.get(template)
+        if files is None:
+            files = self._discover(app.jinja_env, template, set())
+            with self._lock:
+                self._deps[template] = files
+        mtimes = []
+        for path in files + self._watched:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(0)
+        return tuple(mtimes)
+
+    def _discover(self, env, name, seen):
+        """Fichiers du template `name` et de tous ses `extends`/`include`/`import`."""
+        seen.add(name)
+        source, filename, _ = env.loader.get_source(env, name)
+        files = [filename]
+        for ref in meta.find_referenced_templates(env.parse(source)):
+            if ref is not None and ref not in seen:
+                files += self._discover(env, ref, seen)
+        return files
@@ -0,0 +1,39 @@
+"""Pagination par curseur des listes triées exposées en JSON.
+
+Le curseur est la clé du dernier élément servi, encodée en base64 : une
+page reste stable même si des images sont ajoutées avant elle entre deux
+requêtes (contrairement à un `offset`).
+"""
+import base64
+import binascii
+import json
+from bisect import bisect_right
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+    return tuple(key) if isinstance(key, list) else key
+
+
+def paginate(items, cursor=None, limit=12, key=lambda item: item):
+    """Retourne `(début, page, curseur suivant ou None)` ; `items` trié selon `key`."""
+    start = 0
+    if cursor:
+        try:
+            start = bisect_right([key(item) for item in items], decode_cursor(cursor))
+        except TypeError as e:  # curseur d'un autre type de clé
+            raise InvalidCursor(cursor) from e
+    page = items[start:start + limit]
+    more = start + limit < len(items)
+    return start, page, encode_cursor(key(page[-1])) if page and more else None
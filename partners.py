@@ -0,0 +1,99 @@
+"""Catalogue des partenaires, lu depuis `partenaires.json` au démarrage.
+
+Chaque partenaire déclare son slug (= URL), sa catégorie, ses textes et son
+dossier d'images sous `static/`. Le catalogue est validé une seule fois :
+une entrée incomplète, un slug en double ou un dossier absent empêche le
+démarrage au lieu de produire une 500 à la première visite. Les listes
+d'images (hors logo) sont calculées à ce moment-là ; servir une page ne
+fait ensuite qu'une recherche dans un dict, sans accès disque.
+
+Ajouter un partenaire = ajouter une entrée au JSON et un dossier d'images.
+"""
+import json
+import os
+import re
+
+from image_index import IMAGE_EXTENSIONS
+
+REQUIRED_FIELDS = ('slug', 'name', 'category', 'summary', 'images')
+_SLUG_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+_DIGITS_RE = re.compile(r'\d+')
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def natural_key(name):
+    """`salle2.jpg` avant `salle10.jpg`."""
+    return _DIGITS_RE.sub(lambda m: m.group().zfill(10), name.lower())
+
+
+def list_partner_images(static_folder, subdir, logo):
+    path = os.path.join(static_folder, subdir)
+    names = (f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS) and f != logo)
+    return tuple(f'{subdir}/{name}' for name in sorted(names, key=natural_key))
+
+
+class PartnerCatalog:
+    """Partenaires par slug et par catégorie (ordre du fichier)."""
+
+    def __init__(self, categories, partners):
+        self.categories = categories
+        self.partners = partners
+        self._by_slug = {partner['slug']: partner for partner in partners}
+
+    def __contains__(self, slug):
+        return slug in self._by_slug
+
+    def get(self, slug):
+        return self._by_slug.get(slug)
+
+    @classmethod
+    def load(cls, path, static_folder):
+        """Lit et valide le catalogue ; lève CatalogError avec toutes les erreurs trouvées."""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        errors = []
+        categories = list(data.get('categories', []))
+        known = {category['id'] for category in categories}
+        partners, seen = [], set()
+        for index, entry in enumerate(data.get('partners', [])):
+            label = entry.get('slug') or f'#{index}'
+            missing = [field for field in REQUIRED_FIELDS if not entry.get(field)]
+            if missing:
+                errors.append(f"{label} : champ(s) manquant(s) {', '.join(missing)}")
+                continue
+            slug = entry['slug']
+            if not _SLUG_RE.match(slug):
+                errors.append(f"{label} : slug invalide")
+            if slug in seen:
+                errors.append(f"{label} : slug en double")
+            seen.add(slug)
+            if entry['category'] not in known:
+                errors.append(f"{label} : catégorie inconnue {entry['category']!r}")
+
+            logo = entry.get('logo', 'logo.jpg')
+            image_dir = os.path.join(static_folder, entry['images'])
+            if not os.path.isdir(image_dir):
+                errors.append(f"{label} : dossier d'images introuvable ({entry['images']})")
+                continue
+            if not os.path.isfile(os.path.join(image_dir, logo)):
+                errors.append(f"{label} : logo introuvable ({entry['images']}/{logo})")
+            slides = list_partner_images(static_folder, entry['images'], logo)
+            if not slides:
+                errors.append(f"{label} : aucune image dans {entry['images']}")
+
+            partners.append(dict(
+                entry,
+                logo=f"{entry['images']}/{logo}",
+                slides=slides,
+                description=tuple(entry.get('description', ())),
+            ))
+
+        if errors:
+            raise CatalogError(f"{path} invalide :\n- " + '\n- '.join(errors))
+        for category in categories:
+            category['partners'] = tuple(p for p in partners if p['category'] == category['id'])
+        return cls(categories, partners)
@@ -0,0 +1,249 @@
+"""Preload des ressources critiques : en-têtes `Link` et 103 Early Hints.
+
+Au démarrage, les templates rendus par chaque route (repérés dans le code
+des vues) sont analysés via l'AST Jinja, chaîne `extends`, blocs et
+`include` compris. L'analyse relève les ressources appelées par
+`url_for('static', filename='...')` avec un nom constant :
+
+- feuilles de style (`<link rel="stylesheet">`, `<link rel="preload">`) ;
+- polices woff2 des `@font-face` de ces feuilles ;
+- image LCP, marquée dans le template par `<img fetchpriority="high">` ;
+- scripts (`<script src>`).
+
+Chaque réponse HTML porte alors un en-tête `Link: <...>; rel=preload`. Quand
+le serveur le permet (`wsgi.early_hints`, gunicorn >= 23), les mêmes liens
+partent dans une réponse 103 avant même l'exécution de la vue. Les feuilles
+regroupées par `css_bundles.py` sont remplacées par leur bundle.
+"""
+import ast
+import inspect
+import os
+import posixpath
+import re
+import textwrap
+from html.parser import HTMLParser
+
+from flask import current_app, request, url_for
+from jinja2 import nodes
+
+from freeze import CSS_URL_RE
+
+# Ordre des liens : ce qui bloque le rendu d'abord, les scripts de fin de page en dernier
+KIND_ORDER = ('style', 'font', 'image', 'script')
+RENDER_FUNCTIONS = ('render_page', 'render_template', 'render')
+_MARKER = '\x00static:{}\x00'
+_MARKER_RE = re.compile('\x00static:([^\x00]*)\x00')
+_FONT_FACE_RE = re.compile(r'@font-face\s*{([^}]*)}', re.I)
+
+
+# =======================
+# ANALYSE DES VUES
+# =======================
+def view_templates(view):
+    """Templates rendus par une vue : premier argument constant de `render_page`/`render_template`."""
+    try:
+        source = textwrap.dedent(inspect.getsource(inspect.unwrap(view)))
+    except (OSError, TypeError):
+        return []
+    templates = []
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Call) or not node.args:
+            continue
+        func = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, 'id', None)
+        first = node.args[0]
+        if func in RENDER_FUNCTIONS and isinstance(first, ast.Constant) and isinstance(first.value, str):
+            templates.append(first.value)
+    return list(dict.fromkeys(templates))
+
+
+# =======================
+# ANALYSE DES TEMPLATES
+# =======================
+def static_filename(node):
+    """`filename` d'un appel `url_for('static', filename='...')` constant, sinon None."""
+    if not (isinstance(node, nodes.Call) and isinstance(node.node, nodes.Name) and node.node.name == 'url_for'
+            and node.args and isinstance(node.args[0], nodes.Const) and node.args[0].value == 'static'):
+        return None
+    for kwarg in node.kwargs:
+        if kwarg.key == 'filename' and isinstance(kwarg.value, nodes.Const):
+            return kwarg.value.value
+    return None
+
+
+def skeleton(env, name, blocks=None):
+    """HTML du template `name` résolu (extends, blocs, include), expressions retirées.
+
+    Les URLs statiques constantes sont remplacées par un marqueur ; toutes les
+    branches des `if` / `for` sont gardées.
+    """
+    source, _, _ = env.loader.get_source(env, name)
+    tree = env.parse(source)
+    own = {block.name: block for block in tree.find_all(nodes.Block)}
+    # Le template le plus dérivé l'emporte
+    blocks = dict(own, **(blocks or {}))
+    extends = tree.find(nodes.Extends)
+    if extends is not None and isinstance(extends.template, nodes.Const):
+        return skeleton(env, extends.template.value, blocks)
+
+    out = []
+
+    def walk(node):
+        if isinstance(node, nodes.Output):
+            for child in node.nodes:
+                if isinstance(child, nodes.TemplateData):
+                    out.append(child.data)
+                else:
+                    filename = static_filename(child)
+                    out.append(_MARKER.format(filename) if filename else '')
+        elif isinstance(node, nodes.Block):
+            for child in blocks.get(node.name, node).body:
+                walk(child)
+        elif isinstance(node, nodes.Include):
+            if isinstance(node.template, nodes.Const):
+                out.append(skeleton(env, node.template.value))
+        elif isinstance(node, nodes.Macro):
+            return
+        else:
+            for child in node.iter_child_nodes():
+                if isinstance(child, nodes.Stmt):
+                    walk(child)
+
+    for node in tree.body:
+        walk(node)
+    return ''.join(out)
+
+
+class _AssetParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.assets = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        url = attrs.get('src') if tag in ('script', 'img') else attrs.get('href')
+        match = _MARKER_RE.fullmatch(url or '')
+        if match is None:
+            return
+        rel = (attrs.get('rel') or '').lower().split()
+        if tag == 'link' and 'stylesheet' in rel:
+            kind = 'style'
+        elif tag == 'link' and 'preload' in rel and attrs.get('as') in KIND_ORDER:
+            kind = attrs['as']
+        elif tag == 'script':
+            kind = 'script'
+        elif tag == 'img' and (attrs.get('fetchpriority') or '').lower() == 'high':
+            kind = 'image'
+        else:
+            return
+        self.assets.append((kind, match.group(1)))
+
+
+def template_assets(env, name):
+    """Ressources critiques `[(type, chemin sous static/)]` d'un template, dans l'ordre du document."""
+    parser = _AssetParser()
+    parser.feed(skeleton(env, name))
+    parser.close()
+    return list(dict.fromkeys(parser.assets))
+
+
+def stylesheet_fonts(static_folder, path):
+    """Polices woff2 des `@font-face` d'une feuille locale (chemins sous static/)."""
+    try:
+        with open(os.path.join(static_folder, path), encoding='utf-8') as f:
+            css = f.read()
+    except (FileNotFoundError, UnicodeDecodeError):
+        return []
+    fonts = []
+    for block in _FONT_FACE_RE.findall(css):
+        for url in CSS_URL_RE.findall(block):
+            url = url.split('?', 1)[0].split('#', 1)[0]
+            if url.endswith('.woff2') and not url.startswith(('/', 'data:')) and '//' not in url:
+                fonts.append(posixpath.normpath(posixpath.join(posixpath.dirname(path), url)))
+    return fonts
+
+
+def build_graph(app):
+    """`{endpoint: [(type, chemin)]}` pour chaque route qui rend un template."""
+    graph, cache = {}, {}
+    for endpoint, view in app.view_functions.items():
+        assets = []
+        for template in view_templates(view):
+            if template not in cache:
+                found = template_assets(app.jinja_env, template)
+                for kind, path in list(found):
+                    if kind == 'style':
+                        found += [('font', font) for font in stylesheet_fonts(app.static_folder, path)]
+                cache[template] = found
+            assets += cache[template]
+        if assets:
+            assets = list(dict.fromkeys(assets))
+            graph[endpoint] = sorted(assets, key=lambda asset: KIND_ORDER.index(asset[0]))
+    return graph
+
+
+def link_value(kind, url):
+    if kind == 'font':
+        # Les polices se chargent toujours en mode CORS : sans `crossorigin`, double téléchargement
+        return f'<{url}>; rel=preload; as=font; type="font/woff2"; crossorigin'
+    if kind == 'image':
+        return f'<{url}>; rel=preload; as=image; fetchpriority=high'
+    return f'<{url}>; rel=preload; as={kind}'
+
+
+# =======================
+# EXTENSION
+# =======================
+class Preload:
+    """En-têtes `Link` et 103 Early Hints depuis le graphe de dépendances des templates.
+
+    À initialiser après l'enregistrement des blueprints : le graphe est
+    construit une fois, au démarrage.
+    """
+
+    def __init__(self, app=None):
+        self.graph = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PRELOAD_ENABLED', True)
+        app.config.setdefault('PRELOAD_EARLY_HINTS', True)
+        app.extensions['preload'] = self
+        if not app.config['PRELOAD_ENABLED']:
+            return
+        self.graph = build_graph(app)
+        app.before_request(self._early_hints)
+        app.after_request(self._link_header)
+
+    def links(self, endpoint):
+        """Valeurs `Link` de la route, avec URLs empreintées et bundle CSS s'il existe."""
+        assets = self.graph.get(endpoint)
+        if not assets:
+            return []
+        bundles = current_app.extensions.get('css_bundles')
+        entry = bundles.entry(endpoint) if bundles is not None and current_app.config['CSS_BUNDLES'] else None
+        bundled = set(entry['sources']) if entry else set()
+        values, bundle_linked = [], False
+        for kind, path in assets:
+            if path in bundled:
+                # Le bundle remplace ses feuilles sources, à la place de la première
+                if bundle_linked:
+                    continue
+                path, bundle_linked = entry['href'], True
+            values.append(link_value(kind, url_for('static', filename=path)))
+        return values
+
+    def _early_hints(self):
+        send = request.environ.get('wsgi.early_hints')
+        if send is None or request.method != 'GET' or not current_app.config['PRELOAD_EARLY_HINTS']:
+            return
+        values = self.links(request.endpoint)
+        if values:
+            send([('Link', value) for value in values])
+
+    def _link_header(self, response):
+        if request.method == 'GET' and response.status_code == 200 and response.mimetype == 'text/html':
+            values = self.links(request.endpoint)
+            if values:
+                response.headers['Link'] = ', '.join(values)
+        return response
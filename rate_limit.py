@@ -0,0 +1,177 @@
+"""Limitation de débit (token bucket) et suppression des doublons.
+
+Chaque clé (`ip:1.2.3.4`, `email:a@b.fr`) a un seau de `capacity` jetons,
+rechargé en continu (`capacity` jetons par `period` secondes) ; une requête
+consomme un jeton ou est refusée avec le délai avant le prochain.
+
+Deux stockages :
+
+- `MemoryBackend` : par process, suffisant avec un seul worker ;
+- `SQLiteBackend` : fichier partagé par tous les workers (`RATE_LIMIT_STORAGE`).
+
+Les doublons (double clic, bot qui rejoue le même formulaire) sont repérés
+par empreinte (clé d'idempotence du formulaire et contenu, ensemble) pendant
+`CONTACT_DUPLICATE_WINDOW` secondes.
+"""
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+# Un seau inactif depuis plus longtemps est forcément plein (périodes <= 1 jour) : il est oublié
+BUCKET_TTL = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated);
+CREATE TABLE IF NOT EXISTS recent (
+    fingerprint TEXT PRIMARY KEY,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recent_expires ON recent (expires);
+"""
+
+
+def refill(tokens, updated, capacity, rate, now):
+    """Consomme un jeton si possible ; retourne (jetons restants, attente avant le prochain)."""
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+def fingerprint(*parts):
+    return hashlib.sha256('\x1f'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+
+class MemoryBackend:
+    def __init__(self, max_keys=10000):
+        # Au-delà, les clés les moins récemment vues sont oubliées (seau plein)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens, wait = refill(tokens, updated, capacity, rate, now)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def seen(self, fingerprint, window, now):
+        """True si l'empreinte a déjà été vue dans la fenêtre ; sinon l'enregistre."""
+        with self._lock:
+            while self._recent and next(iter(self._recent.values())) <= now:
+                self._recent.popitem(last=False)
+            if fingerprint in self._recent:
+                return True
+            self._recent[fingerprint] = now + window
+            while len(self._recent) > self.max_keys:
+                self._recent.popitem(last=False)
+        return False
+
+    def forget(self, fingerprint):
+        with self._lock:
+            self._recent.pop(fingerprint, None)
+
+
+class SQLiteBackend:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            db.execute('PRAGMA synchronous=NORMAL')
+            yield db
+        finally:
+            db.close()
+
+    def take(self, key, capacity, rate, now):
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute('DELETE FROM buckets WHERE updated <= ?', (now - BUCKET_TTL,))
+            row = db.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, wait = refill(*(row or (capacity, now)), capacity, rate, now)
+            db.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                       (key, tokens, now))
+            db.execute('COMMIT')
+        return wait
+
+    def seen(self, fingerprint, window, now):
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute('DELETE FROM recent WHERE expires <= ?', (now,))
+            inserted = db.execute('INSERT OR IGNORE INTO recent (fingerprint, expires) VALUES (?, ?)',
+                                  (fingerprint, now + window)).rowcount
+            db.execute('COMMIT')
+        return not inserted
+
+    def forget(self, fingerprint):
+        with self._connect() as db:
+            db.execute('DELETE FROM recent WHERE fingerprint = ?', (fingerprint,))
+
+
+class RateLimiter:
+    def __init__(self, app=None, clock=time.time):
+        self.clock = clock
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Chemin SQLite partagé entre workers ; None = mémoire du process
+        app.config.setdefault('RATE_LIMIT_STORAGE', None)
+        # (requêtes, secondes) : rafale autorisée et période de recharge complète
+        app.config.setdefault('CONTACT_RATE_LIMIT_IP', (5, 3600))
+        app.config.setdefault('CONTACT_RATE_LIMIT_EMAIL', (3, 3600))
+        app.config.setdefault('CONTACT_DUPLICATE_WINDOW', 600)
+        path = app.config['RATE_LIMIT_STORAGE']
+        self.backend = SQLiteBackend(path) if path else MemoryBackend()
+        app.extensions['rate_limiter'] = self
+
+    def retry_after(self, **keys):
+        """Consomme un jeton par clé non vide (`ip=..., email=...`) ; 0 si tout passe.
+
+        Retourne sinon le délai en secondes avant un nouvel essai. Les limites
+        viennent de `CONTACT_RATE_LIMIT_<CLÉ>`.
+        """
+        now = self.clock()
+        for name, value in keys.items():
+            if not value:
+                continue
+            capacity, period = current_app.config[f'CONTACT_RATE_LIMIT_{name.upper()}']
+            wait = self.backend.take(f'{name}:{value}', capacity, capacity / period, now)
+            if wait:
+                return wait
+        return 0
+
+    def is_duplicate(self, *fingerprints):
+        """True si une des empreintes a été vue récemment ; les enregistre toutes."""
+        now = self.clock()
+        window = current_app.config['CONTACT_DUPLICATE_WINDOW']
+        # Liste (pas any() paresseux) : chaque empreinte doit être enregistrée
+        return any([self.backend.seen(f, window, now) for f in fingerprints if f])
+
+    def forget(self, *fingerprints):
+        """Oublie des empreintes enregistrées par `is_duplicate` : après un échec, la relance doit passer."""
+        for f in fingerprints:
+            if f:
+                self.backend.forget(f)
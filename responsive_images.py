@@ -0,0 +1,249 @@
+"""Déclinaisons responsives des images de `static/` et helper Jinja `picture()`.
+
+Génération (incrémentale, en parallèle sur tous les cœurs) :
+
+    python responsive_images.py [--force] [--workers N]
+
+Les fichiers sont écrits dans `static/derivatives/` avec un manifest JSON
+que le helper lit pour produire les attributs `srcset`/`sizes`.
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+
+from markupsafe import Markup, escape
+
+WIDTHS = (160, 320, 640, 1024, 1600)
+SOURCE_DIRS = ('gallery', 'gallery_confiance', 'images/partenaire*')
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+OUTPUT_DIR = 'derivatives'
+MANIFEST_NAME = 'manifest.json'
+
+# format Pillow -> (extension, type MIME, options d'encodage)
+ENCODERS = {
+    'AVIF': ('avif', 'image/avif', {'quality': 55}),
+    'WEBP': ('webp', 'image/webp', {'quality': 75, 'method': 6}),
+    'JPEG': ('jpg', 'image/jpeg', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+
+def derivative_name(rel_path, width, ext):
+    stem = os.path.splitext(rel_path)[0]
+    return f"{OUTPUT_DIR}/{stem}-{width}.{ext}"
+
+
+def target_widths(original_width):
+    widths = [w for w in WIDTHS if w < original_width]
+    if original_width <= WIDTHS[-1]:
+        widths.append(original_width)
+    return widths
+
+
+# =======================
+# GÉNÉRATION
+# =======================
+def available_formats():
+    from PIL import features
+
+    formats = [f for f in ('AVIF', 'WEBP') if features.check(f.lower())]
+    return formats + ['JPEG']
+
+
+def find_sources(static_folder):
+    sources = []
+    for pattern in SOURCE_DIRS:
+        for directory in sorted(glob.glob(os.path.join(static_folder, pattern))):
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if name.lower().endswith(SOURCE_EXTENSIONS):
+                    path = os.path.join(directory, name)
+                    sources.append(os.path.relpath(path, static_folder).replace(os.sep, '/'))
+    return sources
+
+
+def _render(job):
+    from PIL import Image, ImageOps
+
+    static_folder, rel_path, formats = job
+    with Image.open(os.path.join(static_folder, rel_path)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        width, height = img.size
+        widths = target_widths(width)
+        for w in widths:
+            resized = img.resize((w, round(height * w / width)), Image.LANCZOS)
+            for fmt in formats:
+                ext, _, options = ENCODERS[fmt]
+                out = os.path.join(static_folder, derivative_name(rel_path, w, ext))
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                resized.save(out, fmt, **options)
+    return rel_path, {'width': width, 'height': height, 'widths': widths}
+
+
+def _outputs(entry, rel_path):
+    return [derivative_name(rel_path, w, ENCODERS[fmt][0])
+            for w in entry['widths'] for fmt in entry['formats']]
+
+
+def build(static_folder, workers=None, force=False):
+    """Génère les déclinaisons manquantes ou périmées et met à jour le manifest.
+
+    Retourne un dict `{'built': n, 'skipped': n, 'removed': n}`.
+    """
+    manifest_path = os.path.join(static_folder, OUTPUT_DIR, MANIFEST_NAME)
+    manifest = _read_manifest(manifest_path)
+    formats = available_formats()
+
+    jobs, current, skipped = [], {}, 0
+    for rel_path in find_sources(static_folder):
+        stat = os.stat(os.path.join(static_folder, rel_path))
+        entry = manifest.get(rel_path)
+        if (not force and entry is not None
+                and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+                and entry['formats'] == formats
+                and all(os.path.exists(os.path.join(static_folder, p))
+                        for p in _outputs(entry, rel_path))):
+            current[rel_path] = entry
+            skipped += 1
+        else:
+            current[rel_path] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size}
+            jobs.append((static_folder, rel_path, formats))
+
+    # Chargé ici : seule la génération des déclinaisons en a besoin
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_path, info in pool.map(_render, jobs):
+            current[rel_path].update(info, formats=formats)
+
+    # Originaux supprimés : on nettoie leurs déclinaisons
+    removed = 0
+    for rel_path, entry in manifest.items():
+        if rel_path not in current:
+            for p in _outputs(entry, rel_path):
+                try:
+                    os.remove(os.path.join(static_folder, p))
+                except FileNotFoundError:
+                    pass
+            removed += 1
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(current, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+    return {'built': len(jobs), 'skipped': skipped, 'removed': removed}
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+# =======================
+# HELPER JINJA
+# =======================
+class ResponsiveImages:
+    """Expose `picture(path, alt, sizes, **attrs)` aux templates.
+
+    Sans déclinaison connue pour `path`, le helper retombe sur un simple
+    `<img>` pointant vers l'original. Avec `metadata` (ImageMetadata), les
+    dimensions et l'aperçu flou (LQIP) sont ajoutés même sans déclinaison.
+    """
+
+    def __init__(self, app=None, metadata=None):
+        self.metadata = metadata
+        self._manifest = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.manifest_path = os.path.join(app.static_folder, OUTPUT_DIR, MANIFEST_NAME)
+        app.jinja_env.globals['picture'] = self.picture
+        app.extensions['responsive_images'] = self
+
+    def entry(self, path):
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._manifest = _read_manifest(self.manifest_path)
+                    self._mtime = mtime
+        return self._manifest.get(path)
+
+    def describe(self, path):
+        """Métadonnées de `path` pour le JS : URL d'origine, dimensions, srcset par format."""
+        from flask import url_for
+
+        info = {'full': url_for('static', filename=path)}
+        meta = self.metadata.entry(path) if self.metadata is not None else None
+        if meta is not None:
+            info.update(width=meta['width'], height=meta['height'])
+            # Couleur dominante + LQIP en fond de l'<img>, recouverts au chargement
+            placeholder = f"background:{meta['color']}"
+            if meta.get('lqip'):
+                placeholder += f" url({meta['lqip']}) center/cover no-repeat"
+            info['placeholder'] = placeholder
+        entry = self.entry(path)
+        if entry is None:
+            info['src'] = info['full']
+            return info
+
+        info.update(width=entry['width'], height=entry['height'], sources=[])
+        for fmt in entry['formats']:
+            ext, mime, _ = ENCODERS[fmt]
+            srcset = ', '.join(
+                '%s %dw' % (url_for('static', filename=derivative_name(path, w, ext)), w)
+                for w in entry['widths']
+            )
+            if fmt == 'JPEG':
+                largest = derivative_name(path, entry['widths'][-1], ext)
+                info.update(src=url_for('static', filename=largest), srcset=srcset)
+            else:
+                info['sources'].append({'type': mime, 'srcset': srcset})
+        return info
+
+    def picture(self, path, alt, sizes='100vw', **attrs):
+        info = self.describe(path)
+        img_attrs = {'alt': alt, 'data-full': info['full']}
+        img_attrs.update((k.rstrip('_').replace('_', '-'), v) for k, v in attrs.items())
+        if 'placeholder' in info:
+            img_attrs['style'] = '; '.join(filter(None, (img_attrs.get('style'), info['placeholder'])))
+        if 'srcset' not in info:
+            img_attrs.update(width=info.get('width'), height=info.get('height'))
+            return Markup('<img src="%s"%s>') % (info['src'], _attributes(img_attrs))
+
+        img_attrs.update(srcset=info['srcset'], sizes=sizes, width=info['width'],
+                         height=info['height'])
+        sources = [Markup('<source type="%s" srcset="%s" sizes="%s">') % (s['type'], s['srcset'], sizes)
+                   for s in info['sources']]
+        img = Markup('<img src="%s"%s>') % (info['src'], _attributes(img_attrs))
+        return Markup('<picture>%s%s</picture>') % (Markup('').join(sources), img)
+
+
+def _attributes(attrs):
+    return Markup('').join(Markup(' %s="%s"') % (k, escape(v)) for k, v in attrs.items()
+                           if v is not None)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--static', default=os.path.join(os.path.dirname(__file__) or '.', 'static'))
+    parser.add_argument('--workers', type=int, default=None, help="défaut : nombre de cœurs")
+    parser.add_argument('--force', action='store_true', help="régénère tout")
+    args = parser.parse_args()
+    stats = build(os.path.abspath(args.static), workers=args.workers, force=args.force)
+    print(f"{stats['built']} image(s) générée(s), {stats['skipped']} à jour, "
+          f"{stats['removed']} supprimée(s)")
@@ -1,4 +1,5 @@
 from app import app
 
+# Serveur de développement ; en production : gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,83 @@
+"""Service worker généré depuis la table des routes et les fichiers statiques.
+
+`/service-worker.js` est rendu depuis `templates/service-worker.js` avec :
+
+- les pages GET du site (stale-while-revalidate), sauf celles de
+  `SERVICE_WORKER_EXCLUDE`, laissées au réseau ;
+- les fichiers statiques de `SERVICE_WORKER_PRECACHE`, sous leur URL
+  empreintée (cache-first) ;
+- les préfixes d'images de `SERVICE_WORKER_IMAGES` (cache LRU limité).
+
+La version du cache est un hash de la liste précachée : tout fichier
+modifié change son empreinte, donc la version, et purge les anciens caches.
+"""
+import hashlib
+import os
+
+from flask import Response, current_app, render_template, request, url_for
+
+from freeze import page_urls
+from static_assets import HASH_LENGTH
+
+SKIPPED_SUFFIXES = ('.br', '.gz', '.map')
+
+
+class ServiceWorker:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SERVICE_WORKER_PRECACHE', (
+            'css/', 'js/', 'vendor/', 'manifest.json',
+            'images/logo_fusikabdj_noir.jpg', 'images/apple-touch-icon.png', 'images/favicon.ico',
+        ))
+        app.config.setdefault('SERVICE_WORKER_IMAGES', ('gallery/', 'gallery_confiance/', 'derivatives/'))
+        app.config.setdefault('SERVICE_WORKER_MAX_IMAGES', 60)
+        app.config.setdefault('SERVICE_WORKER_MAX_PAGE_AGE', 86400)
+        # Routes toujours servies par le réseau : API JSON, métriques, et les pages qui
+        # affichent un message flash (/contact après l'envoi du formulaire)
+        app.config.setdefault('SERVICE_WORKER_EXCLUDE', ('/api/', '/metrics', '/contact'))
+        # À la racine : la portée d'un service worker est limitée à son dossier
+        app.add_url_rule('/service-worker.js', 'service_worker', self.serve)
+        app.extensions['service_worker'] = self
+
+    def precache_files(self, app):
+        """Fichiers de static/ (relatifs) à précacher, triés."""
+        prefixes = tuple(app.config['SERVICE_WORKER_PRECACHE'])
+        files = []
+        for root, dirs, names in os.walk(app.static_folder):
+            dirs.sort()
+            for name in names:
+                rel = os.path.relpath(os.path.join(root, name), app.static_folder).replace(os.sep, '/')
+                # Les manifests internes (bundles CSS, déclinaisons) ne servent qu'au serveur
+                if rel.startswith(prefixes) and not name.startswith('.') \
+                        and not name.endswith(SKIPPED_SUFFIXES) and not rel.endswith('/manifest.json'):
+                    files.append(rel)
+        return sorted(files)
+
+    def context(self):
+        app = current_app._get_current_object()
+        static_url = app.static_url_path.rstrip('/') + '/'
+        assets = [url_for('static', filename=f) for f in self.precache_files(app)]
+        excluded = tuple(app.config['SERVICE_WORKER_EXCLUDE'])
+        pages = [url for url in page_urls(app) if url != request.path and not url.startswith(excluded)]
+        return {
+            'version': hashlib.sha1('\n'.join(assets + pages).encode('utf-8')).hexdigest()[:HASH_LENGTH],
+            'assets': assets,
+            'pages': pages,
+            'network_only': list(excluded),
+            'image_prefixes': [static_url + p for p in app.config['SERVICE_WORKER_IMAGES']],
+            'max_images': app.config['SERVICE_WORKER_MAX_IMAGES'],
+            'max_page_age': app.config['SERVICE_WORKER_MAX_PAGE_AGE'],
+            'hashed_pattern': r'\.[0-9a-f]{%d}\.[^./]+$' % HASH_LENGTH,
+        }
+
+    def serve(self):
+        body = render_template('service-worker.js', **self.context())
+        response = Response(body, mimetype='application/javascript')
+        # Le navigateur revalide toujours le script : une nouvelle version est vue tout de suite
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Service-Worker-Allowed'] = '/'
+        response.add_etag()
+        return response.make_conditional(request)
@@ -0,0 +1,134 @@
+"""Pool de connexions SMTP authentifiées autour de Flask-Mail.
+
+`Mail.send()` ouvre, authentifie (STARTTLS + LOGIN) puis ferme une
+connexion par message. Le pool garde quelques connexions ouvertes et les
+réutilise d'un message et d'une requête à l'autre :
+
+- une connexion inactive depuis plus de `noop_after` secondes est
+  vérifiée par un NOOP avant réutilisation ;
+- une connexion inactive depuis plus de `idle_timeout` secondes, ou qui a
+  déjà envoyé `max_messages` messages, est fermée ;
+- une connexion réutilisée qui casse pendant l'envoi est jetée et l'envoi
+  est retenté une fois sur une connexion neuve.
+"""
+import smtplib
+import threading
+import time
+
+from flask_mail import Connection
+
+
+def _is_broken(exc):
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code == 421
+    return isinstance(exc, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError))
+
+
+class _PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.last_used = time.monotonic()
+        self.sent = 0
+
+    def close(self):
+        try:
+            self.connection.host.quit()
+        except (smtplib.SMTPException, OSError):
+            self.connection.host.close()
+
+
+class SMTPPool:
+    def __init__(self, mail, size=2, idle_timeout=60.0, max_messages=50, noop_after=5.0):
+        self.mail = mail
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.noop_after = noop_after
+        self.stats = {'connects': 0, 'reused': 0, 'noops': 0, 'evicted': 0}
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        state = self.mail.state
+        if state.suppress:
+            # TESTING / MAIL_SUPPRESS_SEND : Flask-Mail n'ouvre pas de connexion
+            return self.mail.send(message)
+
+        with self._slots:
+            pooled, reused = self._acquire(state)
+            try:
+                pooled.connection.send(message)
+            except Exception as e:
+                if not _is_broken(e):
+                    # Erreur liée au message (destinataire refusé...) : la connexion reste saine
+                    self._release(pooled)
+                    raise
+                self._evict(pooled)
+                if not reused:
+                    raise
+                pooled = self._new(state)
+                try:
+                    pooled.connection.send(message)
+                except Exception:
+                    self._evict(pooled)
+                    raise
+            pooled.sent += 1
+            self._release(pooled)
+
+    def prune(self):
+        """Ferme les connexions inactives depuis plus de `idle_timeout`."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [p for p in self._idle if now - p.last_used > self.idle_timeout]
+            self._idle = [p for p in self._idle if p not in expired]
+        for pooled in expired:
+            self._evict(pooled)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._evict(pooled)
+
+    def _acquire(self, state):
+        while True:
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                return self._new(state), False
+
+            idle_for = time.monotonic() - pooled.last_used
+            if idle_for > self.idle_timeout:
+                self._evict(pooled)
+                continue
+            if idle_for > self.noop_after:
+                self.stats['noops'] += 1
+                try:
+                    healthy = pooled.connection.host.noop()[0] == 250
+                except (smtplib.SMTPException, OSError):
+                    healthy = False
+                if not healthy:
+                    self._evict(pooled)
+                    continue
+            self.stats['reused'] += 1
+            return pooled, True
+
+    def _new(self, state):
+        connection = Connection(state)
+        connection.host = connection.configure_host()
+        connection.num_emails = 0
+        self.stats['connects'] += 1
+        return _PooledConnection(connection)
+
+    def _release(self, pooled):
+        if pooled.sent >= self.max_messages:
+            self._evict(pooled)
+            return
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(pooled)
+
+    def _evict(self, pooled):
+        self.stats['evicted'] += 1
+        pooled.close()
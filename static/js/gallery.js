@@ -1,21 +1,164 @@
 document.addEventListener("DOMContentLoaded", function () {
-    // CAROUSEL AUTO-SLIDE
     const carousel = document.querySelector("#galleryCarousel");
-    if (carousel) {
+    const grid = document.querySelector("#galleryGrid");
+    const sentinel = document.querySelector("#gallerySentinel");
+    const CAROUSEL_SIZES = "(min-width: 1400px) 1296px, 100vw";
+    const THUMBNAIL_SIZES = "150px";
+
+    // Images connues (ordre de la galerie) : 1re page lue dans le HTML, suite via /api/gallery/<curseur>
+    const images = [];
+    // URL de la page suivante (curseur dans le chemin : fonctionne aussi sur l'export statique)
+    let nextUrl = grid ? grid.dataset.next : "";
+    let loading = null;
+
+    if (grid) {
+        grid.querySelectorAll(".thumbnail img").forEach((img) => images.push(describe(img)));
+    }
+
+    function describe(img) {
+        const picture = img.closest("picture");
+        return {
+            full: img.dataset.full || img.getAttribute("src"),
+            src: img.getAttribute("src"),
+            srcset: img.getAttribute("srcset"),
+            width: img.getAttribute("width"),
+            height: img.getAttribute("height"),
+            placeholder: img.getAttribute("style"),
+            sources: picture ? Array.from(picture.querySelectorAll("source")).map((source) => ({
+                type: source.type,
+                srcset: source.getAttribute("srcset"),
+            })) : [],
+        };
+    }
+
+    // Équivalent JS du helper picture() ; `lazy` : URLs posées par l'IntersectionObserver
+    function pictureElement(image, alt, sizes, className, lazy) {
+        const picture = document.createElement("picture");
+        const prefix = lazy ? "data-" : "";
+        (image.sources || []).forEach((data) => {
+            const source = document.createElement("source");
+            source.type = data.type;
+            source.setAttribute(prefix + "srcset", data.srcset);
+            source.sizes = sizes;
+            picture.appendChild(source);
+        });
+        const img = document.createElement("img");
+        img.alt = alt;
+        img.className = className;
+        img.dataset.full = image.full;
+        if (image.width) img.width = image.width;
+        if (image.height) img.height = image.height;
+        // Couleur dominante + aperçu flou (LQIP) en fond jusqu'au chargement
+        if (image.placeholder) img.style.cssText = image.placeholder;
+        if (image.srcset) {
+            img.setAttribute(prefix + "srcset", image.srcset);
+            img.sizes = sizes;
+        }
+        img.setAttribute(prefix + "src", image.src);
+        picture.appendChild(img);
+        if (lazy) lazyImages.observe(img);
+        return picture;
+    }
+
+    // LAZY LOADING : les vignettes ajoutées ne chargent qu'à l'approche du viewport
+    function reveal(img) {
+        img.closest("picture").querySelectorAll("[data-srcset], [data-src]").forEach((node) => {
+            if (node.dataset.srcset) node.srcset = node.dataset.srcset;
+            if (node.dataset.src) node.src = node.dataset.src;
+        });
+    }
+
+    const lazyImages = "IntersectionObserver" in window
+        ? new IntersectionObserver((entries, observer) => {
+            entries.forEach((entry) => {
+                if (!entry.isIntersecting) return;
+                reveal(entry.target);
+                observer.unobserve(entry.target);
+            });
+        }, { rootMargin: "200px" })
+        : { observe: reveal };
+
+    // GRILLE INCRÉMENTALE : page suivante quand la sentinelle devient visible
+    function loadPage() {
+        if (!nextUrl || !grid) return Promise.resolve(false);
+        if (loading) return loading;
+        loading = fetch(nextUrl)
+            .then((response) => response.json())
+            .then((data) => {
+                data.images.forEach((image) => {
+                    images.push(image);
+                    const thumbnail = document.createElement("div");
+                    thumbnail.className = "thumbnail m-2";
+                    thumbnail.appendChild(pictureElement(image, "Thumbnail " + image.index,
+                                                         THUMBNAIL_SIZES, "img-thumbnail", true));
+                    grid.appendChild(thumbnail);
+                });
+                nextUrl = data.next_url;
+                loading = null;
+                if (!nextUrl && pager) pager.disconnect();
+                return true;
+            })
+            .catch(() => {
+                loading = null;
+                return false;
+            });
+        return loading;
+    }
+
+    const pager = sentinel && "IntersectionObserver" in window
+        ? new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) loadPage();
+        }, { rootMargin: "400px" })
+        : null;
+    if (pager) {
+        pager.observe(sentinel);
+    } else {
+        // Sans IntersectionObserver : tout charger d'emblée
+        (function loadAll() {
+            loadPage().then((loaded) => { if (loaded && nextUrl) loadAll(); });
+        })();
+    }
+
+    // CAROUSEL : seules la diapositive courante et ses voisines sont dans le DOM
+    if (carousel && images.length) {
+        const inner = carousel.querySelector(".carousel-inner");
         let currentIndex = 0;
-        const slides = carousel.querySelectorAll(".carousel-item");
-        const totalSlides = slides.length;
 
-        function showSlide(index) {
-            slides.forEach((slide) => slide.classList.remove("active"));
-            if (slides[index]) slides[index].classList.add("active");
+        function slide(index) {
+            const existing = inner.querySelector(`.carousel-item[data-index="${index}"]`);
+            if (existing) return existing;
+            const item = document.createElement("div");
+            item.className = "carousel-item";
+            item.dataset.index = index;
+            item.appendChild(pictureElement(images[index], "Image " + (index + 1), CAROUSEL_SIZES,
+                                            "d-block w-100 carousel-image", false));
+            inner.appendChild(item);
+            return item;
         }
 
+        function mount(index) {
+            const count = images.length;
+            const keep = new Set([index, (index + 1) % count, (index - 1 + count) % count]);
+            keep.forEach((i) => slide(i).classList.toggle("active", i === index));
+            inner.querySelectorAll(".carousel-item").forEach((item) => {
+                if (!keep.has(Number(item.dataset.index))) item.remove();
+            });
+            currentIndex = index;
+        }
+
+        function showSlide(step) {
+            const target = currentIndex + step;
+            // En fin de liste connue, on charge la page suivante avant de boucler
+            const ready = target >= images.length - 1 && nextUrl ? loadPage() : Promise.resolve();
+            ready.then(() => mount((target + images.length) % images.length));
+        }
+
+        carousel.querySelectorAll("[data-gallery-slide]").forEach((button) => {
+            button.addEventListener("click", () => showSlide(button.dataset.gallerySlide === "prev" ? -1 : 1));
+        });
+        mount(0);
         setInterval(() => {
-            if (totalSlides > 0) {
-                currentIndex = (currentIndex + 1) % totalSlides;
-                showSlide(currentIndex);
-            }
+            if (!document.hidden) showSlide(1);
         }, 5000);
     }
 
@@ -35,12 +178,12 @@ document.addEventListener("DOMContentLoaded", function () {
 
     document.body.appendChild(modal);
 
-    // Ouvrir modal au clic sur image
-    document.querySelectorAll(".carousel-item img, .thumbnail img").forEach(img => {
-        img.addEventListener("click", () => {
-            modalImage.src = img.src;
-            modal.style.display = "flex";
-        });
+    // Ouvrir modal au clic sur image (délégation : les images sont ajoutées dynamiquement)
+    document.addEventListener("click", (event) => {
+        const img = event.target.closest(".carousel-item img, .thumbnail img");
+        if (!img) return;
+        modalImage.src = img.dataset.full || img.currentSrc || img.src;
+        modal.style.display = "flex";
     });
 
     // Fermer modal
@@ -1,48 +0,0 @@
-// Cache names
-const CACHE_NAME = "fusikab-dj-cache-v1";
-const urlsToCache = [
-  "/",
-  "/static/css/style.css",
-  "/static/js/gallery.js",
-  "/static/manifest.json",
-  "/",
-  "/about",
-  "/services",
-  "/gallery",
-  "/contact",
-  "/mentions"
-];
-
-// Install event
-self.addEventListener("install", (event) => {
-  event.waitUntil(
-    caches.open(CACHE_NAME).then((cache) => {
-      return cache.addAll(urlsToCache);
-    })
-  );
-});
-
-// Fetch event
-self.addEventListener("fetch", (event) => {
-  event.respondWith(
-    caches.match(event.request).then((response) => {
-      return response || fetch(event.request);
-    })
-  );
-});
-
-// Activate event
-self.addEventListener("activate", (event) => {
-  const cacheWhitelist = [CACHE_NAME];
-  event.waitUntil(
-    caches.keys().then((cacheNames) => {
-      return Promise.all(
-        cacheNames.map((cacheName) => {
-          if (!cacheWhitelist.includes(cacheName)) {
-            return caches.delete(cacheName);
-          }
-        })
-      );
-    })
-  );
-});
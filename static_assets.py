@@ -0,0 +1,93 @@
+"""URLs statiques empreintées par hash de contenu (`css/base.3f2a9c1b7e.css`).
+
+`url_for('static', filename=...)` renvoie le nom empreinté ; la route
+`static` retire l'empreinte, sert le fichier d'origine et, si l'empreinte
+correspond au contenu actuel, ajoute un cache long `immutable`. Une
+empreinte périmée (ancien déploiement) est servie avec `no-cache`.
+
+Les pages gardées par `PageCache` conservent les URLs calculées à leur
+rendu : recharger l'application après un déploiement de fichiers statiques.
+"""
+import hashlib
+import os
+import re
+import threading
+
+from flask import current_app
+
+from compression import send_static_file
+
+HASH_LENGTH = 10
+FINGERPRINT_RE = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class StaticAssets:
+    def __init__(self, app=None):
+        self._hashes = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('STATIC_FINGERPRINT', True)
+        app.config.setdefault('STATIC_IMMUTABLE_MAX_AGE', 31536000)
+        self.static_folder = app.static_folder
+        app.url_defaults(self._url_defaults)
+        app.view_functions['static'] = self.send_static_file
+        app.extensions['static_assets'] = self
+
+    def fingerprint(self, filename):
+        """Nom empreinté de `filename` (relatif à static/), ou `filename` s'il n'existe pas."""
+        path = os.path.join(self.static_folder, filename)
+        try:
+            stat = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return filename
+        cached = self._hashes.get(filename)
+        if cached is None or cached[0] != (stat.st_mtime_ns, stat.st_size):
+            cached = ((stat.st_mtime_ns, stat.st_size), file_hash(path))
+            with self._lock:
+                self._hashes[filename] = cached
+        stem, ext = os.path.splitext(filename)
+        return f'{stem}.{cached[1]}{ext}' if ext else filename
+
+    def manifest(self):
+        """Table {fichier: fichier empreinté} de tout le contenu de static/."""
+        result = {}
+        for root, _, files in os.walk(self.static_folder):
+            for name in files:
+                if name.startswith('.'):
+                    continue
+                rel = os.path.relpath(os.path.join(root, name), self.static_folder)
+                rel = rel.replace(os.sep, '/')
+                result[rel] = self.fingerprint(rel)
+        return dict(sorted(result.items()))
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint == 'static' and current_app.config['STATIC_FINGERPRINT'] and 'filename' in values:
+            values['filename'] = self.fingerprint(values['filename'])
+
+    def send_static_file(self, filename):
+        app = current_app._get_current_object()
+        match = FINGERPRINT_RE.match(filename)
+        if match is not None:
+            original = match.group('stem') + match.group('ext')
+            if os.path.isfile(os.path.join(self.static_folder, original)):
+                response = send_static_file(original)
+                if self.fingerprint(original) == filename:
+                    response.cache_control.no_cache = None
+                    response.cache_control.public = True
+                    response.cache_control.max_age = app.config['STATIC_IMMUTABLE_MAX_AGE']
+                    response.cache_control.immutable = True
+                else:
+                    response.cache_control.no_cache = True
+                return response
+        return send_static_file(filename)
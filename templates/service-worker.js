@@ -0,0 +1,109 @@
+// Service worker généré par service_worker.py : ne pas éditer la version à la main.
+// Version = hash du contenu des fichiers précachés ; une nouvelle version purge les anciens caches.
+const VERSION = {{ version|tojson }};
+const PRECACHE = `fusikab-precache-${VERSION}`;
+const PAGES = `fusikab-pages-${VERSION}`;
+const IMAGES = "fusikab-images";
+
+const PRECACHE_URLS = {{ assets|tojson }};
+const PAGE_URLS = {{ pages|tojson }};
+const IMAGE_PREFIXES = {{ image_prefixes|tojson }};
+// Jamais mis en cache : messages flash, jetons de formulaire, réponses dynamiques
+const NETWORK_ONLY = {{ network_only|tojson }};
+const MAX_IMAGES = {{ max_images|tojson }};
+// Au-delà, une page en cache n'est plus servie avant le réseau
+const MAX_PAGE_AGE = {{ max_page_age|tojson }} * 1000;
+const HASHED_ASSET = new RegExp({{ hashed_pattern|tojson }});
+
+// Install : un fichier absent ne doit pas faire échouer toute l'installation
+self.addEventListener("install", (event) => {
+  const precache = (name, urls) =>
+    caches.open(name).then((cache) =>
+      Promise.all(urls.map((url) => cache.add(url).catch(() => console.warn("Précache impossible :", url))))
+    );
+  event.waitUntil(
+    Promise.all([precache(PRECACHE, PRECACHE_URLS), precache(PAGES, PAGE_URLS)]).then(() => self.skipWaiting())
+  );
+});
+
+// Activate : suppression des caches des versions précédentes
+self.addEventListener("activate", (event) => {
+  const keep = [PRECACHE, PAGES, IMAGES];
+  event.waitUntil(
+    caches.keys()
+      .then((names) => Promise.all(names.filter((name) => !keep.includes(name)).map((name) => caches.delete(name))))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin
+      || NETWORK_ONLY.some((prefix) => url.pathname.startsWith(prefix))) {
+    return;
+  }
+  if (IMAGE_PREFIXES.some((prefix) => url.pathname.startsWith(prefix))) {
+    event.respondWith(cacheFirstLru(request));
+  } else if (HASHED_ASSET.test(url.pathname)) {
+    event.respondWith(cacheFirst(request));
+  } else if (request.mode === "navigate" || (request.headers.get("Accept") || "").includes("text/html")) {
+    event.respondWith(staleWhileRevalidate(event, request));
+  }
+});
+
+// Fichiers empreintés : immuables, le cache fait foi
+function cacheFirst(request) {
+  return caches.match(request).then((cached) => cached || fetch(request).then((response) => {
+    if (response.ok) {
+      const copy = response.clone();
+      caches.open(PRECACHE).then((cache) => cache.put(request, copy));
+    }
+    return response;
+  }));
+}
+
+// Pages : réponse immédiate depuis le cache, rafraîchie en arrière-plan
+function staleWhileRevalidate(event, request) {
+  return caches.open(PAGES).then((cache) => cache.match(request).then((cached) => {
+    const network = fetch(request).then((response) => {
+      if (response.ok && !(response.headers.get("Cache-Control") || "").includes("no-store")) {
+        cache.put(request, response.clone());
+      }
+      return response;
+    });
+    if (cached && !isExpired(cached)) {
+      event.waitUntil(network.catch(() => undefined));
+      return cached;
+    }
+    return network.catch(() => cached || Response.error());
+  }));
+}
+
+function isExpired(response) {
+  const date = Date.parse(response.headers.get("Date") || "");
+  return !date || Date.now() - date > MAX_PAGE_AGE;
+}
+
+// Images de la galerie : cache d'exécution limité à MAX_IMAGES entrées (LRU)
+function cacheFirstLru(request) {
+  return caches.open(IMAGES).then((cache) => cache.match(request).then((cached) => {
+    if (cached) {
+      // Réinsertion : l'entrée redevient la plus récente
+      cache.delete(request).then(() => cache.put(request, cached.clone()));
+      return cached;
+    }
+    return fetch(request).then((response) => {
+      if (response.ok) {
+        cache.put(request, response.clone()).then(() => trim(cache));
+      }
+      return response;
+    });
+  }));
+}
+
+function trim(cache) {
+  return cache.keys().then((keys) =>
+    Promise.all(keys.slice(0, Math.max(0, keys.length - MAX_IMAGES)).map((key) => cache.delete(key)))
+  );
+}
@@ -13,7 +13,7 @@ def test_user_main_flow(live_server, page: Page):
         link = page.locator(selector)
         if link.count():
             link.first.click()
-            expect(page).to_have_url(re.compile(r"127\.0\.0\.1:5000"))
+            expect(page).to_have_url(re.compile(re.escape(base)))
             page.go_back()
 
     nav = page.locator("nav")
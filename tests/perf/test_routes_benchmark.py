@@ -0,0 +1,65 @@
+"""Micro-benchmarks des routes via le client de test (pytest-benchmark).
+
+Désactivés par défaut (`tests/conftest.py`, si le plugin est installé) :
+chaque route est alors appelée une fois, comme un test de fumée. Pour mesurer, enregistrer
+le run sous le commit courant et le comparer au précédent :
+
+    pytest tests/perf --benchmark-enable --benchmark-autosave \\
+        --benchmark-compare --benchmark-compare-fail=mean:25%
+
+- `warm` : page servie par le cache de pages (cas nominal) ;
+- `cold` : cache de pages et index d'images vidés avant chaque appel
+  (scan des dossiers + rendu Jinja complet) ;
+- `contact_post` : formulaire complet, mails interceptés avant l'outbox.
+"""
+import itertools
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app import app as flask_app  # noqa: E402
+from freeze import page_urls  # noqa: E402
+from rate_limit import MemoryBackend  # noqa: E402
+
+URLS = list(page_urls(flask_app))
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_warm(benchmark, client, url):
+    client.get(url)
+    resp = benchmark(client.get, url)
+    assert resp.status_code == 200
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_cold(benchmark, client, url):
+    def reset():
+        flask_app.extensions['page_cache'].clear()
+        flask_app.extensions['image_index'].reload()
+
+    resp = benchmark.pedantic(client.get, args=(url,), setup=reset, rounds=20, warmup_rounds=1)
+    assert resp.status_code == 200
+
+
+def test_contact_post(benchmark, client, app, monkeypatch):
+    queued = []
+    monkeypatch.setattr(app.extensions["mailer"], "enqueue", lambda *p: queued.extend(p))
+    monkeypatch.setattr(app.extensions["rate_limiter"], "backend", MemoryBackend())
+    monkeypatch.setitem(app.config, "CONTACT_RATE_LIMIT_IP", (10 ** 9, 1))
+    monkeypatch.setitem(app.config, "CONTACT_RATE_LIMIT_EMAIL", (10 ** 9, 1))
+    counter = itertools.count()
+
+    def post():
+        # Contenu unique à chaque appel : sinon l'anti-doublon court-circuite l'envoi
+        n = next(counter)
+        return client.post("/contact", data={
+            "nom": "Dupont", "prenom": "Alice", "email": f"alice{n}@example.com",
+            "telephone": "0600000000", "code_postal": "35000", "event_date": "2026-06-13",
+            "location": "Rennes", "contact_method": "email", "demande": f"Demande {n}",
+            "besoin[]": ["sonorisation", "lyres"], "idempotency_key": f"bench-{n}",
+        })
+
+    resp = benchmark(post)
+    assert resp.status_code == 302
+    assert len(queued) == 2 * (next(counter))
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+from bs4 import BeautifulSoup
+from flask import url_for
+
+from app import create_app
+
+
+def test_create_app_builds_independent_apps(app, tmp_path):
+    other = create_app({"TESTING": True, "GALLERY_PAGE_SIZE": 3,
+                        "OUTBOX_PATH": str(tmp_path / "outbox.sqlite3")})
+    assert other is not app
+    assert other.extensions["page_cache"] is not app.extensions["page_cache"]
+    assert app.config["GALLERY_PAGE_SIZE"] != 3
+
+    soup = BeautifulSoup(other.test_client().get("/gallery").data, "html.parser")
+    assert len(soup.select("#galleryGrid .thumbnail img")) == 3
+
+
+def test_blueprint_endpoints(app):
+    slug = app.extensions["partner_catalog"].partners[0]["slug"]
+    with app.test_request_context():
+        assert url_for("legal.cgv") == "/cgv"
+        assert url_for("services.sonorisation") == "/sonorisation"
+        assert url_for("partenaires.partenaire", slug=slug) == f"/{slug}"
+        assert url_for("contact.contact") == "/contact"
+
+
+def test_mail_stack_is_not_imported_at_startup():
+    code = "import sys, app; print([m for m in ('flask_mail', 'smtp_pool', 'emails') if m in sys.modules])"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
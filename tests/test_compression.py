@@ -0,0 +1,48 @@
+import gzip
+
+import brotli
+from flask import Flask
+
+from compression import Compression, precompress, send_static_file
+
+
+def test_html_is_compressed_with_weak_etag(client):
+    plain = client.get("/cgv")
+    resp = client.get("/cgv", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert gzip.decompress(resp.get_data()) == plain.get_data()
+    assert resp.headers["ETag"] == "W/" + plain.headers["ETag"]
+
+    again = client.get("/cgv", headers={"Accept-Encoding": "gzip",
+                                        "If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_brotli_preferred(client):
+    resp = client.get("/cgv", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(resp.get_data()).startswith(b"<!DOCTYPE html>")
+
+
+def test_precompressed_static_variant(tmp_path):
+    (tmp_path / "site.css").write_text("body { color: black; }\n" * 200)
+    report = precompress(str(tmp_path))
+    raw, sizes = report["site.css"]
+    assert sizes["br"] < raw and sizes["gzip"] < raw
+
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path="/static")
+    Compression(app)
+    app.view_functions["static"] = send_static_file
+    client = app.test_client()
+
+    resp = client.get("/static/site.css", headers={"Accept-Encoding": "br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert resp.mimetype == "text/css"
+    assert brotli.decompress(resp.get_data()) == (tmp_path / "site.css").read_bytes()
+    resp.close()
+
+    identity = client.get("/static/site.css")
+    assert "Content-Encoding" not in identity.headers
+    assert "Accept-Encoding" in identity.headers["Vary"]
+    identity.close()
@@ -0,0 +1,53 @@
+from flask import Flask, render_template_string
+
+from css_bundles import CSSBundles, build, critical_css, minify
+
+PAGE = """<!DOCTYPE html><html><head>
+{% set styles = page_styles() %}
+{% if styles %}<style>{{ styles.critical }}</style><link rel="preload" href="{{ styles.href }}">
+{% else %}<link rel="stylesheet" href="{{ url_for('static', filename='css/base.css') }}">
+<link rel="stylesheet" href="{{ url_for('static', filename='css/page.css') }}">{% endif %}
+</head><body><nav class="menu">Menu</nav><footer class="bas">Bas</footer></body></html>"""
+
+
+def test_minify_keeps_strings():
+    css = "/* titre */\na {\n  content: ' a  b ';\n  color: red; /* note */\n}\n"
+    assert minify(css) == "a{content:' a  b ';color:red}"
+
+
+def test_minify_keeps_selector_spacing():
+    assert minify(".x :is( .a, .b ) :hover { color: red }") == ".x :is( .a,.b ) :hover{color:red}"
+    assert minify("@media (max-width: 600px) { a :focus { margin: 0 } }") == \
+        "@media (max-width:600px){a :focus{margin:0}}"
+
+
+def test_critical_css_keeps_above_the_fold_rules():
+    css = minify(".menu{color:red}.bas{color:blue}@media (max-width: 600px){.menu a{margin:0}}")
+    assert critical_css(css, {"nav", "a"}, {"menu"}, set()) == \
+        ".menu{color:red}@media (max-width:600px){.menu a{margin:0}}"
+
+
+def test_build_bundles_and_inlines_critical_css(tmp_path):
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    (static / "css/base.css").write_text("body { margin: 0; }\n.menu { color: red; }\n")
+    (static / "css/page.css").write_text(".bas { color: blue; }\n.fond { background: url(../img/f.png); }\n")
+
+    app = Flask(__name__, static_folder=str(static))
+    app.config["CSS_CRITICAL_ELEMENTS"] = 1
+    CSSBundles(app)
+
+    @app.route("/")
+    def index():
+        return render_template_string(PAGE)
+
+    manifest = build(app)
+    entry = manifest["index"]
+    assert entry["sources"] == ["css/base.css", "css/page.css"]
+    assert (static / entry["href"]).read_text() == \
+        "body{margin:0}.menu{color:red}.bas{color:blue}.fond{background:url('/static/img/f.png')}"
+    assert entry["critical"] == "body{margin:0}.menu{color:red}"
+
+    html = app.test_client().get("/").get_data(as_text=True)
+    assert "<style>body{margin:0}.menu{color:red}</style>" in html
+    assert 'rel="stylesheet"' not in html
@@ -0,0 +1,43 @@
+import email
+
+from emails import LOGO_CID, render_email
+
+CONTEXT = dict(nom="Dupont", prenom="<script>alert(1)</script>", email="alice@example.com",
+               telephone="0600000000", code_postal="35000", event_date="14/02/2026",
+               location="Rennes", contact_method="email", demande="Ligne 1\nLigne 2",
+               besoins=["🔊 Sonorisation"])
+
+
+def test_user_input_is_escaped(app):
+    with app.test_request_context():
+        html, text = render_email("contact_admin", **CONTEXT)
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+    assert "Ligne 1<br>Ligne 2" in html
+    assert "<script>alert(1)</script>" in text
+    assert f'src="cid:{LOGO_CID}"' in html
+
+
+def test_logo_is_inline_related_part(app):
+    with app.test_request_context():
+        html, text = render_email("contact_user", **CONTEXT)
+        msg = app.extensions["mailer"].message(subject="Test", sender="site@example.com",
+                                               recipients=["alice@example.com"], html=html, body=text,
+                                               inline=["logo"])
+        parsed = email.message_from_bytes(msg.as_bytes())
+
+    assert parsed.get_content_type() == "multipart/related"
+    types = [part.get_content_type() for part in parsed.walk()]
+    assert types[1:] == ["multipart/alternative", "text/plain", "text/html", "image/jpeg"]
+    assert parsed.get_payload()[-1]["Content-ID"] == f"<{LOGO_CID}>"
+
+
+def test_logo_is_encoded_once_at_startup(app):
+    mailer = app.extensions["mailer"]
+    part = mailer.inline_parts["logo"]
+    assert part["Content-ID"] == f"<{LOGO_CID}>"
+    with app.test_request_context():
+        messages = [mailer.message(subject="Test", sender="site@example.com",
+                                   recipients=["alice@example.com"], body="Bonjour", inline=["logo"])
+                    for _ in range(2)]
+    assert all(msg.inline[0] is part for msg in messages)
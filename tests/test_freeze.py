@@ -0,0 +1,71 @@
+import json
+
+import pytest
+from flask import Flask
+
+from freeze import FreezeError, freeze
+from static_assets import StaticAssets
+
+
+def _site(tmp_path, link):
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    (static / "css/site.css").write_text("body { background: url('../img/fond.png'); }")
+    (static / "img").mkdir()
+    (static / "img/fond.png").write_bytes(b"png")
+
+    app = Flask(__name__, static_folder=str(static))
+    StaticAssets(app)
+
+    @app.route("/")
+    def index():
+        from flask import url_for
+        return f'<link rel="stylesheet" href="{url_for("static", filename="css/site.css")}">' \
+               f'<a href="{link}">lien</a>'
+
+    @app.route("/about")
+    def about():
+        return "À propos"
+
+    return app
+
+
+def test_freeze_writes_pretty_urls_and_assets(tmp_path):
+    out = tmp_path / "dist"
+    result = freeze(_site(tmp_path, "/about"), str(out))
+
+    assert result["pages"] == ["/", "/about"]
+    assert (out / "index.html").exists()
+    assert (out / "about/index.html").read_text() == "À propos"
+    assert list((out / "static/css").glob("site.*.css"))
+    assert (out / "static/img/fond.png").exists()
+
+
+def test_freeze_fails_on_broken_link(tmp_path):
+    with pytest.raises(FreezeError) as excinfo:
+        freeze(_site(tmp_path, "/absente"), str(tmp_path / "dist"))
+    assert excinfo.value.broken == [("/", "/absente")]
+
+
+def test_freeze_follows_paginated_api(tmp_path):
+    app = _site(tmp_path, "/about")
+
+    @app.route("/list")
+    def listing():
+        return '<div data-next="/api/items/2"></div>'
+
+    @app.route("/api/items")
+    @app.route("/api/items/<int:page>")
+    def items(page=1):
+        from flask import jsonify, url_for
+        return jsonify({"image": url_for("static", filename="img/fond.png"),
+                        "next_url": url_for("items", page=page + 1) if page < 3 else None})
+
+    out = tmp_path / "dist"
+    result = freeze(app, str(out))
+
+    # Chaque page appelée est écrite à son chemin ; /api/items (curseur en query string) ne l'est pas
+    assert "/api/items" not in result["pages"]
+    assert json.loads((out / "api/items/2").read_text())["next_url"] == "/api/items/3"
+    assert json.loads((out / "api/items/3").read_text())["next_url"] is None
+    assert (out / "static/img/fond.png").exists()
@@ -0,0 +1,56 @@
+from bs4 import BeautifulSoup
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+
+def test_paginate_with_cursor():
+    items = ("a", "b", "c", "d", "e")
+    start, page, cursor = paginate(items, limit=2)
+    assert (start, page) == (0, ("a", "b"))
+    assert decode_cursor(cursor) == "b"
+    assert paginate(items, cursor, limit=2)[:2] == (2, ("c", "d"))
+    assert paginate(items, encode_cursor("d"), limit=2) == (4, ("e",), None)
+
+
+def test_paginate_rejects_invalid_cursor():
+    for cursor in ("%%%", encode_cursor(3)):
+        try:
+            paginate(("a",), cursor)
+        except InvalidCursor:
+            continue
+        raise AssertionError(cursor)
+
+
+def test_api_gallery_walks_every_image_once(app, client):
+    names, cursor = [], None
+    while True:
+        url = "/api/gallery?limit=5" + (f"&cursor={cursor}" if cursor else "")
+        data = client.get(url).get_json()
+        names += [image["name"] for image in data["images"]]
+        assert all(image["full"].startswith("/static/gallery/") for image in data["images"])
+        cursor = data["next"]
+        if cursor is None:
+            break
+    image_index, image_metadata = app.extensions["image_index"], app.extensions["image_metadata"]
+    assert names == list(image_metadata.order("gallery", image_index.images("gallery")))
+    assert len(names) == len(set(names)) > 5
+    assert client.get("/api/gallery?cursor=%%%").status_code == 400
+
+
+def test_api_gallery_cursor_in_path(client):
+    first = client.get("/api/gallery?limit=5").get_json()
+    assert first["next_url"] == f"/api/gallery/{first['next']}?limit=5"
+    # Même page par le chemin ou par ?cursor= : le chemin seul suffit à un hébergement statique
+    by_path = client.get(first["next_url"]).get_json()
+    by_query = client.get(f"/api/gallery?limit=5&cursor={first['next']}").get_json()
+    assert by_path == by_query
+    assert by_path["images"][0]["index"] == 6
+    assert client.get("/api/gallery/%%%").status_code == 400
+
+
+def test_gallery_page_renders_first_page_only(app, client):
+    soup = BeautifulSoup(client.get("/gallery").data, "html.parser")
+    grid = soup.find(id="galleryGrid")
+    assert len(grid.select(".thumbnail img")) == app.config["GALLERY_PAGE_SIZE"]
+    assert grid["data-next"].startswith("/api/gallery/")
+    assert len(soup.select("#galleryCarousel .carousel-item")) == 1
@@ -0,0 +1,72 @@
+import json
+import random
+
+from PIL import Image, ImageDraw
+
+import image_dedup
+from image_dedup import BKTree, DuplicateIndex, hamming
+
+
+def _scene(size, seed):
+    rnd = random.Random(seed)
+    img = Image.new("RGB", size, (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rnd.randrange(size[0]), rnd.randrange(size[1])
+        draw.ellipse((x, y, x + size[0] // 4, y + size[1] // 4),
+                     fill=(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)))
+    return img
+
+
+def test_bk_tree_matches_brute_force():
+    rnd = random.Random(1)
+    keys = [rnd.getrandbits(64) for _ in range(300)]
+    tree = BKTree()
+    for i, key in enumerate(keys):
+        tree.add(key, i)
+    for probe in keys[:20]:
+        expected = {i for i, key in enumerate(keys) if hamming(probe, key) <= 18}
+        assert {i for _, i in tree.search(probe, 18)} == expected
+
+
+def test_near_duplicates_are_hidden_and_originals_recompressed(tmp_path):
+    gallery = tmp_path / "gallery"
+    gallery.mkdir()
+    original = _scene((800, 600), seed=1)
+    original.save(gallery / "soiree.jpg", quality=100)
+    original.resize((400, 300)).save(gallery / "soiree (1).jpg", quality=70)
+    _scene((800, 600), seed=2).save(gallery / "autre.jpg", quality=100)
+
+    report = image_dedup.run(str(tmp_path), workers=1, dry_run=True, out=lambda *a: None)
+    assert report["groups"] == [["gallery/soiree.jpg", "gallery/soiree (1).jpg"]]
+    assert report["hidden"] == {"gallery/soiree (1).jpg": "gallery/soiree.jpg"}
+    assert report["saved"] > 0
+    # Dry-run : rien n'est écrit
+    assert not (tmp_path / "derivatives/duplicates.json").exists()
+    assert not (tmp_path / "derivatives/metadata.json").exists()
+    before = (gallery / "soiree.jpg").read_bytes()
+
+    report = image_dedup.run(str(tmp_path), workers=1, out=lambda *a: None)
+    assert report["written"] >= 1
+    assert len((gallery / "soiree.jpg").read_bytes()) < len(before)
+    with Image.open(gallery / "soiree.jpg") as img:
+        assert img.size == (800, 600)
+        assert image_dedup.psnr(original, img.convert("RGB")) >= 39
+    assert DuplicateIndex(str(tmp_path)).hidden("gallery/soiree (1).jpg")
+
+    # Originaux recompressés : le manifest est périmé, un dry-run ne le réécrit pas
+    metadata = (tmp_path / "derivatives/metadata.json").read_bytes()
+    image_dedup.run(str(tmp_path), workers=1, dry_run=True, out=lambda *a: None)
+    assert (tmp_path / "derivatives/metadata.json").read_bytes() == metadata
+
+
+def test_gallery_skips_hidden_duplicates(app, client, tmp_path, monkeypatch):
+    first, second = [image["name"] for image in client.get("/api/gallery?limit=2").get_json()["images"]]
+    index = DuplicateIndex(str(tmp_path))
+    (tmp_path / "derivatives").mkdir()
+    with open(index.path, "w") as f:
+        json.dump({f"gallery/{second}": f"gallery/{first}"}, f)
+    monkeypatch.setitem(app.extensions, "duplicates", index)
+
+    names = [image["name"] for image in client.get("/api/gallery?limit=48").get_json()["images"]]
+    assert first in names and second not in names
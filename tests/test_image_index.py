@@ -0,0 +1,26 @@
+import os
+
+from image_index import ImageIndex
+
+
+def test_index_is_sorted_and_filtered(tmp_path):
+    for name in ("b.jpg", "a.PNG", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    index = ImageIndex(str(tmp_path))
+    assert index.images(".") == ("a.PNG", "b.jpg")
+
+
+def test_index_refreshes_on_mtime_change(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"")
+    index = ImageIndex(str(tmp_path))
+    assert index.images(".") == ("a.jpg",)
+
+    (tmp_path / "b.jpg").write_bytes(b"")
+    stat = os.stat(tmp_path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert index.images(".") == ("a.jpg", "b.jpg")
+
+
+def test_missing_partner_directory_is_404(client):
+    resp = client.get("/partenaire2_chateau")
+    assert resp.status_code == 404
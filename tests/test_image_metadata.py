@@ -0,0 +1,59 @@
+import os
+
+from PIL import Image
+
+import image_metadata
+import responsive_images
+
+
+def _gallery():
+    exif = Image.Exif()
+    exif[image_metadata.EXIF_DATETIME] = "2023:05:01 10:00:00"
+    return {
+        "gallery/z-exif.jpg": (Image.new("RGB", (400, 300), "red"), {"exif": exif}),
+        "gallery/PHOTO-2021-02-03-04-05-06.jpg": Image.new("RGB", (300, 400), "blue"),
+        "gallery/a-logo.png": Image.new("RGBA", (50, 50), (0, 0, 0, 0)),
+    }
+
+
+def test_build_records_metadata_incrementally(make_static):
+    static = make_static(_gallery())
+    assert image_metadata.build(str(static), workers=1)["analysed"] == 3
+
+    manifest = image_metadata.read_metadata(str(static / "derivatives/metadata.json"))
+    exif = manifest["gallery/z-exif.jpg"]
+    assert (exif["width"], exif["height"], exif["taken"]) == (400, 300, "2023-05-01T10:00:00")
+    assert exif["color"] == "#fe0000"
+    assert exif["lqip"].startswith("data:image/")
+    assert len(exif["phash"]) == len(exif["dhash"]) == 16
+    assert manifest["gallery/PHOTO-2021-02-03-04-05-06.jpg"]["taken"] == "2021-02-03T04:05:06"
+    assert manifest["gallery/a-logo.png"]["lqip"] is None
+
+    # Même contenu, mtime changé : pas de réanalyse (contrôle par hash)
+    os.utime(static / "gallery/z-exif.jpg", ns=(1, 1))
+    assert image_metadata.build(str(static), workers=1) == {"analysed": 0, "skipped": 3, "removed": 0}
+
+    (static / "gallery/a-logo.png").unlink()
+    assert image_metadata.build(str(static), workers=1)["removed"] == 1
+
+
+def test_order_is_chronological_then_by_name(make_static):
+    static = make_static(_gallery())
+    image_metadata.build(str(static), workers=1)
+    metadata = image_metadata.ImageMetadata(str(static))
+    names = sorted(os.listdir(static / "gallery"))
+    assert metadata.order("gallery", names) == (
+        "PHOTO-2021-02-03-04-05-06.jpg", "z-exif.jpg", "a-logo.png")
+
+
+def test_picture_emits_dimensions_and_placeholder(app, make_static):
+    static = make_static(_gallery())
+    image_metadata.build(str(static), workers=1)
+    helper = responsive_images.ResponsiveImages(metadata=image_metadata.ImageMetadata(str(static)))
+    helper.manifest_path = str(static / "derivatives/manifest.json")
+
+    with app.test_request_context():
+        html = helper.picture("gallery/z-exif.jpg", "Photo")
+
+    assert 'width="400" height="300"' in html
+    assert 'style="background:#' in html and "url(data:image/" in html
@@ -0,0 +1,70 @@
+import threading
+
+from flask import Flask, render_template_string
+
+from image_index import ImageIndex
+from metrics import Metrics, Registry
+
+
+def test_counters_are_summed_across_threads():
+    registry = Registry()
+    hits = registry.counter("hits", "Hits", ("route",))
+
+    def work():
+        for _ in range(1000):
+            hits.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    hits.inc("b", amount=2)
+    # Les threads terminés sont repliés dans le total, une seule fois
+    assert registry.collect() == {(hits, ("a",)): 4000, (hits, ("b",)): 2}
+    assert registry.collect()[(hits, ("a",))] == 4000
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latence", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, "x")
+    lines = registry.render(extra_labels=(("pid", 1),)).splitlines()
+    assert 'latency_seconds_bucket{route="x",le="0.1",pid="1"} 1' in lines
+    assert 'latency_seconds_bucket{route="x",le="1.0",pid="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="x",le="+Inf",pid="1"} 4' in lines
+    assert 'latency_seconds_count{route="x",pid="1"} 4' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+
+
+def test_metrics_endpoint_is_opt_in():
+    disabled = Flask(__name__)
+    Metrics(disabled)
+    assert disabled.test_client().get("/metrics").status_code == 404
+
+    app = Flask(__name__)
+    app.config["METRICS_ENABLED"] = True
+    Metrics(app)
+
+    @app.route("/metrics-probe")
+    def metrics_probe():
+        return render_template_string("{{ 1 + 1 }}")
+
+    client = app.test_client()
+    client.get("/metrics-probe")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = resp.get_data(as_text=True)
+    assert 'http_requests_total{endpoint="metrics_probe",method="GET",status="200"' in text
+    assert 'template_render_seconds_count{template="<string>"' in text
+
+
+def test_directory_scans_are_reported(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"")
+    scans = []
+    index = ImageIndex(str(tmp_path), on_scan=lambda subdir, seconds: scans.append(subdir))
+    index.images(".")
+    index.images(".")
+    assert scans == ["."]
@@ -0,0 +1,75 @@
+import os
+import time
+
+from outbox import Outbox, OutboxWorker, SENT, DEAD
+
+
+def test_messages_survive_reopen(tmp_path):
+    path = str(tmp_path / "outbox.sqlite3")
+    Outbox(path).enqueue({"subject": "a"}, {"subject": "b"})
+    assert Outbox(path).counts() == {"pending": 2}
+
+
+def test_worker_sends_and_marks_sent(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"))
+    outbox.enqueue({"subject": "a"})
+    sent = []
+    assert OutboxWorker(outbox, sent.append).drain() == 1
+    assert sent == [{"subject": "a"}]
+    assert outbox.counts() == {SENT: 1}
+
+
+def test_failures_back_off_then_go_dead(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.sqlite3"), max_attempts=2, backoff=60)
+    outbox.enqueue({"subject": "a"})
+
+    def boom(payload):
+        raise OSError("SMTP indisponible")
+
+    worker = OutboxWorker(outbox, boom)
+    assert worker.drain() == 1
+    # Relance planifiée dans le futur : rien n'est dû immédiatement
+    assert worker.drain() == 0
+    assert outbox.next_due() > time.time() + 30
+
+    message_id = 1
+    assert outbox.mark_failed(message_id, "encore") == DEAD
+    assert outbox.counts() == {DEAD: 1}
+
+
+def test_contact_post_is_queued(client, app, monkeypatch):
+    queued = []
+    monkeypatch.setattr(app.extensions["mailer"], "enqueue", lambda *p: queued.extend(p))
+    resp = client.post("/contact", data={"prenom": "Alice", "email": "alice@example.com"})
+    assert resp.status_code == 302
+    assert [m["recipients"] for m in queued][1] == ["alice@example.com"]
+
+
+def test_tests_never_use_the_real_outbox(app):
+    outbox_path = os.path.abspath(app.extensions["mailer"].outbox.path)
+    assert not outbox_path.startswith(os.path.abspath(app.instance_path) + os.sep)
+    assert app.config["MAIL_SUPPRESS_SEND"]
+
+
+def test_pending_mail_is_sent_at_startup_without_new_post(tmp_path):
+    from app import create_app
+
+    # Message resté en file avant un redémarrage
+    path = str(tmp_path / "outbox.sqlite3")
+    Outbox(path).enqueue({"subject": "En attente", "recipients": ["alice@example.com"],
+                          "sender": "site@example.com", "body": "Bonjour"})
+
+    app = create_app({"TESTING": True, "MAIL_SUPPRESS_SEND": True, "OUTBOX_PATH": path})
+    outbox = app.extensions["mailer"].outbox
+    deadline = time.monotonic() + 10
+    while outbox.counts() != {SENT: 1} and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert outbox.counts() == {SENT: 1}
+
+
+def test_gunicorn_starts_the_outbox_worker_after_fork():
+    import runpy
+
+    config = runpy.run_path("gunicorn.conf.py")
+    assert os.environ.pop("OUTBOX_AUTOSTART") == "0"
+    assert callable(config["post_fork"])
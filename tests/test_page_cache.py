@@ -0,0 +1,40 @@
+import os
+
+from flask import Flask
+
+from page_cache import PageCache
+
+
+def test_static_page_has_validators(client):
+    resp = client.get("/cgv")
+    assert resp.status_code == 200
+    assert resp.headers["ETag"]
+    assert resp.headers["Last-Modified"]
+    assert "max-age" in resp.headers["Cache-Control"]
+
+    again = client.get("/cgv", headers={"If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+
+
+def test_cache_invalidated_when_parent_template_changes(tmp_path):
+    (tmp_path / "base.html").write_text("<title>{% block t %}{% endblock %}</title>v1")
+    (tmp_path / "page.html").write_text('{% extends "base.html" %}{% block t %}Page{% endblock %}')
+    app = Flask(__name__, template_folder=str(tmp_path))
+    app.config["TEMPLATES_AUTO_RELOAD"] = True
+    cache = PageCache(app)
+    app.add_url_rule("/page", "page", lambda: cache.render("page.html"))
+    client = app.test_client()
+
+    first = client.get("/page")
+    assert first.get_data() == b"<title>Page</title>v1"
+    assert client.get("/page").headers["ETag"] == first.headers["ETag"]
+
+    base = tmp_path / "base.html"
+    base.write_text("<title>{% block t %}{% endblock %}</title>v2")
+    stat = os.stat(base)
+    os.utime(base, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = client.get("/page")
+    assert second.get_data() == b"<title>Page</title>v2"
+    assert second.headers["ETag"] != first.headers["ETag"]
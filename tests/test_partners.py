@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from partners import CatalogError, PartnerCatalog
+
+
+def _catalog(tmp_path, partners, categories=({"id": "lieux", "name": "Lieux"},)):
+    path = tmp_path / "partenaires.json"
+    path.write_text(json.dumps({"categories": list(categories), "partners": partners}))
+    return path
+
+
+def _partner(slug="salle", **extra):
+    return dict({"slug": slug, "name": "Salle", "category": "lieux",
+                 "summary": "Une salle.", "images": f"images/{slug}"}, **extra)
+
+
+def test_slides_are_listed_once_in_natural_order(tmp_path):
+    folder = tmp_path / "static" / "images" / "salle"
+    folder.mkdir(parents=True)
+    for name in ("logo.jpg", "salle10.jpg", "salle2.jpg", "salle9.jpg", "notes.txt"):
+        (folder / name).write_bytes(b"")
+    catalog = PartnerCatalog.load(_catalog(tmp_path, [_partner()]), str(tmp_path / "static"))
+
+    partner = catalog.get("salle")
+    assert partner["slides"] == ("images/salle/salle2.jpg", "images/salle/salle9.jpg", "images/salle/salle10.jpg")
+    assert partner["logo"] == "images/salle/logo.jpg"
+    assert catalog.categories[0]["partners"] == (partner,)
+    assert catalog.get("inconnu") is None
+
+
+def test_invalid_catalog_reports_every_error(tmp_path):
+    (tmp_path / "static").mkdir()
+    path = _catalog(tmp_path, [_partner("absent"), _partner("autre", category="traiteurs"), {"slug": "vide"}])
+    with pytest.raises(CatalogError) as excinfo:
+        PartnerCatalog.load(path, str(tmp_path / "static"))
+    message = str(excinfo.value)
+    assert "absent : dossier d'images introuvable" in message
+    assert "autre : catégorie inconnue" in message
+    assert "vide : champ(s) manquant(s)" in message
+
+
+def test_partner_pages_render_existing_images_only(app, client):
+    for partner in app.extensions["partner_catalog"].partners:
+        resp = client.get(f"/{partner['slug']}")
+        assert resp.status_code == 200
+        html = resp.get_data(as_text=True)
+        assert partner["name"] in html
+        assert html.count('class="carousel-item') == len(partner["slides"])
+
+
+def test_unknown_partner_is_404(client):
+    assert client.get("/partenaire3_photographe").status_code == 404
+
+
+def test_partner_index_lists_catalog(client):
+    html = client.get("/partenaires").get_data(as_text=True)
+    assert 'href="/partenaire1_sallele5B"' in html
+    assert "recherche de partenaires photographes" in html
+
+
+def test_partner_pages_are_frozen(app):
+    from freeze import page_urls
+
+    assert {"/partenaire1_sallele5B", "/partenaire2_nozchantepie"} <= set(page_urls(app))
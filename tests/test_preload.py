@@ -0,0 +1,63 @@
+from preload import Preload, stylesheet_fonts, template_assets, view_templates
+
+
+def test_view_templates(app):
+    assert view_templates(app.view_functions["main.index"]) == ["index.html"]
+    assert view_templates(app.view_functions["galleries.api_gallery"]) == []
+
+
+def test_template_assets_follow_extends_and_blocks(app):
+    assets = template_assets(app.jinja_env, "index.html")
+    assert ("style", "vendor/bootstrap.css") in assets
+    assert ("style", "css/index.css") in assets
+    assert ("image", "images/global.png") in assets
+    assert ("script", "vendor/bootstrap.js") in assets
+    # Une image sans fetchpriority="high" n'est pas préchargée
+    assert all(kind != "image" or path == "images/global.png" for kind, path in assets)
+
+
+def test_stylesheet_fonts(app):
+    assert stylesheet_fonts(app.static_folder, "vendor/bootstrap.css") == [
+        "vendor/fonts/bootstrap-icons.woff2"]
+
+
+def test_graph_orders_render_blocking_first(app):
+    graph = app.extensions["preload"].graph
+    kinds = [kind for kind, _ in graph["main.index"]]
+    assert kinds == sorted(kinds, key=("style", "font", "image", "script").index)
+    assert ("font", "vendor/fonts/bootstrap-icons.woff2") in graph["main.index"]
+    assert "galleries.api_gallery" not in graph
+
+
+def test_link_header_on_html(client):
+    link = client.get("/").headers["Link"]
+    assert "rel=preload; as=style" in link
+    assert 'as=font; type="font/woff2"; crossorigin' in link
+    assert "as=image; fetchpriority=high" in link
+    # URLs empreintées, comme dans le HTML
+    assert "/static/vendor/bootstrap.css>" not in link
+
+
+def test_no_link_header_on_json(client):
+    assert "Link" not in client.get("/api/gallery").headers
+
+
+def test_early_hints_sent_before_view(client):
+    hints = []
+    response = client.get("/about", environ_base={"wsgi.early_hints": hints.append})
+    assert len(hints) == 1
+    assert all(name == "Link" for name, _ in hints[0])
+    assert ", ".join(value for _, value in hints[0]) == response.headers["Link"]
+
+    hints.clear()
+    client.get("/api/gallery", environ_base={"wsgi.early_hints": hints.append})
+    assert hints == []
+
+
+def test_preload_disabled(tmp_path):
+    from app import create_app
+
+    other = create_app({"TESTING": True, "PRELOAD_ENABLED": False,
+                        "OUTBOX_PATH": str(tmp_path / "outbox.sqlite3")})
+    assert isinstance(other.extensions["preload"], Preload)
+    assert "Link" not in other.test_client().get("/").headers
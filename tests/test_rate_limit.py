@@ -0,0 +1,108 @@
+import pytest
+
+from rate_limit import MemoryBackend, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return MemoryBackend() if request.param == "memory" else SQLiteBackend(str(tmp_path / "limits.sqlite3"))
+
+
+def test_bucket_allows_burst_then_refills(backend):
+    # 2 requêtes par 100 s : rafale de 2, puis un jeton toutes les 50 s
+    assert [backend.take("ip:a", 2, 0.02, 0) for _ in range(2)] == [0, 0]
+    assert backend.take("ip:a", 2, 0.02, 10) == pytest.approx(40)
+    assert backend.take("ip:b", 2, 0.02, 10) == 0
+    assert backend.take("ip:a", 2, 0.02, 60) == 0
+
+
+def test_fingerprints_expire_after_window(backend):
+    assert backend.seen("abc", 60, 0) is False
+    assert backend.seen("abc", 60, 30) is True
+    assert backend.seen("abc", 60, 61) is False
+
+
+def test_forgotten_fingerprint_is_new_again(backend):
+    assert backend.seen("abc", 60, 0) is False
+    backend.forget("abc")
+    assert backend.seen("abc", 60, 1) is False
+    assert backend.seen("abc", 60, 2) is True
+
+
+def test_memory_backend_forgets_oldest_keys():
+    backend = MemoryBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        backend.take(key, 1, 0.001, 0)
+    # "a" a été oublié : son seau repart plein
+    assert backend.take("a", 1, 0.001, 0) == 0
+    assert backend.take("c", 1, 0.001, 0) > 0
+
+
+@pytest.fixture
+def limited(app, monkeypatch):
+    queued = []
+    monkeypatch.setattr(app.extensions["rate_limiter"], "backend", MemoryBackend())
+    monkeypatch.setitem(app.config, "CONTACT_RATE_LIMIT_IP", (2, 3600))
+    monkeypatch.setattr(app.extensions["mailer"], "enqueue", lambda *p: queued.extend(p))
+    return queued
+
+
+def test_throttled_post_gets_429_without_queueing(client, limited):
+    posts = [client.post("/contact", data={"email": f"user{i}@example.com"},
+                         environ_base={"REMOTE_ADDR": "10.1.1.1"}) for i in range(3)]
+    assert [r.status_code for r in posts] == [302, 302, 429]
+    assert int(posts[2].headers["Retry-After"]) > 0
+    assert len(limited) == 4  # 2 mails par demande acceptée
+    assert client.post("/contact", data={"email": "user9@example.com"},
+                       environ_base={"REMOTE_ADDR": "10.1.1.2"}).status_code == 302
+
+
+def test_duplicate_submission_is_dropped(client, limited):
+    data = {"email": "double@example.com", "idempotency_key": "k1", "demande": "Mariage"}
+    first = client.post("/contact", data=data, environ_base={"REMOTE_ADDR": "10.2.2.2"})
+    second = client.post("/contact", data=data, environ_base={"REMOTE_ADDR": "10.2.2.2"})
+    assert (first.status_code, second.status_code) == (302, 302)
+    assert len(limited) == 2
+
+
+def test_same_key_different_forms_are_both_queued(client, limited):
+    # Page /contact figée (freeze.py) : tous les visiteurs reçoivent la même clé
+    first = client.post("/contact", data={"email": "alice@example.com", "idempotency_key": "figee",
+                                          "demande": "Mariage"}, environ_base={"REMOTE_ADDR": "10.4.4.1"})
+    second = client.post("/contact", data={"email": "bob@example.com", "idempotency_key": "figee",
+                                           "demande": "Anniversaire"}, environ_base={"REMOTE_ADDR": "10.4.4.2"})
+    assert (first.status_code, second.status_code) == (302, 302)
+    assert [m["recipients"] for m in limited][1::2] == [["alice@example.com"], ["bob@example.com"]]
+
+
+def test_resubmission_after_failed_enqueue_is_accepted(app, client, limited, monkeypatch):
+    def fail_once(*messages):
+        monkeypatch.setattr(app.extensions["mailer"], "enqueue", lambda *p: limited.extend(p))
+        raise OSError("outbox indisponible")
+
+    monkeypatch.setattr(app.extensions["mailer"], "enqueue", fail_once)
+    data = {"email": "retry@example.com", "idempotency_key": "k2", "demande": "Mariage"}
+    first = client.post("/contact", data=data, environ_base={"REMOTE_ADDR": "10.3.3.3"})
+    with client.session_transaction() as session:
+        assert session["_flashes"][-1][0] == "danger"
+        session.pop("_flashes")
+    second = client.post("/contact", data=data, environ_base={"REMOTE_ADDR": "10.3.3.3"})
+    assert (first.status_code, second.status_code) == (302, 302)
+    assert [m["recipients"] for m in limited][1] == ["retry@example.com"]
+
+
+def test_contact_form_carries_idempotency_key(client):
+    html = client.get("/contact").get_data(as_text=True)
+    assert 'name="idempotency_key" value="' in html
+
+
+def test_invalid_and_duplicate_posts_do_not_spend_quota(client, limited):
+    ip = {"REMOTE_ADDR": "10.5.5.5"}
+    for _ in range(3):
+        assert client.post("/contact", data={"email": "pas-une-adresse"}, environ_base=ip).status_code == 400
+    data = {"email": "quota@example.com", "idempotency_key": "k3", "demande": "Mariage"}
+    for _ in range(3):
+        assert client.post("/contact", data=data, environ_base=ip).status_code == 302
+    # 2 demandes par IP : la seconde demande nouvelle passe encore
+    assert client.post("/contact", data=dict(data, demande="Baptême"), environ_base=ip).status_code == 302
+    assert len(limited) == 4
@@ -0,0 +1,40 @@
+from PIL import Image
+
+import responsive_images
+
+
+def _photo():
+    return {"gallery/photo.jpg": Image.new("RGB", (800, 600), "orange")}
+
+
+def test_build_is_incremental(make_static):
+    static = make_static(_photo())
+    first = responsive_images.build(str(static), workers=1)
+    assert first["built"] == 1
+    assert (static / "derivatives/gallery/photo-640.jpg").exists()
+    assert not (static / "derivatives/gallery/photo-1024.jpg").exists()
+
+    second = responsive_images.build(str(static), workers=1)
+    assert second == {"built": 0, "skipped": 1, "removed": 0}
+
+    (static / "gallery/photo.jpg").unlink()
+    third = responsive_images.build(str(static), workers=1)
+    assert third["removed"] == 1
+    assert not (static / "derivatives/gallery/photo-640.jpg").exists()
+
+
+def test_picture_helper_emits_srcset(app, make_static):
+    static = make_static(_photo())
+    responsive_images.build(str(static), workers=1)
+    helper = responsive_images.ResponsiveImages()
+    helper.manifest_path = str(static / "derivatives/manifest.json")
+
+    with app.test_request_context():
+        html = helper.picture("gallery/photo.jpg", "Photo", sizes="150px", class_="img-thumbnail")
+        fallback = helper.picture("gallery/absente.jpg", "Absente")
+
+    assert 'srcset="/static/derivatives/gallery/photo-160.jpg 160w' in html
+    assert 'sizes="150px"' in html
+    assert 'class="img-thumbnail"' in html
+    assert 'type="image/webp"' in html
+    assert fallback.startswith('<img src="/static/gallery/absente.jpg"')
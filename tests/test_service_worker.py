@@ -0,0 +1,52 @@
+import json
+import os
+import re
+
+from flask import Flask
+
+from service_worker import ServiceWorker
+from static_assets import StaticAssets
+
+TEMPLATES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+
+def test_service_worker_is_generated_from_routes_and_assets(client):
+    resp = client.get("/service-worker.js")
+    body = resp.get_data(as_text=True)
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/javascript"
+    assert resp.headers["Cache-Control"] == "no-cache"
+    assert "style.css" not in body
+    assert '"/about"' in body and '"/service-worker.js"' not in body
+    assert "/static/css/base." in body and '"/static/css/base.css"' not in body
+
+
+def test_service_worker_version_follows_precached_content(tmp_path):
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    (static / "css/site.css").write_text("body { color: black; }")
+    (static / "gallery").mkdir()
+    (static / "gallery/photo.jpg").write_bytes(b"jpg")
+
+    app = Flask(__name__, static_folder=str(static), static_url_path="/static",
+                template_folder=TEMPLATES)
+    StaticAssets(app)
+    worker = ServiceWorker(app)
+
+    with app.test_request_context("/service-worker.js"):
+        before = worker.context()
+        assert before["assets"][0].startswith("/static/css/site.")
+        assert before["image_prefixes"][0] == "/static/gallery/"
+        (static / "css/site.css").write_text("body { color: white; }")
+        os.utime(static / "css/site.css", ns=(1, 1))
+        assert worker.context()["version"] != before["version"]
+
+
+def test_contact_page_is_never_cached_by_the_worker(client):
+    # Après POST -> 302 -> GET, le message flash doit venir du réseau
+    body = client.get("/service-worker.js").get_data(as_text=True)
+    page_urls = json.loads(re.search(r"const PAGE_URLS = (.*);", body).group(1))
+    network_only = json.loads(re.search(r"const NETWORK_ONLY = (.*);", body).group(1))
+    assert "/contact" not in page_urls
+    assert "/contact" in network_only
+    assert client.get("/contact").headers["Cache-Control"] == "no-store"
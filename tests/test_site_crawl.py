@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+
+from app import app
+from crawler import Resource, crawl, references
+from freeze import page_urls
+
+
+def test_references_by_content_type():
+    page = Resource('/')
+    page.content_type = 'text/html'
+    html = '<a href="/about">a</a><img srcset="/static/a.jpg 1x"><div style="background:url(/static/b.png)">'
+    assert set(references(page, html)) == {'/about', '/static/a.jpg', '/static/b.png'}
+
+    script = Resource('/service-worker.js')
+    script.content_type = 'application/javascript'
+    js = "const PRECACHE = ['/static/css/a.css']; if (url.startsWith('/static/gallery/')) {}"
+    assert references(script, js) == ['/static/css/a.css']
+
+
+def test_unexpected_error_is_recorded_and_crawl_finishes():
+    def handler(request):
+        if request.url.path == '/casse':
+            raise ValueError('réponse illisible')
+        return httpx.Response(200, html='<a href="/casse">x</a><a href="/about">y</a>')
+
+    resources = asyncio.run(asyncio.wait_for(
+        crawl('http://site.test', ['/'], concurrency=1, transport=httpx.MockTransport(handler)), 5))
+    assert resources['http://site.test/casse'].status == 'ValueError'
+    assert resources['http://site.test/about'].status == 200
+
+
+def test_site_has_no_broken_resources(live_server):
+    resources = asyncio.run(crawl(live_server["base_url"], list(page_urls(app)), concurrency=4))
+    broken = {r.url: (r.status, sorted(r.referrers)) for r in resources.values() if r.broken}
+    assert not broken, f"Ressources en erreur : {broken}"
+    # Les feuilles de style et images citées par les pages sont bien parcourues
+    assert any('/static/css/' in url for url in resources)
+    assert any(r.content_type.startswith('image/') for r in resources.values())
@@ -0,0 +1,90 @@
+import socket
+import time
+
+import pytest
+from aiosmtpd.controller import Controller
+from flask import Flask
+from flask_mail import Mail, Message
+
+from smtp_pool import SMTPPool
+
+
+class CountingHandler:
+    def __init__(self):
+        self.handshakes = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.handshakes += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_sink():
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+def mail_app(smtp_sink):
+    _, port = smtp_sink
+    app = Flask(__name__)
+    app.config.update(MAIL_SERVER="127.0.0.1", MAIL_PORT=port, MAIL_USE_TLS=False,
+                      MAIL_DEFAULT_SENDER="site@example.com")
+    return app, Mail(app)
+
+
+def _message(i):
+    return Message(subject=f"Test {i}", recipients=["dest@example.com"], body="Bonjour")
+
+
+def test_pool_reuses_connections(mail_app, smtp_sink):
+    app, mail = mail_app
+    handler, _ = smtp_sink
+    pool = SMTPPool(mail, size=1)
+    with app.app_context():
+        for i in range(10):
+            pool.send(_message(i))
+    assert handler.messages == 10
+    assert handler.handshakes == 1
+    assert pool.stats["connects"] == 1
+    pool.close()
+
+
+def test_pool_respects_message_cap(mail_app, smtp_sink):
+    app, mail = mail_app
+    handler, _ = smtp_sink
+    pool = SMTPPool(mail, size=1, max_messages=3)
+    with app.app_context():
+        for i in range(7):
+            pool.send(_message(i))
+    assert handler.messages == 7
+    assert pool.stats["connects"] == 3
+
+
+def test_broken_idle_connection_is_replaced(mail_app, smtp_sink):
+    app, mail = mail_app
+    handler, _ = smtp_sink
+    pool = SMTPPool(mail, size=1, noop_after=0)
+    with app.app_context():
+        pool.send(_message(1))
+        pool._idle[0].connection.host.close()
+        time.sleep(0.01)
+        pool.send(_message(2))
+    assert handler.messages == 2
+    assert pool.stats["noops"] == 1
+    assert pool.stats["connects"] == 2
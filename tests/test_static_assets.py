@@ -1,6 +1,8 @@
 from bs4 import BeautifulSoup
 from pathlib import Path
 
+from static_assets import FINGERPRINT_RE
+
 def test_static_links_exist_on_disk(client):
     html = client.get("/").get_data(as_text=True)
     soup = BeautifulSoup(html, "html.parser")
@@ -15,6 +17,10 @@ def test_static_links_exist_on_disk(client):
         if href.startswith(("http://","https://","//")):
             continue
         p = href[1:] if href.startswith("/") else href
+        # URL empreintée (static/css/base.<hash>.css) -> fichier d'origine
+        m = FINGERPRINT_RE.match(p)
+        if m and not Path(p).exists():
+            p = m.group("stem") + m.group("ext")
         if not Path(p).exists():
             missing.append(href)
 
@@ -0,0 +1,32 @@
+def test_static_urls_are_fingerprinted(app):
+    from flask import url_for
+
+    with app.test_request_context():
+        url = url_for("static", filename="css/base.css")
+        missing = url_for("static", filename="css/absent.css")
+    assert url.startswith("/static/css/base.") and url.endswith(".css")
+    assert url != "/static/css/base.css"
+    assert missing == "/static/css/absent.css"
+
+
+def test_fingerprinted_asset_is_immutable(app, client):
+    from flask import url_for
+
+    with app.test_request_context():
+        url = url_for("static", filename="js/gallery.js")
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    resp.close()
+
+
+def test_stale_fingerprint_is_revalidated(client):
+    resp = client.get("/static/js/gallery.0123456789.js")
+    assert resp.status_code == 200
+    assert "no-cache" in resp.headers["Cache-Control"]
+    resp.close()
+
+    plain = client.get("/static/js/gallery.js")
+    assert plain.status_code == 200
+    assert "immutable" not in plain.headers.get("Cache-Control", "")
+    plain.close()
@@ -0,0 +1,45 @@
+import pytest
+
+from vendor_assets import VendorError, build, scan_templates
+
+
+def _templates(tmp_path, body):
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates/page.html").write_text(body)
+    (tmp_path / "static").mkdir()
+    return str(tmp_path / "templates"), str(tmp_path / "static")
+
+
+def test_scan_templates_adds_runtime_classes(tmp_path):
+    templates, _ = _templates(
+        tmp_path, '<div id="c" class="carousel {% if x %}active{% endif %} alert-{{ cat }}" '
+                  'data-bs-ride="carousel"></div>')
+    classes, ids, tags, components = scan_templates(templates)
+    assert {"carousel", "active", "carousel-item-next"} <= classes
+    assert ids == {"c"} and "div" in tags and components == {"carousel"}
+
+
+def test_build_purges_unused_rules_and_icons(tmp_path):
+    templates, static = _templates(
+        tmp_path, '<a class="btn btn-primary"><i class="bi bi-facebook"></i></a>')
+    report = build(templates, static)
+
+    css = (tmp_path / "static/vendor/bootstrap.css").read_text()
+    assert ".btn-primary{" in css and ".bi-facebook::before" in css
+    assert ".btn-danger" not in css and ".bi-tiktok" not in css
+    assert "Licensed under MIT" in css
+    before, after = report["bootstrap.css"]
+    assert after < before // 5
+    assert (tmp_path / "static/vendor/bootstrap.js").exists()
+
+
+def test_build_rejects_popper_components(tmp_path):
+    templates, static = _templates(tmp_path, '<button data-bs-toggle="dropdown"></button>')
+    with pytest.raises(VendorError):
+        build(templates, static)
+
+
+def test_pages_load_no_third_party_assets(client):
+    html = client.get("/").get_data(as_text=True)
+    assert "cdn.jsdelivr.net" not in html
+    assert "/static/vendor/bootstrap." in html
@@ -0,0 +1,40 @@
+import os
+import runpy
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SIGN = "from app import app; print(app.session_interface.get_signing_serializer(app).dumps({'n': 1}))"
+LOAD = ("import sys; from app import app; "
+        "print(app.session_interface.get_signing_serializer(app).loads(sys.argv[1]))")
+
+
+def _python(code, *args, **env):
+    base = {k: v for k, v in os.environ.items() if k != "SECRET_KEY"}
+    return subprocess.run([sys.executable, "-c", code, *args], cwd=ROOT, env=dict(base, **env),
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_session_signed_by_one_process_is_read_by_another():
+    # Deux workers = deux process : la session doit rester valide de l'un à l'autre
+    signed = _python(SIGN, SECRET_KEY="partagee").stdout.strip()
+    loaded = _python(LOAD, signed, SECRET_KEY="partagee")
+    assert loaded.returncode == 0, loaded.stderr
+    assert loaded.stdout.strip() == "{'n': 1}"
+
+
+def test_wsgi_refuses_to_start_without_secret_key():
+    result = _python("import wsgi")
+    assert result.returncode != 0
+    assert "SECRET_KEY" in result.stderr
+
+
+def test_gunicorn_config_scales_with_environment(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("GUNICORN_THREADS", "8")
+    config = runpy.run_path(str(ROOT / "gunicorn.conf.py"))
+    assert (config["workers"], config["threads"]) == (3, 8)
+    assert config["preload_app"] is True
+    assert config["worker_class"] == "gthread"
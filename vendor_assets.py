@@ -0,0 +1,175 @@
+"""Bootstrap et Bootstrap Icons servis en local, réduits à ce qu'utilisent les templates.
+
+    python vendor_assets.py [--templates templates] [--static static]
+
+Les sources complètes sont versionnées dans `vendor/` (non servies). Le
+build relève dans `templates/**/*.html` les classes, ids, balises et
+composants JS `data-bs-*` utilisés, puis écrit dans `static/vendor/` :
+
+- `bootstrap.css` : Bootstrap + icônes, sans les règles inutilisées ;
+- `fonts/bootstrap-icons.woff2` : police réduite aux icônes utilisées
+  (si fontTools est installé, sinon copie intégrale) ;
+- `bootstrap.js` : Bootstrap sans Popper (aucun composant ne l'utilise).
+
+À relancer après l'ajout d'une classe Bootstrap dans un template.
+"""
+import argparse
+import glob
+import hashlib
+import logging
+import os
+import re
+import shutil
+
+from css_bundles import critical_css, minify
+
+try:
+    from fontTools import subset
+except ImportError:  # fontTools est optionnel : police complète
+    subset = None
+
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vendor')
+OUTPUT_DIR = 'vendor'
+ICON_FONT = 'fonts/bootstrap-icons.woff2'
+
+# Classes posées à l'exécution par le JS de Bootstrap, par composant
+COMPONENT_CLASSES = {
+    'alert': {'fade', 'show'},
+    'carousel': {'active', 'slide', 'pointer-event', 'carousel-item-start', 'carousel-item-end',
+                 'carousel-item-next', 'carousel-item-prev'},
+    'collapse': {'show', 'collapsing', 'collapsed', 'collapse-horizontal'},
+}
+# Composants qui exigent Popper (absent de bootstrap.js)
+POPPER_COMPONENTS = {'dropdown', 'popover', 'tooltip'}
+# Classes construites dynamiquement (`alert-{{ category }}`, JS du site)
+SAFELIST = {'alert-success', 'alert-danger', 'scrolled'}
+
+_CLASS_RE = re.compile(r'\bclass_?\s*=\s*(["\'])(.*?)\1', re.S)
+_ID_RE = re.compile(r'\bid\s*=\s*["\']([\w-]+)["\']')
+_TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)')
+_JINJA_RE = re.compile(r'{{.*?}}|{%.*?%}', re.S)
+_NAME_RE = re.compile(r'-?[_a-zA-Z][\w-]*')
+_COMPONENT_RE = re.compile(r'data-bs-(?:toggle|dismiss|ride)\s*=\s*["\'](\w+)["\']|data-bs-(slide)')
+_JS_STRING_RE = re.compile(r'["\']([_a-zA-Z][\w-]*)["\']')
+_LICENSE_RE = re.compile(r'/\*!.*?\*/', re.S)
+_ICON_RE = re.compile(r'content:"\\([0-9a-f]+)"')
+
+
+class VendorError(Exception):
+    pass
+
+
+# =======================
+# ANALYSE DES TEMPLATES
+# =======================
+def scan_templates(template_folder, script_folder=None):
+    """Classes, ids, balises et composants JS utilisés par les templates."""
+    classes, ids, tags, components = set(SAFELIST), set(), {'html', 'body'}, set()
+    for path in glob.glob(os.path.join(template_folder, '**', '*.html'), recursive=True):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        for _, value in _CLASS_RE.findall(source):
+            classes.update(_NAME_RE.findall(_JINJA_RE.sub(' ', value)))
+        ids.update(_ID_RE.findall(source))
+        tags.update(t.lower() for t in _TAG_RE.findall(source))
+        for name, slide in _COMPONENT_RE.findall(source):
+            components.add('carousel' if slide else name)
+    if script_folder is not None:
+        # Classes ajoutées par le JS du site (`classList.add("active")`)
+        for path in glob.glob(os.path.join(script_folder, '**', '*.js'), recursive=True):
+            with open(path, encoding='utf-8') as f:
+                classes.update(_JS_STRING_RE.findall(f.read()))
+    for component in components:
+        classes |= COMPONENT_CLASSES.get(component, set())
+    return classes, ids, tags, components
+
+
+# =======================
+# BUILD
+# =======================
+def purge(css, classes, ids, tags):
+    """CSS minifié réduit aux règles applicables, en-tête de licence conservé."""
+    license = _LICENSE_RE.search(css)
+    purged = critical_css(minify(css), tags, classes, ids)
+    charset = re.match(r'@charset "[^"]*";', purged)
+    if charset:
+        # @charset doit rester le tout premier octet du fichier
+        purged = purged[charset.end():]
+    return ((charset.group(0) if charset else '')
+            + (license.group(0) + '\n' if license else '') + purged)
+
+
+def build(template_folder, static_folder, vendor_dir=VENDOR_DIR):
+    """Écrit `static/vendor/` ; retourne {fichier: (taille source, taille écrite)}."""
+    classes, ids, tags, components = scan_templates(
+        template_folder, os.path.join(static_folder, 'js'))
+    needs_popper = components & POPPER_COMPONENTS
+    if needs_popper:
+        raise VendorError(f"composant(s) nécessitant Popper : {', '.join(sorted(needs_popper))}")
+
+    output = os.path.join(static_folder, OUTPUT_DIR)
+    os.makedirs(os.path.join(output, 'fonts'), exist_ok=True)
+    report = {}
+
+    source = os.path.join(vendor_dir, 'bootstrap', 'bootstrap.min.css')
+    icons_source = os.path.join(vendor_dir, 'bootstrap-icons', 'bootstrap-icons.min.css')
+    with open(source, encoding='utf-8') as f:
+        bootstrap = purge(f.read(), classes, ids, tags)
+    with open(icons_source, encoding='utf-8') as f:
+        # La @font-face d'origine pointe vers woff2 + woff : remplacée plus bas
+        icons = purge(f.read(), classes, ids, tags)
+    icons = re.sub(r'@font-face{[^}]*}', '', icons)
+
+    codepoints = [int(c, 16) for c in _ICON_RE.findall(icons)]
+    font_source = os.path.join(vendor_dir, 'bootstrap-icons', ICON_FONT)
+    font_target = os.path.join(output, ICON_FONT)
+    if subset is not None and codepoints:
+        options = subset.Options()
+        options.flavor = 'woff2'
+        logging.getLogger('fontTools').setLevel(logging.ERROR)
+        font = subset.load_font(font_source, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        subset.save_font(font, font_target, options)
+    else:
+        shutil.copyfile(font_source, font_target)
+    report[ICON_FONT] = (os.path.getsize(font_source), os.path.getsize(font_target))
+
+    with open(font_target, 'rb') as f:
+        version = hashlib.sha1(f.read()).hexdigest()[:10]
+    font_face = ('@font-face{font-display:block;font-family:bootstrap-icons;'
+                 f'src:url("{ICON_FONT}?{version}") format("woff2")}}')
+    css = f'{bootstrap}\n{font_face}{icons}\n'
+    _write(os.path.join(output, 'bootstrap.css'), css)
+    report['bootstrap.css'] = (os.path.getsize(source) + os.path.getsize(icons_source), len(css))
+
+    js_source = os.path.join(vendor_dir, 'bootstrap', 'bootstrap.min.js')
+    with open(js_source, encoding='utf-8') as f:
+        js = re.sub(r'\n//# sourceMappingURL=.*$', '', f.read().rstrip()) + '\n'
+    _write(os.path.join(output, 'bootstrap.js'), js)
+    report['bootstrap.js'] = (os.path.getsize(js_source), len(js))
+    return report
+
+
+def _write(path, text):
+    # Contenu inchangé : on garde le mtime (empreinte et variantes .br/.gz valides)
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == text:
+                return
+    except FileNotFoundError:
+        pass
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+
+
+if __name__ == '__main__':
+    here = os.path.dirname(__file__) or '.'
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--templates', default=os.path.join(here, 'templates'))
+    parser.add_argument('--static', default=os.path.join(here, 'static'))
+    args = parser.parse_args()
+    for name, (before, after) in build(os.path.abspath(args.templates),
+                                       os.path.abspath(args.static)).items():
+        print(f'{name:>28} : {before} -> {after} octets')
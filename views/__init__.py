@@ -0,0 +1,18 @@
+"""Vues du site, une blueprint par section (enregistrées par `app.create_app`).
+
+- `legal` : CGV, CGU, politiques, mentions ;
+- `main` : accueil, à propos ;
+- `services` : page des services et pages de prestation ;
+- `galleries` : galerie paginée et son API ;
+- `partenaires` : liste et pages des partenaires (catalogue JSON) ;
+- `contact` : formulaire et mise en file des mails.
+
+Les vues ne gardent aucun état de module : caches, index d'images et
+catalogue sont ceux de l'application courante (`current_app.extensions`).
+"""
+from flask import current_app
+
+
+def render_page(template, **context):
+    """Rendu via le cache de pages (ETag, 304) de l'application courante."""
+    return current_app.extensions['page_cache'].render(template, **context)
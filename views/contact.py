@@ -0,0 +1,109 @@
+from datetime import datetime
+import re
+import uuid
+
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+
+from rate_limit import fingerprint
+
+bp = Blueprint('contact', __name__)
+
+
+# =======================
+# CONTACT AVEC ENVOI MAIL
+# =======================
+# Besoins avec emojis
+BESOINS_LABELS = {
+    "pack_regie": "🎛️ Pack régie (sono + lumière)",
+    "sonorisation": "🔊 Sonorisation",
+    "barre_lumiere": "💡 Barre de lumière",
+    "lyres": "🎇 Lyres",
+    "video_projecteur": "📽️ Vidéo projecteur",
+    "laser": "🔫 Laser",
+    "machine_fumee": "💨 Machine à fumée",
+    "machine_etincelle": "✨ Machine à étincelle",
+    "machine_brouillard": "🌫️ Machine à brouillard"
+}
+
+# Contrôle de forme seulement : l'adresse est vraiment vérifiée par l'accusé de réception
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+@bp.route('/contact', methods=['GET', 'POST'])
+def contact():
+    if request.method == 'POST':
+        rate_limiter = current_app.extensions['rate_limiter']
+        email = (request.form.get('email') or '').strip()
+        if not EMAIL_RE.match(email):
+            flash("❌ Adresse email invalide. Merci de vérifier le format.", "danger")
+            return (render_template('contact.html', idempotency_key=uuid.uuid4().hex), 400,
+                    {'Cache-Control': 'no-store'})
+
+        # Double clic ou formulaire rejoué : même clé d'idempotence ET même contenu. La clé seule ne
+        # suffit pas : la page exportée par freeze.py sert la même clé à tous les visiteurs.
+        submission = fingerprint(request.form.get('idempotency_key') or '',
+                                 *sorted(item for item in request.form.items(multi=True)
+                                         if item[0] != 'idempotency_key'))
+        if rate_limiter.is_duplicate(submission):
+            current_app.logger.info("Demande de contact en double ignorée")
+            flash("✅ Votre message a été envoyé avec succès !", "success")
+            return redirect(url_for('contact.contact'))
+
+        # Quota consommé par les seules demandes valides et nouvelles, avant tout rendu de mail
+        retry_after = rate_limiter.retry_after(ip=request.remote_addr, email=email.lower())
+        if retry_after:
+            # Pas envoyée : la même demande, renvoyée plus tard, ne doit pas passer pour un doublon
+            rate_limiter.forget(submission)
+            flash("⏳ Trop de demandes envoyées. Merci de réessayer un peu plus tard.", "warning")
+            return (render_template('contact.html', idempotency_key=uuid.uuid4().hex), 429,
+                    {'Retry-After': str(int(retry_after) + 1), 'Cache-Control': 'no-store'})
+
+        nom = request.form.get('nom')
+        prenom = request.form.get('prenom')
+        telephone = request.form.get('telephone')
+        code_postal = request.form.get('code_postal')
+        event_date_raw = request.form.get('event_date')
+        location = request.form.get('location')
+        contact_method = request.form.get('contact_method')
+        demande = request.form.get('demande')
+        besoins = request.form.getlist('besoin[]')
+
+        # Conversion date en français
+        if event_date_raw:
+            try:
+                event_date = datetime.strptime(event_date_raw, "%Y-%m-%d").strftime("%d/%m/%Y")
+            except ValueError:
+                event_date = event_date_raw
+        else:
+            event_date = "Non précisée"
+
+        # Pile mail (Flask-Mail) chargée au premier envoi seulement
+        from emails import render_email
+
+        besoins_labels = [BESOINS_LABELS.get(b, b) for b in besoins]
+        context = dict(nom=nom, prenom=prenom, email=email, telephone=telephone,
+                       code_postal=code_postal, event_date=event_date, location=location,
+                       contact_method=contact_method, demande=demande, besoins=besoins_labels)
+        html_admin, text_admin = render_email('contact_admin', **context)
+        html_user, text_user = render_email('contact_user', **context)
+
+        try:
+            # Mise en file des mails (envoyés par le worker d'outbox)
+            current_app.extensions['mailer'].enqueue(
+                {'subject': f"Demande de contact - {prenom} {nom}",
+                 'recipients': [current_app.config['MAIL_USERNAME']],
+                 'html': html_admin, 'body': text_admin, 'inline': ['logo']},
+                {'subject': "📬 Votre demande a bien été reçue - Fusikab DJ", 'recipients': [email],
+                 'html': html_user, 'body': text_user, 'inline': ['logo']},
+            )
+            flash("✅ Votre message a été envoyé avec succès !", "success")
+        except Exception:
+            current_app.logger.exception("Impossible d'enregistrer la demande de contact")
+            # Rien n'est parti : la même demande, renvoyée, ne doit pas passer pour un doublon
+            rate_limiter.forget(submission)
+            flash("❌ Une erreur est survenue lors de l'envoi. Merci de réessayer.", "danger")
+
+        return redirect(url_for('contact.contact'))
+
+    # Flash et clé d'idempotence propres à chaque affichage : rien ne doit garder la page
+    return render_template('contact.html', idempotency_key=uuid.uuid4().hex), {'Cache-Control': 'no-store'}
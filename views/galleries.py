@@ -0,0 +1,62 @@
+from flask import Blueprint, abort, current_app, jsonify, request, url_for
+
+from pagination import InvalidCursor, paginate
+from views import render_page
+
+bp = Blueprint('galleries', __name__)
+
+
+def list_images(subdir):
+    """Images de `subdir` en ordre chronologique (date EXIF ou du nom de fichier), sans les quasi-doublons."""
+    extensions = current_app.extensions
+    try:
+        names = extensions['image_index'].images(subdir)
+    except FileNotFoundError:
+        abort(404)
+    duplicates = extensions['duplicates']
+    names = [name for name in names if not duplicates.hidden(f'{subdir}/{name}')]
+    return extensions['image_metadata'].order(subdir, names)
+
+
+def gallery_key(name):
+    return current_app.extensions['image_metadata'].sort_key('gallery/' + name)
+
+
+# =======================
+# GALERIE
+# =======================
+# Servie par pages : la première dans le HTML, la suite via /api/gallery/<curseur>
+@bp.route('/gallery')
+def gallery():
+    _, images, next_cursor = paginate(list_images('gallery'), limit=current_app.config['GALLERY_PAGE_SIZE'],
+                                      key=gallery_key)
+    next_url = url_for('galleries.api_gallery', cursor=next_cursor) if next_cursor else ''
+    return render_page('gallery.html', images=images, next_url=next_url)
+
+# Curseur dans le chemin : chaque page est une URL distincte, exportable par freeze.py
+# (un hébergement statique ignore `?cursor=`). `?cursor=` reste accepté.
+@bp.route('/api/gallery')
+@bp.route('/api/gallery/<cursor>')
+def api_gallery(cursor=None):
+    config = current_app.config
+    limit = request.args.get('limit', config['GALLERY_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, config['GALLERY_MAX_PAGE_SIZE']))
+    try:
+        start, images, next_cursor = paginate(list_images('gallery'), cursor or request.args.get('cursor'),
+                                              limit, key=gallery_key)
+    except InvalidCursor:
+        abort(400)
+    next_url = None
+    if next_cursor:
+        next_url = url_for('galleries.api_gallery', cursor=next_cursor,
+                           **({'limit': limit} if 'limit' in request.args else {}))
+    responsive_images = current_app.extensions['responsive_images']
+    response = jsonify({
+        'images': [dict(responsive_images.describe('gallery/' + name), name=name, index=start + i + 1)
+                   for i, name in enumerate(images)],
+        'next': next_cursor,
+        'next_url': next_url,
+    })
+    response.headers['Cache-Control'] = config['PAGE_CACHE_CONTROL']
+    response.add_etag()
+    return response.make_conditional(request)
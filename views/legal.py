@@ -0,0 +1,29 @@
+from flask import Blueprint
+
+from views import render_page
+
+bp = Blueprint('legal', __name__)
+
+
+# =======================
+# PAGES LÉGALES
+# =======================
+@bp.route('/cgv')
+def cgv():
+    return render_page('cgv.html')
+
+@bp.route('/cgu')
+def cgu():
+    return render_page('cgu.html')
+
+@bp.route('/politique_cookies')
+def politique_cookies():
+    return render_page('politique_cookies.html')
+
+@bp.route('/politique_confidentialite')
+def politique_confidentialite():
+    return render_page('politique_confidentialite.html')
+
+@bp.route('/mentions')
+def mentions():
+    return render_page('mentions.html')
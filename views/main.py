@@ -0,0 +1,20 @@
+from flask import Blueprint, current_app
+
+from views import render_page
+from views.galleries import list_images
+
+bp = Blueprint('main', __name__)
+
+
+# =======================
+# PAGES PRINCIPALES
+# =======================
+@bp.route('/')
+def index():
+    images = list_images('gallery_confiance')
+    return render_page('index.html', images=images,
+                       partners=current_app.extensions['partner_catalog'].partners)
+
+@bp.route('/about')
+def about():
+    return render_page('about.html')
@@ -0,0 +1,30 @@
+from flask import Blueprint, abort, current_app
+
+from views import render_page
+
+bp = Blueprint('partenaires', __name__)
+
+
+# =======================
+# PARTENAIRES
+# =======================
+@bp.route('/partenaires')
+def partenaires():
+    return render_page('partenaire/index_partenaires.html',
+                       categories=current_app.extensions['partner_catalog'].categories)
+
+
+def partenaire(slug):
+    partner = current_app.extensions['partner_catalog'].get(slug)
+    if partner is None:
+        abort(404)
+    return render_page('partenaire/partenaire.html', partner=partner)
+
+
+@bp.record
+def _partner_rules(state):
+    # Une règle statique par partenaire du catalogue de l'application (URLs historiques
+    # `/<slug>`), toutes vers la même vue : url_for('partenaires.partenaire', slug=...) ;
+    # un slug inconnu ne correspond à aucune règle (404)
+    for partner in state.app.extensions['partner_catalog'].partners:
+        state.add_url_rule('/' + partner['slug'], 'partenaire', partenaire, defaults={'slug': partner['slug']})
@@ -0,0 +1,49 @@
+from flask import Blueprint
+
+from views import render_page
+
+bp = Blueprint('services', __name__)
+
+
+# =======================
+# SERVICES ET PRESTATIONS
+# =======================
+@bp.route('/services')
+def services():
+    return render_page('services.html')
+
+@bp.route('/disponibilites')
+def disponibilites():
+    return render_page('disponibilites.html')
+
+@bp.route('/sonorisation')
+def sonorisation():
+    return render_page('sonorisation.html')
+
+@bp.route('/lumieres')
+def lumieres():
+    return render_page('lumieres.html')
+
+@bp.route('/animation_musicale')
+def animation_musicale():
+    return render_page('animation_musicale.html')
+
+@bp.route('/engagement_ecoresponsable')
+def engagement_ecoresponsable():
+    return render_page('engagement_ecoresponsable.html')
+
+@bp.route('/prestations_sur_mesure')
+def prestations_sur_mesure():
+    return render_page('prestations_sur_mesure.html')
+
+@bp.route('/conseil_coaching')
+def conseil_coaching():
+    return render_page('conseil_coaching.html')
+
+@bp.route('/video_projection')
+def video_projection():
+    return render_page('video_projection.html')
+
+@bp.route('/animation_interactive')
+def animation_interactive():
+    return render_page('animation_interactive.html')
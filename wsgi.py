@@ -0,0 +1,21 @@
+"""Point d'entrée WSGI de production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+`run.py` reste réservé au développement (serveur Werkzeug, un seul process).
+"""
+import os
+
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app import app
+
+# .env est déjà chargé par app.py : sans clé fixe, chaque redémarrage
+# invaliderait les sessions (et les messages flash en cours)
+if not os.getenv('SECRET_KEY'):
+    raise RuntimeError("SECRET_KEY doit être défini (environnement ou .env) en production")
+
+# Derrière un reverse proxy (nginx…) : PROXY_COUNT proxys de confiance, pour que
+# `request.remote_addr` (limitation du formulaire de contact) soit l'IP du client
+if os.getenv('PROXY_COUNT'):
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv('PROXY_COUNT')), x_proto=1)